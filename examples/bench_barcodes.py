@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""Benchmark per-symbol encode time of the native 2D barcode encoders."""
+
+import os
+import sys
+import random
+import string
+import timeit
+import argparse
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from zplconvert.symbologies import MATRIX_SYMBOLOGIES, MatrixSymbol, mask_cache, matrix_mask
+
+# Encoder arguments of each symbology, as its barcode command sets them
+# by default
+OPTIONS = {
+    'aztec': (),
+    'datamatrix': ('~', None, None, False),
+    'pdf417': (2, None, None, False),
+    'qrcode': ('Q', None),
+}
+
+def payload(size, seed):
+    """Return label-like field data of ``size`` characters: text, digits and separators."""
+    rng = random.Random(seed)
+    alphabet = string.ascii_uppercase + string.digits * 2 + ' -/.,'
+    return ''.join(rng.choice(alphabet) for _ in range(size))
+
+def encode_all(symbology, payloads):
+    """Encode every payload without the symbol cache."""
+    encode = MATRIX_SYMBOLOGIES[symbology]
+    options = OPTIONS[symbology]
+    return [MatrixSymbol(*encode(data, *options)) for data in payloads]
+
+def mask_all(symbols, module_size):
+    """Scale every symbol into a blittable mask without the mask cache."""
+    mask_cache.clear()
+    return [matrix_mask(symbol, module_size) for symbol in symbols]
+
+def main():
+    """Run the benchmark and print a table of encode times."""
+    parser = argparse.ArgumentParser(description='Benchmark 2D barcode encoders')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[16, 64, 160, 400],
+                        help='Payload sizes in characters')
+    parser.add_argument('--symbols', type=int, default=20, help='Distinct payloads per case')
+    parser.add_argument('--module-size', type=int, default=3, help='Module size of the masks in dots')
+    parser.add_argument('--repeat', type=int, default=5, help='Number of timed runs per case')
+    args = parser.parse_args()
+
+    print(f"{'symbology':>10} {'chars':>6} {'modules':>9} {'encode us':>10} {'mask us':>8}")
+    for symbology in sorted(OPTIONS):
+        for size in args.sizes:
+            payloads = [payload(size, seed) for seed in range(args.symbols)]
+            best = min(timeit.repeat(lambda: encode_all(symbology, payloads), number=1, repeat=args.repeat))
+            symbols = encode_all(symbology, payloads)
+            mask_best = min(timeit.repeat(lambda: mask_all(symbols, args.module_size), number=1,
+                                          repeat=args.repeat))
+            modules = f"{symbols[0].width}x{symbols[0].height}"
+            print(f"{symbology:>10} {size:>6} {modules:>9} {best * 1e6 / len(payloads):>10.1f} "
+                  f"{mask_best * 1e6 / len(payloads):>8.1f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""Benchmark the streaming tokenizer against the old split('^') parser."""
+
+import os
+import sys
+import timeit
+import argparse
+import tracemalloc
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from zplconvert.optimizer import optimize_zpl
+from zplconvert.tokenizer import tokenize
+
+def split_commands(zpl_data):
+    """Tokenize the way parse_zpl did before the streaming tokenizer."""
+    zpl_data = optimize_zpl(zpl_data)
+    commands = []
+    for command in zpl_data.strip().split('^'):
+        if not command or command.startswith('XZ'):
+            continue
+        cmd = command[:2]
+        if cmd == 'FD':
+            params = [command[2:]]
+        else:
+            params = command[2:].split(',')
+        commands.append((cmd, params))
+    return commands
+
+def stream_commands(zpl_data):
+    """Tokenize with the streaming tokenizer, materializing the same output."""
+    return [(token.command, token.params()) for token in tokenize(zpl_data)]
+
+def measure(func, zpl_data, repeat):
+    """Return the best time per call in milliseconds and the peak memory in KiB."""
+    best = min(timeit.repeat(lambda: func(zpl_data), number=1, repeat=repeat))
+    tracemalloc.start()
+    func(zpl_data)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best * 1000, peak / 1024
+
+def main():
+    """Run the benchmark and print a comparison table."""
+    parser = argparse.ArgumentParser(description='Benchmark ZPL tokenization')
+    parser.add_argument('input', nargs='?', default=os.path.join(os.path.dirname(__file__), '..', 'zpl_data.txt'),
+                        help='Path to ZPL input file')
+    parser.add_argument('--repeat', type=int, default=20, help='Number of timed runs per case')
+    args = parser.parse_args()
+
+    with open(args.input, 'r') as f:
+        zpl_data = f.read()
+
+    print(f"{'copies':>8} {'bytes':>10} {'split ms':>10} {'stream ms':>10} {'split KiB':>10} {'stream KiB':>11}")
+    for copies in (1, 10, 100, 1000):
+        data = zpl_data * copies
+        split_ms, split_kib = measure(split_commands, data, args.repeat)
+        stream_ms, stream_kib = measure(stream_commands, data, args.repeat)
+        print(f"{copies:>8} {len(data):>10} {split_ms:>10.2f} {stream_ms:>10.2f} {split_kib:>10.0f} {stream_kib:>11.0f}")
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""Benchmark rotated text rendering against the old rotate-and-paste path."""
+
+import os
+import re
+import sys
+import timeit
+import argparse
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image, ImageDraw, ImageFont
+from zplconvert import parse_zpl
+from zplconvert.elements.text import TextElement
+
+def rotate_fields(zpl_data):
+    """Rotate every ^A0 field of a label, cycling through R, I and B."""
+    orientations = iter('RIB' * len(zpl_data))
+    return re.sub(r'\^A0[NRIB]', lambda m: '^A0' + next(orientations), zpl_data)
+
+def legacy_draw(element, draw):
+    """Draw a rotated text element the way TextElement.draw used to."""
+    font = ImageFont.truetype(element.font_path, element.font_size)
+    bbox = draw.textbbox((0, 0), element.text, font=font)
+    text_width = bbox[2] - bbox[0]
+    text_height = bbox[3] - bbox[1]
+    padding = max(10, element.font_size // 2)
+    if element.rotation == 180:
+        size = (text_width + padding * 2, text_height + padding * 2)
+    else:
+        size = (text_height + padding * 2, text_width + padding * 2)
+    temp_img = Image.new('RGBA', size, (255, 255, 255, 0))
+    ImageDraw.Draw(temp_img).text((size[0] // 2, size[1] // 2), element.text, font=font,
+                                  fill=(0, 0, 0), anchor="mm")
+    rotated = temp_img.rotate(360 - element.rotation, expand=True, resample=Image.BICUBIC)
+    draw._image.paste(rotated, (element.x - padding, element.y - padding), rotated)
+
+def render(elements, mode, legacy):
+    """Render the text elements onto a blank canvas."""
+    image = Image.new(mode, (850, 1200), 'white')
+    draw = ImageDraw.Draw(image)
+    for element in elements:
+        if legacy:
+            legacy_draw(element, draw)
+        else:
+            element.draw(draw)
+    return image
+
+def main():
+    """Run the benchmark and print a comparison table."""
+    parser = argparse.ArgumentParser(description='Benchmark rotated text rendering')
+    parser.add_argument('input', nargs='?', default=os.path.join(os.path.dirname(__file__), '..', 'zpl_data.txt'),
+                        help='Path to ZPL input file')
+    parser.add_argument('--repeat', type=int, default=20, help='Number of timed runs per case')
+    args = parser.parse_args()
+
+    with open(args.input, 'r') as f:
+        zpl_data = rotate_fields(f.read())
+
+    label = parse_zpl(zpl_data)
+    elements = [e for e in label.elements if isinstance(e, TextElement) and e.rotation]
+    print(f"{len(elements)} rotated text fields")
+
+    print(f"{'path':>8} {'mode':>5} {'ms':>8}")
+    cases = [('legacy', 'RGB', True), ('atlas', 'RGB', False), ('atlas', 'L', False), ('atlas', '1', False)]
+    for name, mode, legacy in cases:
+        best = min(timeit.repeat(lambda: render(elements, mode, legacy), number=1, repeat=args.repeat))
+        print(f"{name:>8} {mode:>5} {best * 1000:>8.2f}")
+
+if __name__ == '__main__':
+    main()
@@ -8,7 +8,7 @@ import argparse
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from zplconvert import convert_zpl_file_to_image
+from zplconvert import convert_zpl_file_to_image, render_label_at, TemplateDetector
 
 def main():
     """Main CLI function."""
@@ -19,25 +19,46 @@ def main():
     parser.add_argument('--width', type=int, default=850, help='Width of the output image in pixels')
     parser.add_argument('--height', type=int, default=1200, help='Height of the output image in pixels')
     parser.add_argument('--dpi', type=int, default=203, help='Dots per inch resolution')
+    parser.add_argument('--mode', choices=['1', 'L', 'RGB'], default='1',
+                        help='Render mode: 1-bit (default), grayscale or RGB preview')
+    parser.add_argument('--all-labels', action='store_true',
+                        help='Render every ^XA...^XZ block to its own numbered file (streams the input)')
+    parser.add_argument('--label', type=int,
+                        help='Render only label N (1-based) using a cached spool index')
     
     args = parser.parse_args()
     
     # Default output file is input file with .png extension
     if not args.output:
-        args.output = os.path.splitext(args.input)[0] + '.png'
+        args.output = os.path.splitext(args.input[:-3] if args.input.endswith('.gz') else args.input)[0] + '.png'
     
     print(f"Converting {args.input} to {args.output}")
     print(f"Image size: {args.width}x{args.height} pixels, {args.dpi} DPI")
     
     try:
-        convert_zpl_file_to_image(
+        if args.label:
+            image = render_label_at(args.input, args.label - 1, width=args.width, height=args.height, dpi=args.dpi,
+                                    mode=args.mode)
+            image.save(args.output)
+            print(f"Conversion successful: label {args.label} -> {args.output}")
+            return 0
+        
+        detector = TemplateDetector()
+        result = convert_zpl_file_to_image(
             args.input,
             args.output,
             width=args.width,
             height=args.height,
-            dpi=args.dpi
+            dpi=args.dpi,
+            all_labels=args.all_labels,
+            detector=detector,
+            mode=args.mode
         )
-        print(f"Conversion successful: {args.output}")
+        if args.all_labels:
+            print(f"Conversion successful: {len(result)} labels written")
+            print(f"Template detection: {detector.report()}")
+        else:
+            print(f"Conversion successful: {args.output}")
         return 0
     except Exception as e:
         print(f"Error during conversion: {str(e)}")
@@ -13,6 +13,14 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')
 from flask import Flask, request, jsonify, send_from_directory, render_template
 from flask_cors import CORS
 from zplconvert import convert_zpl_to_image
+from zplconvert.utils.image import graphic_cache
+from zplconvert.objects import object_store
+from zplconvert.fonts import font_cache
+from zplconvert.glyphs import preload_fonts
+
+# Load fonts once at import; with gunicorn --preload this happens in the
+# master process and the workers share the loaded fonts
+preload_fonts()
 
 app = Flask(__name__)
 CORS(app, resources={r"/*": {"origins": "*"}})  # Allow all origins
@@ -223,6 +231,9 @@ def test():
     return jsonify({
         'message': 'Test endpoint is working!',
         'logs': logs.getvalue(),
+        'graphic_cache': graphic_cache.stats(),
+        'object_store': object_store.stats(),
+        'font_cache': font_cache.stats(),
         'processing_time': 0  # Zero indicates this is just a test
     })
 
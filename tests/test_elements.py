@@ -0,0 +1,52 @@
+"""Elements are immutable values that survive pickling."""
+
+import pickle
+
+import pytest
+from PIL import ImageChops
+
+from zplconvert.elements import (BoxElement, ImageElement, LineElement, LinearBarcodeElement, LogoElement,
+                                 MatrixBarcodeElement, TextElement)
+from zplconvert.layout import FieldBlock
+from zplconvert.parser import parse_zpl
+
+ELEMENTS = [
+    TextElement(10, 20, 'HELLO', 30, rotation=90, font_name='D', font_width=20),
+    TextElement(10, 20, 'wrapped text', 30, block=FieldBlock(200, 3, 0, 'C', 0, False)),
+    LineElement(0, 50, 400, 3, 3),
+    BoxElement(5, 5, 100, 60, 4, fill_color=(0, 0, 0), reverse=True),
+    ImageElement(40, 40, 16, 2, b'\xff\x00\x0f\xf0'),
+    LogoElement(0, 0, 'missing.png', 50, 40),
+    LinearBarcodeElement(20, 100, '12345678', 'code128', module_width=3, height=80, rotation=270),
+    MatrixBarcodeElement(300, 100, 'DATA', 'qrcode', 4, options=(('error', 'M'),)),
+]
+
+
+@pytest.mark.parametrize('element', ELEMENTS, ids=lambda element: type(element).__name__)
+def test_pickle_round_trip(element):
+    copy = pickle.loads(pickle.dumps(element, pickle.HIGHEST_PROTOCOL))
+    assert type(copy) is type(element)
+    assert copy == element
+    assert hash(copy) == hash(element)
+    with pytest.raises(AttributeError):
+        copy.x = 0
+
+
+def test_pickled_label_renders_the_same():
+    label = parse_zpl('^XA^FO20,20^GB360,200,4^FS^FO40,40^A0N,40^FDPICKLED^FS'
+                      '^FO40,100^BY2^BCN,60,N^FD12345^FS^XZ', 400, 240)
+    elements = pickle.loads(pickle.dumps(label.elements))
+    copy = label.copy()
+    copy.elements[:] = elements
+    assert ImageChops.difference(copy.render('L'), label.render('L')).getbbox() is None
+
+
+def test_replace_and_with_data():
+    element = ELEMENTS[0]
+    assert element.with_data('WORLD') == element.replace(text='WORLD')
+    assert element.with_data('WORLD').font is element.font
+    assert element.text == 'HELLO'
+    with pytest.raises(TypeError):
+        element.replace(colour='red')
+    with pytest.raises(TypeError):
+        ELEMENTS[2].with_data('data')
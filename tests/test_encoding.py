@@ -0,0 +1,49 @@
+"""Field data decoding for str and bytes ZPL, with and without ^CI and ^FH."""
+
+import pytest
+
+from zplconvert.encoding import character_set, decode_field_data
+from zplconvert.parser import parse_zpl
+
+
+def field_text(zpl):
+    return [element.text for element in parse_zpl(zpl).elements]
+
+
+@pytest.mark.parametrize('zpl, expected', [
+    # str input is Unicode text whatever the character set
+    ('^XA^FO10,10^A0N,30^FDCafé Müller^FS^XZ', 'Café Müller'),
+    ('^XA^CI28^FO10,10^A0N,30^FDCafé Müller^FS^XZ', 'Café Müller'),
+    ('^XA^CI0^FO10,10^A0N,30^FDCafé Müller^FS^XZ', 'Café Müller'),
+    # Without ^CI, ^FH escapes in str input stand for U+0000-U+00FF
+    ('^XA^FO10,10^A0N,30^FH^FDCaf_e9^FS^XZ', 'Café'),
+    ('^XA^CI28^FO10,10^A0N,30^FH^FDCaf_C3_A9^FS^XZ', 'Café'),
+    ('^XA^CI0^FO10,10^A0N,30^FH^FDCaf_82^FS^XZ', 'Café'),
+])
+def test_str_input(zpl, expected):
+    assert field_text(zpl) == [expected]
+
+
+@pytest.mark.parametrize('zpl, expected', [
+    # Bytes are printed in code page 850 unless ^CI selects another set
+    ('^XA^FO10,10^A0N,30^FDCaf\x82 M\x81ller^FS^XZ'.encode('latin-1'), 'Café Müller'),
+    ('^XA^CI28^FO10,10^A0N,30^FDCafé Müller^FS^XZ'.encode('utf-8'), 'Café Müller'),
+    (b'^XA^FO10,10^A0N,30^FH^FDCaf_82^FS^XZ', 'Café'),
+    (b'^XA^CI28^FO10,10^A0N,30^FH^FDCaf_C3_A9^FS^XZ', 'Café'),
+])
+def test_bytes_input(zpl, expected):
+    assert field_text(zpl) == [expected]
+
+
+def test_hex_indicator_applies_to_one_field():
+    zpl = '^XA^FO10,10^A0N,30^FH^FDA_41^FS^FO10,50^A0N,30^FDA_41^FS^XZ'
+    assert field_text(zpl) == ['AA', 'A_41']
+
+
+def test_decode_field_data():
+    assert decode_field_data('Café') == 'Café'
+    assert decode_field_data('Caf_e9', None, '_') == 'Café'
+    assert decode_field_data('Caf\x82', None, None, raw=True) == 'Café'
+    assert decode_field_data('Caf_82', None, '_', raw=True) == 'Café'
+    assert decode_field_data('Caf_C3_A9', character_set(28), '_') == 'Café'
+    assert decode_field_data('Caf\xc3\xa9', character_set(28), None, raw=True) == 'Café'
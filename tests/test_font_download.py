@@ -0,0 +1,84 @@
+"""Fonts downloaded with ~DU or ~DY print through their ^CW identifier."""
+
+import os
+
+import pytest
+from PIL import ImageChops, ImageDraw
+
+from zplconvert.fonts import FONT_DIR, SCALABLE_BASELINE, em_size, font_registry
+from zplconvert.glyphs import GlyphAtlas
+from zplconvert.label import new_canvas
+from zplconvert.objects import object_store
+from zplconvert.parser import parse_zpl
+
+SERIF = os.path.join(FONT_DIR, 'LiberationSerif-Regular.ttf')
+MONO = os.path.join(FONT_DIR, 'LiberationMono-Regular.ttf')
+TEXT = 'Downloaded Serif'
+HEIGHT = 40
+
+
+@pytest.fixture(autouse=True)
+def clear_fonts():
+    yield
+    font_registry.clear()
+    parse_zpl('^XA^IDR:*.*^FS^XZ')
+
+
+def font_hex(path):
+    with open(path, 'rb') as f:
+        data = f.read()
+    return len(data), data.hex().upper()
+
+
+def expected_render(path):
+    """Render TEXT with a face read straight from its file, scaled like font 0."""
+    baseline = int(HEIGHT * SCALABLE_BASELINE + 0.5)
+    atlas = GlyphAtlas(path, em_size(path, baseline), baseline, HEIGHT)
+    image = new_canvas(400, 80, 'L')
+    atlas.draw(ImageDraw.Draw(image), (10, 10), TEXT, 0)
+    return image
+
+
+def render_aliased():
+    label = parse_zpl(f'^XA^CWX,R:SERIF.TTF^FO10,10^AXN,{HEIGHT}^FD{TEXT}^FS^XZ', 400, 80)
+    assert not label.cacheable
+    (element,) = label.elements
+    return element, label.render('L')
+
+
+@pytest.mark.parametrize('command', ['DU', 'DY'])
+def test_downloaded_font_renders_through_alias(command):
+    size, data = font_hex(SERIF)
+    if command == 'DU':
+        parse_zpl(f'~DUR:SERIF.TTF,{size},{data}')
+    else:
+        parse_zpl(f'~DYR:SERIF,A,T,{size},,{data}')
+    assert object_store.get('R:SERIF.TTF', '.TTF') is not None
+
+    element, image = render_aliased()
+    assert element.font_name == 'R:SERIF.TTF'
+    assert element.font_path == 'R:SERIF.TTF'
+    assert ImageChops.difference(image, expected_render(SERIF)).getbbox() is None
+    # The resident scalable font looks different
+    default = parse_zpl(f'^XA^FO10,10^A0N,{HEIGHT}^FD{TEXT}^FS^XZ', 400, 80).render('L')
+    assert ImageChops.difference(image, default).getbbox() is not None
+
+
+def test_replaced_font_is_reloaded():
+    size, data = font_hex(SERIF)
+    parse_zpl(f'~DUR:SERIF.TTF,{size},{data}')
+    render_aliased()
+    size, data = font_hex(MONO)
+    parse_zpl(f'~DUR:SERIF.TTF,{size},{data}')
+    _, image = render_aliased()
+    assert ImageChops.difference(image, expected_render(MONO)).getbbox() is None
+
+
+def test_deleted_font_falls_back_to_font_zero():
+    size, data = font_hex(SERIF)
+    parse_zpl(f'~DUR:SERIF.TTF,{size},{data}')
+    render_aliased()
+    parse_zpl('^XA^IDR:SERIF.TTF^FS^XZ')
+    _, image = render_aliased()
+    default = parse_zpl(f'^XA^FO10,10^A0N,{HEIGHT}^FD{TEXT}^FS^XZ', 400, 80).render('L')
+    assert ImageChops.difference(image, default).getbbox() is None
@@ -0,0 +1,17 @@
+"""Preloaded fonts are the ones the glyph atlases ask for."""
+
+from zplconvert.fonts import COMMON_SIZES, font_cache
+from zplconvert.glyphs import BITMAP_FONTS, MONO_FONT, SCALABLE_FONT, create_atlas, preload_fonts
+
+
+def test_preload_covers_common_heights():
+    font_cache.clear()
+    loaded_count = preload_fonts()
+    loaded = set(font_cache.keys())
+    for name in sorted(BITMAP_FONTS) + [SCALABLE_FONT]:
+        for height in COMMON_SIZES:
+            create_atlas(name, height)
+    assert set(font_cache.keys()) == loaded
+    # Only the two faces the atlases draw with, at the em sizes they use
+    assert {face for face, _ in loaded} == {MONO_FONT, create_atlas(SCALABLE_FONT, 30).face}
+    assert len(loaded) == loaded_count
@@ -0,0 +1,36 @@
+"""Rotated fields are drawn as the unrotated field, rotated."""
+
+import pytest
+from PIL import Image, ImageChops, ImageDraw
+
+from zplconvert.glyphs import ROTATE_TRANSPOSE, get_atlas, line_cache
+
+TEXT = 'Rotated jgpq AVAW'
+MARGIN = 20
+
+
+def render(atlas, rotation, mode):
+    width, height = atlas.text_width(TEXT), atlas.height
+    if rotation in (90, 270):
+        width, height = height, width
+    image = Image.new(mode, (width + 2 * MARGIN, height + 2 * MARGIN), 255)
+    atlas.draw(ImageDraw.Draw(image), (MARGIN, MARGIN), TEXT, 0, rotation)
+    return image
+
+
+@pytest.mark.parametrize('mode', ['1', 'L'])
+@pytest.mark.parametrize('rotation', [90, 180, 270])
+@pytest.mark.parametrize('font, height', [('0', 40), ('D', 36)])
+def test_rotated_field_matches_rotated_render(font, height, rotation, mode):
+    atlas = get_atlas(font, height)
+    expected = render(atlas, 0, mode).transpose(ROTATE_TRANSPOSE[rotation])
+    assert ImageChops.difference(render(atlas, rotation, mode), expected).getbbox() is None
+
+
+def test_rotated_field_is_composed_once():
+    atlas = get_atlas('0', 30)
+    line_cache.clear()
+    first = render(atlas, 90, '1')
+    assert len(line_cache) == 1
+    assert ImageChops.difference(render(atlas, 90, '1'), first).getbbox() is None
+    assert len(line_cache) == 1
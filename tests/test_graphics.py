@@ -0,0 +1,164 @@
+"""Graphic field data decodes to the same packed bitmap in every encoding."""
+
+import base64
+import binascii
+import zlib
+
+import pytest
+
+from zplconvert.parser import parse_zpl
+from zplconvert.utils.image import (cached_decode_graphic_field, decode_ascii_graphic, decode_base64_graphic,
+                                    decode_graphic_field, graphic_cache)
+
+# 4 bytes per row, 3 rows
+BITMAP = bytes.fromhex('F00FF00F 00FFFF00 0123ABCD')
+
+
+@pytest.mark.parametrize('data, width_bytes, height, expected', [
+    # Plain hex, upper and lower case
+    ('FF00a5', 1, 3, 'FF00A5'),
+    # G-Y repeat the next digit 1-19 times
+    ('GFHFIFJF', 5, 1, 'F' + 'FF' + 'FFF' + 'FFFF'),
+    ('YA0', 10, 1, 'A' * 19 + '0'),
+    # g-z repeat it 20-400 times; repeat characters add up
+    ('gF', 10, 1, 'F' * 20),
+    ('zE', 200, 1, 'E' * 400),
+    ('vMB,', 164, 1, 'B' * 327 + '0'),
+    # A repeat may run on into the following rows
+    ('gC', 5, 2, 'C' * 20),
+])
+def test_repeat_counts(data, width_bytes, height, expected):
+    assert decode_ascii_graphic(data, width_bytes, height) == bytes.fromhex(expected)
+
+
+@pytest.mark.parametrize('data, expected', [
+    # ',' ends a row and fills it with white, '!' with black
+    ('HF0,', 'FF00'),
+    ('A!', 'AFFF'),
+    # A row that ends in ',' is followed by the next row
+    ('F0,1234', 'F000 1234'),
+    # A ',' or '!' at the start of a row is a whole white or black row
+    (',!', '0000 FFFF'),
+    # ':' repeats the previous row, or a white row at the top
+    ('1234::', '1234 1234 1234'),
+    (':5678', '0000 5678'),
+    ('HF0,:!IA!,JC', 'FF00 FF00 FFFF AAAF 0000 CCCC'),
+])
+def test_row_fills(data, expected):
+    expected = bytes.fromhex(expected)
+    assert decode_ascii_graphic(data, 2, len(expected) // 2) == expected
+
+
+def test_short_and_long_data():
+    # Missing rows are white; rows beyond the height are dropped
+    assert decode_ascii_graphic('FFFF', 2, 3) == bytes.fromhex('FFFF 0000 0000')
+    assert decode_ascii_graphic('FF,', 2, 3) == bytes.fromhex('FF00 0000 0000')
+    assert decode_ascii_graphic('1111:::2222', 2, 2) == bytes.fromhex('1111 1111')
+    assert decode_ascii_graphic('', 2, 1) == bytes(2)
+
+
+def test_compressed_field_renders_like_plain_hex():
+    compressed = parse_zpl('^XA^FO10,10^GFA,12,12,2,HF0,:!IA!,JC^FS^XZ', 40, 20)
+    plain = parse_zpl('^XA^FO10,10^GFA,12,12,2,FF00FF00FFFFAAAF0000CCCC^FS^XZ', 40, 20)
+    assert compressed.elements == plain.elements
+    assert compressed.render().tobytes() == plain.render().tobytes()
+
+
+def encode(bitmap, compressed=True, crc=True):
+    """Encode a bitmap as ``:Z64:`` or ``:B64:`` data with its CRC."""
+    encoded = base64.b64encode(zlib.compress(bitmap) if compressed else bitmap)
+    data = (':Z64:' if compressed else ':B64:') + encoded.decode('ascii')
+    if crc:
+        data += f':{binascii.crc_hqx(encoded, 0):04X}'
+    return data
+
+
+@pytest.mark.parametrize('compressed', [True, False], ids=['Z64', 'B64'])
+def test_base64_round_trip(compressed):
+    data = encode(BITMAP, compressed)
+    assert decode_base64_graphic(data, 4, 3) == BITMAP
+    # The ^GF format does not matter for base64 data
+    for format in 'ABC':
+        assert decode_graphic_field(data, format, 4, 3) == BITMAP
+
+
+def test_base64_variants():
+    # Lowercase CRC, no CRC, and line breaks inside the base64 text
+    data = encode(BITMAP)
+    assert decode_base64_graphic(data[:-4] + data[-4:].lower(), 4, 3) == BITMAP
+    assert decode_base64_graphic(encode(BITMAP, crc=False), 4, 3) == BITMAP
+    encoded = data[5:-5]
+    wrapped = ':Z64:' + '\r\n'.join(encoded[i:i + 8] for i in range(0, len(encoded), 8)) + data[-5:]
+    assert decode_base64_graphic(wrapped, 4, 3) == BITMAP
+
+
+def test_base64_sizes():
+    # Short data is padded with white, long data is cut at the bitmap size
+    assert decode_base64_graphic(encode(BITMAP[:6]), 4, 3) == BITMAP[:6] + bytes(6)
+    assert decode_base64_graphic(encode(BITMAP * 2), 4, 3) == BITMAP
+    assert decode_base64_graphic(encode(BITMAP, compressed=False), 4, 2) == BITMAP[:8]
+
+
+def test_crc_mismatch_is_rejected():
+    data = encode(BITMAP)
+    crc = int(data[-4:], 16)
+    assert decode_base64_graphic(f'{data[:-4]}{crc ^ 1:04X}', 4, 3) is None
+
+
+@pytest.mark.parametrize('payload', [
+    # Not zlib data
+    base64.b64encode(b'not deflated at all').decode('ascii'),
+    # A damaged zlib stream
+    base64.b64encode(zlib.compress(BITMAP)[:2] + b'\xff\xff\xff\xff').decode('ascii'),
+    # Incomplete base64
+    base64.b64encode(zlib.compress(BITMAP)).decode('ascii')[:-3],
+])
+def test_corrupt_payload_is_rejected(payload):
+    encoded = payload.encode('ascii')
+    assert decode_base64_graphic(f':Z64:{payload}:{binascii.crc_hqx(encoded, 0):04X}', 4, 3) is None
+
+
+def test_corrupt_field_adds_no_element():
+    good = encode(BITMAP)
+    label = parse_zpl(f'^XA^FO0,0^GFA,12,12,4,{good}^FS^XZ', 40, 10)
+    assert len(label.elements) == 1
+    assert label.elements[0].bitmap == BITMAP
+    bad = good[:-4] + ('0000' if good[-4:] != '0000' else '0001')
+    assert parse_zpl(f'^XA^FO0,0^GFA,12,12,4,{bad}^FS^XZ', 40, 10).elements == []
+
+
+def test_graphic_cache_is_bounded():
+    # 1 MiB graphics: a distinct first row repeated down the field
+    width_bytes = height = 1024
+    size = width_bytes * height
+    limit = graphic_cache.max_bytes
+
+    def decode(number):
+        return cached_decode_graphic_field(f'{number:04X},' + ':' * (height - 1), 'A', width_bytes, height)
+
+    graphic_cache.clear()
+    try:
+        count = limit // size
+        bitmaps = [decode(number) for number in range(count)]
+        assert graphic_cache.stats() == {
+            'entries': count, 'bytes': limit, 'hits': 0, 'misses': count, 'evictions': 0, 'hit_rate': 0.0,
+        }
+        # A hit returns the cached bitmap and keeps it from being evicted
+        assert decode(0) is bitmaps[0]
+        decode(count)
+        stats = graphic_cache.stats()
+        assert (stats['entries'], stats['bytes'], stats['evictions']) == (count, limit, 1)
+        assert decode(0) is bitmaps[0]
+        # The least recently used graphic was evicted and decodes again
+        assert decode(1) is not bitmaps[1]
+        assert decode(1) == bitmaps[1]
+        stats = graphic_cache.stats()
+        assert (stats['hits'], stats['misses'], stats['evictions']) == (3, count + 2, 2)
+        assert stats['bytes'] <= limit
+        # Corrupt data is not cached
+        bad = encode(BITMAP)[:-4] + '0000'
+        assert cached_decode_graphic_field(bad, 'A', 4, 3) is None
+        assert cached_decode_graphic_field(bad, 'A', 4, 3) is None
+        assert graphic_cache.stats()['misses'] == count + 4
+    finally:
+        graphic_cache.clear()
@@ -0,0 +1,79 @@
+"""Text blocks break lines where the printer does."""
+
+import pytest
+
+from zplconvert.layout import FieldBlock, layout_block, layout_cache
+from zplconvert.parser import parse_zpl
+
+# Font A at 9 dots advances 6 dots per character, spaces included, so a
+# block 60 dots wide holds 10 characters per line
+TEXT = 'THE QUICK BROWN FOX JUMPS'
+
+
+def layout(text=TEXT, width=60, max_lines=3, spacing=0, justification='L', indent=0, clip=False):
+    return layout_block(text, 'A', 9, None, FieldBlock(width, max_lines, spacing, justification, indent, clip))
+
+
+@pytest.mark.parametrize('justification, runs', [
+    ('L', [('THE QUICK', 0, 0), ('BROWN FOX', 0, 9), ('JUMPS', 0, 18)]),
+    ('C', [('THE QUICK', 3, 0), ('BROWN FOX', 3, 9), ('JUMPS', 15, 18)]),
+    ('R', [('THE QUICK', 6, 0), ('BROWN FOX', 6, 9), ('JUMPS', 30, 18)]),
+    # Justified lines spread their words; the last line stays left-aligned
+    ('J', [('THE', 0, 0), ('QUICK', 30, 0), ('BROWN', 0, 9), ('FOX', 42, 9), ('JUMPS', 0, 18)]),
+])
+def test_justification(justification, runs):
+    result = layout(justification=justification)
+    assert list(result.runs) == runs
+    assert (result.width, result.height) == (60, 27)
+
+
+def test_line_limit():
+    # ^FB prints the lines beyond the limit over the last line
+    result = layout(max_lines=2)
+    assert list(result.runs) == [('THE QUICK', 0, 0), ('BROWN FOX', 0, 9), ('JUMPS', 0, 9)]
+    assert result.height == 18
+    # ^TB drops them
+    result = layout(max_lines=2, clip=True)
+    assert list(result.runs) == [('THE QUICK', 0, 0), ('BROWN FOX', 0, 9)]
+    # Unused lines still count towards the height
+    assert layout(max_lines=5).height == 27
+
+
+def test_spacing_and_indent():
+    assert [y for _, _, y in layout(spacing=3).runs] == [0, 12, 24]
+    assert layout(spacing=3).height == 33
+    # Lines after the first are indented and hold fewer characters
+    assert list(layout(indent=12, max_lines=4).runs) == [
+        ('THE QUICK', 0, 0), ('BROWN', 12, 9), ('FOX', 12, 18), ('JUMPS', 12, 27),
+    ]
+
+
+def test_line_breaks():
+    # \& breaks a line, \\ is a backslash, and a width of 0 breaks only at \&
+    result = layout('AB CD\\&E\\\\F', width=0)
+    assert list(result.runs) == [('AB CD', 0, 0), ('E\\F', 0, 9)]
+    assert result.width == 30
+    # Words wider than the block are broken between characters
+    assert list(layout('ABCDEFGHIJKL MN', width=30).runs) == [
+        ('ABCDE', 0, 0), ('FGHIJ', 0, 9), ('KL MN', 0, 18),
+    ]
+
+
+def test_layout_cache():
+    layout_cache.clear()
+    first = layout()
+    assert layout() is first
+    assert layout(justification='C') is not first
+    stats = layout_cache.stats()
+    assert (stats['hits'], stats['misses'], stats['entries']) == (1, 2, 2)
+
+
+def test_blocks_from_commands():
+    label = parse_zpl('^XA^FO10,10^AAN,9^FB60,3,2,C,6^FDONE^FS'
+                      '^FO10,60^AAN,9^TBN,60,20^FDTWO^FS'
+                      '^FO10,90^AAN,9^FDTHREE^FS^XZ', 200, 120)
+    one, two, three = label.elements
+    assert one.block == FieldBlock(60, 3, 2, 'C', 6, False)
+    # A text block holds as many lines as fit its height
+    assert two.block == FieldBlock(60, 2, 0, 'L', 0, True)
+    assert three.block is None
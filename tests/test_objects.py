@@ -0,0 +1,91 @@
+"""Objects downloaded to the printer store are recalled by later labels."""
+
+import io
+
+import pytest
+from PIL import Image
+
+from zplconvert.objects import ObjectStore, StoredGraphic, object_store
+from zplconvert.parser import parse_zpl
+
+# 2 bytes per row, 3 rows
+BITMAP = bytes.fromhex('FFFF 8001 FFFF')
+
+
+@pytest.fixture(autouse=True)
+def clear_store():
+    object_store.clear()
+    yield
+    object_store.clear()
+
+
+def images(zpl):
+    return [(element.x, element.y, element.width, element.height, element.bitmap)
+            for element in parse_zpl(zpl, 200, 100).elements]
+
+
+def test_dg_then_xg():
+    assert images('~DGR:FRAME.GRF,6,2,' + BITMAP.hex().upper()) == []
+    assert object_store.get('R:FRAME.GRF') == StoredGraphic(BITMAP, 16, 3)
+    # A later label recalls it, with or without drive and extension
+    assert images('^XA^FO10,20^XGR:FRAME.GRF^FS^FO30,40^XGFRAME^FS^XZ') == [
+        (10, 20, 16, 3, BITMAP),
+        (30, 40, 16, 3, BITMAP),
+    ]
+    # ^IM recalls at full size, ^XG can magnify
+    assert images('^XA^FO0,0^IMR:FRAME.GRF^FS^XZ') == [(0, 0, 16, 3, BITMAP)]
+    ((_, _, width, height, bitmap),) = images('^XA^FO0,0^XGR:FRAME.GRF,2,3^FS^XZ')
+    assert (width, height) == (32, 9)
+    assert bitmap[:4] == b'\xff' * 4 and bitmap[12:16] == bytes.fromhex('C0000003')
+
+
+def test_id_deletes_objects():
+    parse_zpl('~DGR:ONE.GRF,6,2,' + BITMAP.hex() + '~DGR:TWO.GRF,6,2,' + BITMAP.hex() +
+              '~DGE:KEEP.GRF,6,2,' + BITMAP.hex())
+    assert len(object_store) == 3
+    assert images('^XA^IDR:ONE.GRF^FS^FO0,0^XGR:ONE.GRF^FS^FO0,0^XGR:TWO.GRF^FS^XZ') == [(0, 0, 16, 3, BITMAP)]
+    # Patterns delete every match on the drive
+    parse_zpl('^XA^IDR:*.GRF^FS^XZ')
+    assert object_store.names() == ['E:KEEP.GRF']
+    assert images('^XA^FO0,0^XGR:TWO.GRF^FS^XZ') == []
+
+
+def test_dy_graphic_store_recall_delete():
+    parse_zpl('~DYR:LOGO,A,G,6,2,' + BITMAP.hex())
+    assert object_store.names() == ['R:LOGO.GRF']
+    assert images('^XA^FO5,5^XGR:LOGO.GRF^FS^XZ') == [(5, 5, 16, 3, BITMAP)]
+    parse_zpl('^XA^IDR:LOGO.GRF^FS^XZ')
+    assert len(object_store) == 0
+    assert images('^XA^FO5,5^XGR:LOGO.GRF^FS^XZ') == []
+
+
+def test_dy_png_store_recall_delete():
+    image = Image.new('L', (16, 3), 255)
+    image.putpixel((0, 1), 0)
+    image.putpixel((15, 1), 0)
+    png = io.BytesIO()
+    image.save(png, 'PNG')
+    data = png.getvalue()
+    parse_zpl(f'~DYR:ICON,A,P,{len(data)},,{data.hex()}')
+    assert object_store.names() == ['R:ICON.PNG']
+    # ^IM finds images stored under their own extension
+    assert images('^XA^FO0,0^IMR:ICON^FS^XZ') == [(0, 0, 16, 3, bytes.fromhex('0000 8001 0000'))]
+    parse_zpl('^XA^IDR:ICON.PNG^FS^XZ')
+    assert images('^XA^FO0,0^IMR:ICON^FS^XZ') == []
+
+
+def test_recalling_labels_are_not_cached():
+    parse_zpl('~DGR:FRAME.GRF,6,2,' + BITMAP.hex())
+    assert not parse_zpl('^XA^FO0,0^XGR:FRAME.GRF^FS^XZ').cacheable
+    parse_zpl('^XA^IDR:FRAME.GRF^FS^XZ')
+    assert parse_zpl('^XA^FO0,0^XGR:FRAME.GRF^FS^XZ').elements == []
+
+
+def test_store_evicts_least_recently_used():
+    store = ObjectStore(max_bytes=10)
+    store.put('A', StoredGraphic(bytes(4), 8, 4))
+    store.put('B', b'font')
+    store.get('A')
+    store.put('C', StoredGraphic(bytes(4), 8, 4))
+    assert store.names() == ['R:A.GRF', 'R:C.GRF']
+    assert store.get('R:B.GRF') is None
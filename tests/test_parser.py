@@ -0,0 +1,61 @@
+"""``parse_zpl`` parses the same ZPL once and hands out independent copies."""
+
+import pytest
+from PIL import ImageChops
+
+from zplconvert.parser import parse_cache, parse_zpl
+
+ZPL = '^XA^FO20,20^GB300,150,3^FS^FO40,40^A0N,40^FDCACHED^FS^XZ'
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    parse_cache.clear()
+    yield
+    parse_cache.clear()
+
+
+def test_identical_input_hits():
+    first = parse_zpl(ZPL, 400, 300)
+    assert parse_cache.stats()['misses'] == 1
+    second = parse_zpl(ZPL, 400, 300)
+    assert parse_cache.stats()['hits'] == 1
+    assert second is not first
+    assert second.elements == first.elements
+    # Bytes input has its own key
+    parse_zpl(ZPL.encode('ascii'), 400, 300)
+    assert parse_cache.stats()['misses'] == 2
+
+
+def test_different_input_misses():
+    parse_zpl(ZPL, 400, 300)
+    parse_zpl(ZPL.replace('CACHED', 'OTHER'), 400, 300)
+    assert parse_cache.stats()['hits'] == 0
+    assert len(parse_cache) == 2
+
+
+@pytest.mark.parametrize('width, height, dpi', [(600, 300, 203), (400, 500, 203), (400, 300, 300)])
+def test_copies_take_their_own_size(width, height, dpi):
+    parse_zpl(ZPL, 400, 300)
+    label = parse_zpl(ZPL, width, height, dpi)
+    assert parse_cache.stats()['hits'] == 1
+    assert (label.width, label.height, label.dpi) == (width, height, dpi)
+    image = label.render('L')
+    assert image.size == (width, height)
+    parse_cache.clear()
+    fresh = parse_zpl(ZPL, width, height, dpi).render('L')
+    assert ImageChops.difference(image, fresh).getbbox() is None
+
+
+def test_copies_are_isolated():
+    label = parse_zpl(ZPL, 400, 300)
+    label.elements.clear()
+    label.width = 10
+    cached = parse_zpl(ZPL, 400, 300)
+    assert len(cached.elements) == 2
+    assert cached.width == 400
+
+
+def test_labels_using_the_object_store_are_not_cached():
+    parse_zpl('^XA~DGR:BOX.GRF,4,1,FF00FF00^FO0,0^XGR:BOX.GRF^FS^XZ', 100, 100)
+    assert len(parse_cache) == 0
@@ -0,0 +1,46 @@
+"""Labels render to 1-bit canvases unless another mode is asked for."""
+
+import pytest
+from PIL import ImageChops
+
+from zplconvert import convert_zpl_to_image
+from zplconvert.label import new_canvas
+from zplconvert.parser import parse_zpl
+
+ZPL = ('^XA^FO20,20^GB560,360,4^FS'
+       '^FO40,40^A0N,50^FDMode one^FS'
+       '^FO40,110^ADN,36^FDBitmap font^FS'
+       '^FO40,170^A0R,30^FDRotated^FS'
+       '^FO120,180^BY2^BCN,80,Y,N,N^FD12345678^FS'
+       '^FO420,180^BQN,2,5^FDQA,MODE ONE^FS'
+       '^FO300,320^GFA,8,8,1,FF81818181818181^FS^XZ')
+
+# Anti-aliased 'L' output thresholded the way glyphs are for 1-bit canvases
+_THRESHOLD = [0] * 128 + [255] * 128
+
+
+def test_new_canvas_defaults_to_one_bit():
+    canvas = new_canvas(10, 20)
+    assert canvas.mode == '1'
+    assert canvas.getextrema() == (255, 255)
+    with pytest.raises(ValueError):
+        new_canvas(10, 20, 'CMYK')
+
+
+def test_render_paths_default_to_one_bit():
+    label = parse_zpl(ZPL, 600, 400)
+    assert label.render().mode == '1'
+    assert all(image.mode == '1' for image in label.render_copies())
+    assert convert_zpl_to_image(ZPL, 600, 400).mode == '1'
+
+
+def test_one_bit_render_matches_thresholded_grey_render():
+    label = parse_zpl(ZPL, 600, 400)
+    one_bit = label.render()
+    assert one_bit.getextrema() == (0, 255)
+    grey = label.render('L')
+    assert grey.mode == 'L'
+    # The grey render is anti-aliased; the 1-bit one is not
+    assert len(grey.getcolors()) > 2
+    expected = grey.point(_THRESHOLD, '1')
+    assert ImageChops.difference(one_bit.convert('L'), expected.convert('L')).getbbox() is None
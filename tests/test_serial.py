@@ -0,0 +1,47 @@
+"""^SN and ^SF fields count up across the copies requested by ^PQ."""
+
+import pytest
+from PIL import ImageChops
+
+from zplconvert.parser import parse_zpl
+from zplconvert.serial import SerialField, SerialNumber
+
+
+@pytest.mark.parametrize('start, increment, leading_zeros, values', [
+    ('1', 1, False, ['1', '2', '3']),
+    ('0099', 1, True, ['0099', '0100', '0101']),
+    ('0099', 1, False, ['99', '100', '101']),
+    ('BOX 10 OF 20', 5, False, ['BOX 10 OF 20', 'BOX 10 OF 25', 'BOX 10 OF 30']),
+    ('005', -3, True, ['005', '002', '-001']),
+    ('NONE', 1, False, ['NONE', 'NONE', 'NONE']),
+])
+def test_serial_number(start, increment, leading_zeros, values):
+    serial = SerialNumber(start, increment, leading_zeros)
+    assert [serial.value(step) for step in range(3)] == values
+
+
+@pytest.mark.parametrize('data, mask, increment, values', [
+    ('AB09', '%%dd', '2', ['AB09', 'AB11', 'AB13']),
+    ('A9', 'Ad', '1', ['A9', 'B0', 'B1']),
+    ('z9', 'ad', '1', ['z9', 'a0', 'a1']),
+    ('0F', 'hh', '1', ['0f', '10', '11']),
+])
+def test_serial_field(data, mask, increment, values):
+    serial = SerialField(data, mask, increment)
+    assert [serial.value(step) for step in range(3)] == values
+
+
+def test_copies_increment_after_replicates():
+    label = parse_zpl('^XA^FO10,10^A0N,30^SN0099,1,Y^FS^FO10,60^A0N,30^FDAB09^SF%%dd,2^FS^PQ4,0,2^XZ', 300, 120)
+    copies = list(label.render_copies('L'))
+    assert len(copies) == 4
+    for copy, (number, field) in zip(copies, [('0099', 'AB09'), ('0099', 'AB09'), ('0100', 'AB11'), ('0100', 'AB11')]):
+        expected = parse_zpl(f'^XA^FO10,10^A0N,30^FD{number}^FS^FO10,60^A0N,30^FD{field}^FS^XZ', 300, 120).render('L')
+        assert ImageChops.difference(copy, expected).getbbox() is None
+
+
+def test_copies_keep_drawing_order():
+    # The white box drawn after the serial field covers it in every copy
+    label = parse_zpl('^XA^FO10,10^A0N,30^SN001,1,Y^FS^FO0,0^GB300,120,120,W^FS^PQ2^XZ', 300, 120)
+    for copy in label.render_copies('L'):
+        assert copy.getextrema() == (255, 255)
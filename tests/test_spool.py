@@ -0,0 +1,49 @@
+"""Random access to spool labels agrees with streaming every label."""
+
+import pytest
+from PIL import ImageChops
+
+from zplconvert import convert_zpl_file_to_image, open_spool_index, render_label_at
+from zplconvert.templates import template_registry
+
+# Binary ^GFB data holding ^XZ and ^XA bytes, a stored format and its recall
+SPOOL = (
+    b'^XA^FO20,20^A0N,40^FDFIRST^FS^XZ\n'
+    b'^XA^FO20,20^GFB,8,8,2,^XZ^XA\xff\x00^FS^FO20,60^A0N,40^FDSECOND^FS^XZ\n'
+    b'^XA^DFR:SPOOL.ZPL^FS^FO20,20^GB200,100,4^FS^FO30,30^A0N,40^FN1^FDNAME^FS^XZ\n'
+    b'^XA^XFR:SPOOL.ZPL^FN1^FDTHIRD^FS^XZ\n'
+    b'~DGR:UNUSED.GRF,2,1,FF00\n'
+    b'^XA^FO20,20^A0N,40^FDFOURTH^FS^XZ\n'
+)
+
+
+@pytest.fixture
+def spool(tmp_path):
+    path = tmp_path / 'labels.zpl'
+    path.write_bytes(SPOOL)
+    yield str(path)
+    template_registry.clear()
+
+
+def test_index_skips_stored_formats_and_binary_payloads(spool):
+    index = open_spool_index(spool)
+    assert len(index) == 4
+    assert len(index.formats) // 2 == 1
+    assert index.read_label(1).endswith(b'SECOND^FS^XZ')
+    assert index.read_label(-1) == b'^XA^FO20,20^A0N,40^FDFOURTH^FS^XZ'
+
+
+def test_sidecar_round_trip(spool):
+    built = open_spool_index(spool, rebuild=True)
+    loaded = open_spool_index(spool)
+    assert loaded.labels == built.labels
+    assert loaded.formats == built.formats
+
+
+def test_label_n_matches_all_labels(spool):
+    streamed = list(convert_zpl_file_to_image(spool, width=300, height=200, all_labels=True, mode='L'))
+    template_registry.clear()
+    assert len(streamed) == len(open_spool_index(spool))
+    for n, image in enumerate(streamed):
+        single = render_label_at(spool, n, width=300, height=200, mode='L')
+        assert ImageChops.difference(single, image).getbbox() is None, f"label {n}"
@@ -0,0 +1,40 @@
+"""Barcodes drawn by the native encoders decode to their field data."""
+
+import pytest
+
+from zplconvert.parser import parse_zpl
+
+zxingcpp = pytest.importorskip('zxingcpp')
+
+BARCODES = [
+    ('^BY2^BCN,100,N^FDHELLO123', 'HELLO123'),
+    ('^BY2^BCN,100,N,N,N,D^FD(01)09501101530003(10)AB12', '(01)09501101530003(10)AB12'),
+    ('^BXN,6,200^FDHELLO DM', 'HELLO DM'),
+    ('^BQN,2,5^FDQA,HELLO QR', 'HELLO QR'),
+    ('^B7N,4,5^FDHELLO PDF', 'HELLO PDF'),
+    ('^BON,6^FDHELLO AZTEC', 'HELLO AZTEC'),
+    ('^BY2^B3N,N,100,N^FDCODE39', 'CODE39'),
+    ('^BY2^B2N,100,N^FD1234567890', '1234567890'),
+    ('^BY2^BEN,100,Y^FD400638133393', '4006381333931'),
+    ('^BY2^BUN,100,Y^FD01234567890', '12345678905'),
+    ('^BRN,1,3,1,60^FD0950110153000', '(01)09501101530003'),
+    ('^BRN,6,3,1,60,22^FD(01)09501101530003(3103)000123', '(01)09501101530003(3103)000123'),
+]
+
+
+def decode(zpl):
+    image = parse_zpl(f'^XA^FO60,40{zpl}^FS^XZ', 700, 700).render('L')
+    return [result.text for result in zxingcpp.read_barcodes(image)]
+
+
+@pytest.mark.parametrize('zpl, text', BARCODES)
+def test_decodes(zpl, text):
+    (decoded,) = decode(zpl)
+    # UPC-A is reported as EAN-13 with a leading zero
+    assert decoded.endswith(text)
+
+
+@pytest.mark.parametrize('orientation', 'RIB')
+@pytest.mark.parametrize('zpl', ['^BY2^BC{},100,N^FDROTATED', '^BX{},6,200^FDROTATED', '^BQ{},2,5^FDQA,ROTATED'])
+def test_rotated(zpl, orientation):
+    assert decode(zpl.format(orientation)) == ['ROTATED']
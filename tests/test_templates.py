@@ -0,0 +1,112 @@
+"""Stored formats and detected templates keep the ZPL drawing order."""
+
+import pytest
+from PIL import ImageChops
+
+from zplconvert.parser import iter_labels
+from zplconvert.templates import TemplateDetector, template_registry
+
+# A white box stored after field 1 covers it; field 2 is drawn on top
+STORED = ('^XA^DFR:COVER.ZPL^FS'
+          '^FO0,0^GB300,200,3^FS'
+          '^FO10,10^A0N,40^FN1^FDXXXX^FS'
+          '^FO0,0^GB200,100,100,W^FS'
+          '^FO20,120^A0N,30^FN2^FDXXXX^FS^XZ'
+          '^XA^XFR:COVER.ZPL^FN1^FDHELLO^FN2^FDWORLD^FS^XZ')
+INLINE = ('^XA^FO0,0^GB300,200,3^FS'
+          '^FO10,10^A0N,40^FDHELLO^FS'
+          '^FO0,0^GB200,100,100,W^FS'
+          '^FO20,120^A0N,30^FDWORLD^FS^XZ')
+
+# A shipping label with its variable fields interleaved with the static
+# captions and rules; only the rule below the 2D symbol, which the symbol
+# may grow into, is drawn per label
+CARRIER = ('^FO20,20^GB760,1160,4^FS'
+           '^FO40,40^A0N,30^FDFROM:^FS'
+           '^FO160,40^A0N,30^FN1^FD{shipper}^FS'
+           '^FO20,100^GB760,3,3^FS'
+           '^FO40,120^A0N,30^FDTO:^FS'
+           '^FO160,120^A0N,40^FN2^FD{recipient}^FS'
+           '^FO160,170^A0N,30^FB600,2,0,L^FN3^FD{address}^FS'
+           '^FO20,260^GB760,3,3^FS'
+           '^FO40,280^A0N,25^FDSHIP DATE:^FS'
+           '^FO300,280^A0N,25^FN4^FD{date}^FS'
+           '^FO20,330^GB760,3,3^FS'
+           '^FO40,350^A0N,25^FDTRACKING #:^FS'
+           '^FO100,400^BY2^BCN,150,Y,N,N^FN5^FD{tracking}^FS'
+           '^FO20,620^GB760,3,3^FS'
+           '^FO40,640^A0N,25^FDWEIGHT:^FS'
+           '^FO200,640^A0N,25^FN6^FD{weight}^FS'
+           '^FO560,640^BXN,6,200^FN7^FD{route}^FS'
+           '^FO20,1100^GB760,3,3^FS'
+           '^FO40,1120^A0N,25^FDTHANK YOU FOR SHIPPING^FS')
+CARRIER_DATA = {
+    'shipper': 'ACME WAREHOUSE', 'recipient': 'JANE DOE', 'address': '12 LONG ROAD SPRINGFIELD 12345',
+    'date': '2024-05-01', 'tracking': '1Z999AA10123456784', 'weight': '2.5 KG', 'route': 'ROUTE 66 HUB 7',
+}
+
+
+@pytest.fixture(autouse=True)
+def clear_registry():
+    yield
+    template_registry.clear()
+
+
+def render(zpl, width=400, height=300):
+    return [label.render('L') for label in iter_labels(zpl, width, height)]
+
+
+def test_recall_matches_inline_label():
+    (recalled,) = render(STORED)
+    (inline,) = render(INLINE)
+    assert ImageChops.difference(recalled, inline).getbbox() is None
+
+
+def test_static_element_covering_a_field_is_drawn_per_label():
+    list(iter_labels(STORED))
+    stored_format = template_registry.get('R:COVER.ZPL')
+    assert len(stored_format.static_layer.elements) == 1
+    assert [number for number, _ in stored_format.fields] == [1, None, 2]
+
+
+def test_interleaved_static_elements_join_the_layer():
+    fields = {name: '0' for name in CARRIER_DATA}
+    recall = ''.join(f'^FN{number}^FD{CARRIER_DATA[name]}^FS' for number, name in enumerate(CARRIER_DATA, 1))
+    zpl = f'^XA^DFR:SHIP.ZPL^FS{CARRIER.format(**fields)}^XZ^XA^XFR:SHIP.ZPL{recall}^XZ'
+    (recalled,) = render(zpl, 812, 1218)
+    stored_format = template_registry.get('R:SHIP.ZPL')
+    assert len(stored_format.static_layer.elements) == 11
+    assert [number for number, _ in stored_format.fields] == [1, 2, 3, 4, 5, 6, 7, None]
+    (inline,) = render(f'^XA{CARRIER.format(**CARRIER_DATA)}^XZ', 812, 1218)
+    assert ImageChops.difference(recalled, inline).getbbox() is None
+
+
+def test_detected_template_keeps_drawing_order():
+    labels = ''.join(
+        '^XA^FO0,0^GB300,200,3^FS'
+        f'^FO10,10^A0N,40^FD{value}^FS'
+        '^FO0,0^GB200,100,100,W^FS^XZ'
+        for value in ('ONE', 'TWO', 'THREE')
+    )
+    detector = TemplateDetector()
+    detected = [detector.apply(label) for label in iter_labels(labels, 400, 300, fingerprint=True)]
+    assert detector.hits == 2
+    assert len(detected[2].static.elements) == 1
+    for label, plain in zip(detected, iter_labels(labels, 400, 300)):
+        assert ImageChops.difference(label.render('L'), plain.render('L')).getbbox() is None
+
+
+def test_detected_template_shares_interleaved_static_elements():
+    # The second label repeats the ship date, which only varies on the third
+    data = [CARRIER_DATA,
+            dict(CARRIER_DATA, shipper='GLOBEX', recipient='JOHN ROE', tracking='1Z999AA10123456785',
+                 weight='7 KG', address='1 MAIN STREET', route='ROUTE 9'),
+            dict(CARRIER_DATA, date='2024-05-02', tracking='1Z999AA10123456786')]
+    labels = ''.join(f'^XA{CARRIER.format(**values)}^XZ' for values in data)
+    detector = TemplateDetector()
+    detected = [detector.apply(label) for label in iter_labels(labels, 812, 1218, fingerprint=True)]
+    assert detector.hits == 2
+    assert len(detected[1].static.elements) == 12
+    assert len(detected[2].static.elements) == 11
+    for label, plain in zip(detected, iter_labels(labels, 812, 1218)):
+        assert ImageChops.difference(label.render('L'), plain.render('L')).getbbox() is None
@@ -0,0 +1,59 @@
+"""Tokens do not depend on where the input is split into chunks."""
+
+import io
+
+import pytest
+
+from zplconvert.tokenizer import tokenize, tokenize_with_offsets
+
+SAMPLE = (
+    b'^XA\r\n^FO10,20^A0N,30,30^FDCommas, ~tildes and CRLF\r\n^FS\r\n'
+    b'^FO10,60^GFB,8,8,2,^XZ^XA\xff\x00^FS\n'
+    b'~DYR:LOGO.GRF,B,G,5,,~DG^\xff\n'
+    b'^CC+\n+FO10,100+FDnew caret ^ here+FS+CD;\n'
+    b'+FO10;140+FDsemi;colon+FS~CC^^XZ\n'
+)
+
+
+def tokens(source, chunk_size=64 * 1024):
+    return [(token.prefix, token.command, token.text, token.delimiter) for token in tokenize(source, chunk_size)]
+
+
+def test_tokens():
+    assert tokens(SAMPLE) == [
+        ('^', 'XA', '', ','),
+        ('^', 'FO', '10,20', ','),
+        ('^', 'A0', 'N,30,30', ','),
+        ('^', 'FD', 'Commas, ~tildes and CRLF', ','),
+        ('^', 'FS', '', ','),
+        ('^', 'FO', '10,60', ','),
+        ('^', 'GF', 'B,8,8,2,^XZ^XA\xff\x00', ','),
+        ('^', 'FS', '', ','),
+        ('~', 'DY', 'R:LOGO.GRF,B,G,5,,~DG^\xff', ','),
+        ('^', 'CC', '+', ','),
+        ('+', 'FO', '10,100', ','),
+        ('+', 'FD', 'new caret ^ here', ','),
+        ('+', 'FS', '', ','),
+        ('+', 'CD', ';', ','),
+        ('+', 'FO', '10;140', ';'),
+        ('+', 'FD', 'semi;colon', ';'),
+        ('+', 'FS', '', ';'),
+        ('~', 'CC', '^', ';'),
+        ('^', 'XZ', '', ';'),
+    ]
+
+
+@pytest.mark.parametrize('chunk_size', range(1, 24))
+def test_chunk_boundaries(chunk_size):
+    expected = tokens(SAMPLE)
+    assert tokens(SAMPLE, chunk_size) == expected
+    assert tokens(io.BytesIO(SAMPLE), chunk_size) == expected
+    assert tokens(io.StringIO(SAMPLE.decode('latin-1')), chunk_size) == expected
+
+
+@pytest.mark.parametrize('chunk_size', [1, 5, 16, 64 * 1024])
+def test_offsets(chunk_size):
+    for offset, token in tokenize_with_offsets(SAMPLE, chunk_size):
+        start = offset + token.start
+        assert SAMPLE[start:offset + token.end].decode('latin-1') == token.text
+        assert SAMPLE[start - 2:start].decode('latin-1') == token.command
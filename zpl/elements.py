@@ -7,6 +7,9 @@ from barcode.writer import ImageWriter
 from barcode.charsets import code128
 from pystrich.code128 import Code128Encoder
 from pystrich.datamatrix import DataMatrixEncoder
+from zplconvert.symbologies import gs1
+from zplconvert.symbologies.gs1 import FNC1
+from zplconvert.utils.image import decode_ascii_graphic, bitmap_to_image
 
 class Text:
     def __init__(self, x, y, text, font_size=12, font=None):
@@ -167,49 +170,14 @@ class BarcodeElement(BaseElement):
         self.barcode_type = barcode_type
         self.quality = quality
 
-    # Define a set of known GS1 Application Identifiers
-    GS1_AIS = {
-        '00', '01', '02', '10', '11', '12', '13', '15', '17', '20', 
-        '21', '22', '240', '241', '242', '250', '251', '253', '254', '255',
-        '30', '310', '311', '312', '313', '314', '315', '316', '320', '321', '322', '323', '324', '325', '326', '327', '328', '329',
-        '330', '331', '332', '333', '334', '335', '336', '337', '340', '341', '342', '343', '344', '345', '346', '347', '348', '349',
-        '350', '351', '352', '353', '354', '355', '356', '357', '360', '361', '362', '363', '364', '365', '366', '367', '368', '369',
-        '37', '390', '391', '392', '393', '394', '395', '400', '401', '402', '403',
-        '410', '411', '412', '413', '414', '415', '416', '417', '420', '421', '422', '423', '424', '425', '426', '427',
-        '7001', '7002', '7003', '7004', '7005', '7006', '7007', '7008', '7009', '7010',
-        '7020', '7021', '7022', '7023', '7030', '7031', '7032', '7033', '7034', '7035', '7036', '7037', '7038', '7039',
-        '710', '711', '712', '713', '714', '715', '723',
-        '8001', '8002', '8003', '8004', '8005', '8006', '8007', '8008', '8009', '8010', '8011', '8012', '8013', '8017', '8018', '8019',
-        '8020', '8026', '8110', '8111', '8112', '8200',
-        '90', '91', '92', '93', '94', '95', '96', '97', '98', '99'
-    }
-
-    def _format_gs1_128_data(self, data):
-        # Remove start and stop characters if present
-        if data.startswith('>;') and data.endswith('>;'):
-            data = data[2:-2]
-        
-        parts = data.split('>8')  # Split by the GS character
-        formatted_parts = []
-        for part in parts:
-            # Split each part by '>; ' in case there are multiple AIs within a GS section
-            subparts = part.split('>;')
-            for subpart in subparts:
-                if subpart.startswith(';'):
-                    # Remove the leading semicolon
-                    subpart = subpart[1:]
-                    # Find the longest matching AI
-                    ai = next((ai for ai in sorted(self.GS1_AIS, key=len, reverse=True) if subpart.startswith(ai)), None)
-                    if ai:
-                        value = subpart[len(ai):]
-                        formatted_parts.append(f'({ai}){value}')
-                    else:
-                        formatted_parts.append(subpart)
-                elif subpart:  # Only add non-empty subparts
-                    formatted_parts.append(subpart)
-        
-        # Join all parts with the FNC1 character (ASCII 29) between them
-        return '\xf1' + '\xf1'.join(formatted_parts)
+    def _format_gs1_128_data(self, data, fnc1=FNC1):
+        """Return ZPL GS1 data as encoder input: FNC1, then the element string.
+
+        ``>;`` start codes are dropped and ``>8`` is FNC1; ``gs1.parse``
+        splits the application identifiers and validates their data.
+        """
+        data = data.replace('>;', '').replace('>8', fnc1)
+        return fnc1 + gs1.parse(data, fnc1).encoded
 
     def draw(self, draw):
         try:
@@ -255,7 +223,7 @@ class BarcodeElement(BaseElement):
                 data_without_prefix = self.data[2:]
                 # Replace internal '_1' with FNC1 character (ASCII 29)
                 data_without_prefix = data_without_prefix.replace('_1', chr(29))
-                formatted_data = self._format_gs1_128_data(data_without_prefix)
+                formatted_data = self._format_gs1_128_data(data_without_prefix, chr(29))
                 # Remove the FNC1 character that _format_gs1_128_data adds at the start
                 formatted_data = formatted_data[1:]
                 # Add the GS1 FNC1 character (ASCII 232) at the start
@@ -308,88 +276,10 @@ class ImageElement(BaseElement):
         self.format = format
         self.widthBytes = (width + 7) // 8
         self.total = self.widthBytes * height
-        self.mapCode = self.initialize_map_code()
-
-    @staticmethod
-    def initialize_map_code():
-        mapCode = {}
-        for i in range(1, 20):
-            mapCode[i] = chr(ord('G') + i - 1)
-        for i in range(20, 401, 20):
-            mapCode[i] = chr(ord('g') + (i // 20) - 1)
-        return mapCode
 
     def gfa_to_image(self):
-        hex_data = self.ascii_to_hex(self.image_data)
-        binary_data = self.hex_to_binary(hex_data)
-        image = Image.new('1', (self.width, self.height))
-        pixels = image.load()
-
-        for y in range(self.height):
-            for x in range(self.width):
-                byte_index = (y * self.widthBytes) + (x // 8)
-                bit_index = 7 - (x % 8)
-                if byte_index < len(binary_data):
-                    pixel = (binary_data[byte_index] >> bit_index) & 1
-                    pixels[x, y] = 255 if pixel == 0 else 0  # 0 for black, 255 for white
-
-        return image
-
-    def ascii_to_hex(self, ascii_data):
-        hex_lines = []
-        current_line = ""
-        previous_line = ""
-        
-        for char in ascii_data:
-            if char in '0123456789ABCDEF':
-                current_line += char
-            elif char in self.mapCode.values():
-                count = next(key for key, value in self.mapCode.items() if value == char)
-                current_line += '0' * count
-            elif char == ',':
-                # Pad the current line to the full width before adding it
-                padded_line = self.pad_line(current_line)
-                if padded_line:
-                    hex_lines.append(padded_line)
-                    previous_line = padded_line
-                current_line = ""
-            elif char == ':':
-                if previous_line:
-                    hex_lines.append(previous_line)
-            # Ignore other characters
-
-        # Don't forget to add the last line if there's no trailing comma
-        if current_line:
-            padded_line = self.pad_line(current_line)
-            if padded_line:
-                hex_lines.append(padded_line)
-
-        return '\n'.join(hex_lines)
-
-    def pad_line(self, line):
-        # Calculate how many hex characters we need for a full line
-        full_line_length = self.widthBytes * 2
-        if len(line) > full_line_length:
-            # If the line is too long, truncate it
-            padded_line = line[:full_line_length]
-            return padded_line
-        elif len(line) < full_line_length:
-            # If the line is too short, pad it with '0's
-            padded_line = line.ljust(full_line_length, '0')
-            return padded_line
-        else:
-            # If the line is exactly the right length, return it as is
-            return line
-
-    def hex_to_binary(self, hex_data):
-        binary_data = bytearray()
-        for line in hex_data.split('\n'):
-            for i in range(0, len(line), 2):
-                if i + 1 < len(line):
-                    binary_data.append(int(line[i:i+2], 16))
-                else:
-                    binary_data.append(int(line[i] + '0', 16))
-        return binary_data
+        bitmap = decode_ascii_graphic(self.image_data, self.widthBytes, self.height)
+        return bitmap_to_image(bitmap, self.width, self.height)
 
     def draw(self, draw):
         if self.format == 'A':  # ASCII format
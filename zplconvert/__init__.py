@@ -4,6 +4,10 @@ ZPLConvert - A library for converting ZPL to PNG images.
 
 from .converter import convert_zpl_to_image, convert_zpl_file_to_image
 from .label import Label
+from .parser import parse_zpl, iter_labels
+from .spool import SpoolIndex, open_spool_index, render_label_at
+from .templates import TemplateDetector
 
 __version__ = '0.1.0'
-__all__ = ['convert_zpl_to_image', 'convert_zpl_file_to_image', 'Label']
+__all__ = ['convert_zpl_to_image', 'convert_zpl_file_to_image', 'Label', 'parse_zpl', 'iter_labels',
+           'SpoolIndex', 'open_spool_index', 'render_label_at', 'TemplateDetector']
@@ -0,0 +1,111 @@
+"""Bounded least-recently-used cache shared by the parser and renderers."""
+
+import threading
+from collections import OrderedDict
+
+
+class LRUCache:
+    """A thread-safe LRU cache bounded by entry count and/or total size.
+
+    Args:
+        max_entries (int, optional): Maximum number of entries
+        max_bytes (int, optional): Maximum total size of all entries
+        sizeof (callable, optional): Returns the size of a value in bytes;
+            defaults to ``len``. Only used when ``max_bytes`` is set.
+    """
+
+    def __init__(self, max_entries=None, max_bytes=None, sizeof=len):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.total_bytes = 0
+        self._data = OrderedDict()
+        self._sizes = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def keys(self):
+        """Return the cached keys, least recently used first."""
+        with self._lock:
+            return list(self._data)
+
+    def get(self, key, default=None):
+        """Return the cached value for ``key`` and mark it recently used."""
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        """Insert or replace ``key``, evicting old entries as needed."""
+        size = self.sizeof(value) if self.max_bytes is not None else 0
+        with self._lock:
+            if key in self._data:
+                self.total_bytes -= self._sizes.pop(key)
+                del self._data[key]
+            self._data[key] = value
+            self._sizes[key] = size
+            self.total_bytes += size
+            self._evict()
+        return value
+
+    def get_or_create(self, key, factory):
+        """Return the value for ``key``, building it with ``factory()`` on a miss."""
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = self.put(key, factory())
+        return value
+
+    def pop(self, key, default=None):
+        """Remove ``key`` and return its value."""
+        with self._lock:
+            if key not in self._data:
+                return default
+            self.total_bytes -= self._sizes.pop(key)
+            return self._data.pop(key)
+
+    def clear(self):
+        """Remove every entry and reset the counters."""
+        with self._lock:
+            self._data.clear()
+            self._sizes.clear()
+            self.total_bytes = 0
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        """Return the cache counters as a dictionary."""
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._data),
+            'bytes': self.total_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
+
+    def _evict(self):
+        # Never evict the entry that was just inserted
+        while len(self._data) > 1 and (
+            (self.max_entries is not None and len(self._data) > self.max_entries)
+            or (self.max_bytes is not None and self.total_bytes > self.max_bytes)
+        ):
+            key, _ = self._data.popitem(last=False)
+            self.total_bytes -= self._sizes.pop(key)
+            self.evictions += 1
+
+
+_MISSING = object()
@@ -1,22 +1,20 @@
-"""ZPL command handlers."""
+"""ZPL command handlers.
+
+Importing this package imports every handler module, which declares its
+commands into the shared ``COMMANDS`` dispatch table.
+"""
 
 from .registry import CommandRegistry
-from .text import register_text_commands
-from .barcode import register_barcode_commands
-from .graphic import register_graphic_commands
+from .schema import COMMANDS, CommandSpec, zpl_command
+from .state import ParserState
+from . import format, text, barcode, graphic
+
+# Registry over the module-level dispatch table, built once at import
+default_registry = CommandRegistry()
 
 def create_command_registry():
-    """Create and initialize a command registry with all handlers."""
-    registry = CommandRegistry()
-    register_text_commands(registry)
-    register_barcode_commands(registry)
-    register_graphic_commands(registry)
-    
-    # Register special commands (start/end label, comments)
-    registry.register('XA', lambda params, state, label: print("Start of ZPL data"))
-    registry.register('XZ', lambda params, state, label: print("End of ZPL data"))
-    registry.register('FX', lambda params, state, label: print("Comment: " + (params[0] if params else "")))
-    
-    return registry
+    """Create a registry with all handlers that can be extended independently."""
+    return default_registry.copy()
 
-__all__ = ['create_command_registry', 'CommandRegistry']
+__all__ = ['create_command_registry', 'default_registry', 'CommandRegistry', 'CommandSpec',
+           'COMMANDS', 'ParserState', 'zpl_command']
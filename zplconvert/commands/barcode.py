@@ -1,115 +1,246 @@
 """Barcode-related ZPL command handlers."""
 
-from ..elements.barcode import BarcodeElement
-from ..elements.text import TextElement
+import logging
 
-def handle_bc(params, state, label):
+from ..elements.barcode import LinearBarcodeElement, MatrixBarcodeElement
+from ..symbologies import linear_pattern, matrix_symbol
+from .schema import zpl_command, Int, Float, Choice, Flag, Str
+
+logger = logging.getLogger(__name__)
+
+# Barcode orientation codes and their clockwise rotation in degrees
+ORIENTATIONS = {'N': 0, 'R': 90, 'I': 180, 'B': 270}
+
+# Barcode types drawn by LinearBarcodeElement and MatrixBarcodeElement
+LINEAR_TYPES = {'code128', 'code39', 'databar', 'ean13', 'ean8', 'interleaved2of5', 'upca'}
+MATRIX_TYPES = {'aztec', 'datamatrix', 'pdf417', 'qrcode'}
+# 2D barcode types whose rows are taller than their modules are wide
+STACKED_TYPES = {'pdf417'}
+
+# ^BR symbology types: (barcode type, mode, height in modules or None for
+# the ^BR height). DataBar heights are fixed by the symbology.
+GS1_TYPES = {
+    1: ('databar', 'omnidirectional', 33),
+    2: ('databar', 'truncated', 13),
+    5: ('databar', 'limited', 10),
+    6: ('databar', 'expanded', 34),
+    7: ('upca', True, None),
+    9: ('ean13', None, None),
+    10: ('ean8', None, None),
+    11: ('code128', 'D', None),
+    12: ('code128', 'D', None),
+}
+
+def _interpretation(line, above):
+    """Return the interpretation line position of the Y/N line and above flags."""
+    return ('above' if above else 'below') if line else None
+
+def _start_linear(state, barcode_type, orientation, height, mode, interpretation):
+    """Declare a pending linear barcode drawn at the ^BY module width."""
+    state.expecting_barcode = True
+    state.barcode_type = barcode_type
+    state.barcode_height = height if height is not None else state.default_barcode_height
+    state.barcode_rotation = ORIENTATIONS[orientation]
+    state.barcode_mode = mode
+    state.barcode_interpretation = interpretation
+    state.barcode_module_size = None
+    state.barcode_composite = False
+
+@zpl_command('BC', Choice('orientation', 'N', ORIENTATIONS), Int('height', None, 1, 32000),
+             Flag('interpretation', True), Flag('interpretation_above', False),
+             Flag('check_digit', False), Choice('mode', 'N', 'NUAD'))
+def handle_bc(state, label, orientation, height, interpretation, interpretation_above, check_digit, mode):
     """Handle BC (Barcode Code 128) command."""
-    state['expecting_barcode'] = True
-    state['barcode_type'] = 'code128'
-    
-    # Set default values that work even with empty params
-    state['barcode_height'] = 100  # Default height
-    state['barcode_width'] = 300  # Default width
-    
-    if params and len(params) > 0:
-        # Parse parameters if available
-        if len(params) > 1 and params[1].strip().isdigit():
-            state['barcode_height'] = int(params[1])
+    _start_linear(state, 'code128', orientation, height, mode, _interpretation(interpretation, interpretation_above))
 
-def handle_bx(params, state, label):
+@zpl_command('B3', Choice('orientation', 'N', ORIENTATIONS), Flag('check_digit', False),
+             Int('height', None, 1, 32000), Flag('interpretation', True), Flag('interpretation_above', False))
+def handle_b3(state, label, orientation, check_digit, height, interpretation, interpretation_above):
+    """Handle B3 (Barcode Code 39) command."""
+    _start_linear(state, 'code39', orientation, height, check_digit,
+                  _interpretation(interpretation, interpretation_above))
+
+@zpl_command('B2', Choice('orientation', 'N', ORIENTATIONS), Int('height', None, 1, 32000),
+             Flag('interpretation', True), Flag('interpretation_above', False), Flag('check_digit', False))
+def handle_b2(state, label, orientation, height, interpretation, interpretation_above, check_digit):
+    """Handle B2 (Barcode Interleaved 2 of 5) command."""
+    _start_linear(state, 'interleaved2of5', orientation, height, check_digit,
+                  _interpretation(interpretation, interpretation_above))
+
+@zpl_command('BE', Choice('orientation', 'N', ORIENTATIONS), Int('height', None, 1, 32000),
+             Flag('interpretation', True), Flag('interpretation_above', False))
+def handle_be(state, label, orientation, height, interpretation, interpretation_above):
+    """Handle BE (Barcode EAN-13) command."""
+    _start_linear(state, 'ean13', orientation, height, None, _interpretation(interpretation, interpretation_above))
+
+@zpl_command('BU', Choice('orientation', 'N', ORIENTATIONS), Int('height', None, 1, 32000),
+             Flag('interpretation', True), Flag('interpretation_above', False), Flag('check_digit', True))
+def handle_bu(state, label, orientation, height, interpretation, interpretation_above, check_digit):
+    """Handle BU (Barcode UPC-A) command."""
+    _start_linear(state, 'upca', orientation, height, check_digit,
+                  _interpretation(interpretation, interpretation_above))
+
+@zpl_command('BR', Choice('orientation', 'R', ORIENTATIONS), Int('symbology', 1, 1, 12),
+             Int('magnification', 2, 1, 10), Int('separator', 1, 1, 2), Int('height', 25, 1, 32000),
+             Int('segment_width', 22, 2, 22))
+def handle_br(state, label, orientation, symbology, magnification, separator, height, segment_width):
+    """Handle BR (Barcode GS1 DataBar) command."""
+    if symbology in (3, 4):
+        logger.warning("Stacked GS1 DataBar is not supported; using DataBar Omnidirectional")
+        symbology = 1
+    elif symbology == 8:
+        logger.warning("UPC-E is not supported; using UPC-A")
+        symbology = 7
+    elif symbology in (11, 12):
+        logger.warning("GS1 composite components are not supported; encoding the linear component only")
+    barcode_type, mode, modules_high = GS1_TYPES[symbology]
+    if modules_high:
+        height = modules_high * magnification
+    _start_linear(state, barcode_type, orientation, height, mode, None)
+    state.barcode_module_size = magnification
+    state.barcode_composite = True
+
+@zpl_command('BX', Choice('orientation', 'N', ORIENTATIONS), Int('module_size', None, 1, 32000),
+             Int('quality', 200, 0, 200), Int('columns', None, 9, 144), Int('rows', None, 9, 144),
+             Int('format', 6, 1, 6), Str('escape', '~'), Int('aspect', 1, 1, 2))
+def handle_bx(state, label, orientation, module_size, quality, columns, rows, format, escape, aspect):
     """Handle BX (Barcode DataMatrix) command."""
-    state['expecting_barcode'] = True
-    state['barcode_type'] = 'datamatrix'
-    
-    # Set default values
-    state['barcode_height'] = 100
-    state['barcode_width'] = 100
-    state['barcode_quality'] = 200
+    if quality != 200:
+        logger.warning(f"DataMatrix quality {quality} is not supported; using ECC 200")
+    state.expecting_barcode = True
+    state.barcode_type = 'datamatrix'
+    state.barcode_rotation = ORIENTATIONS[orientation]
+    state.barcode_module_size = module_size
+    state.barcode_module_height = None
+    state.barcode_options = (escape[:1] or None, rows, columns, aspect == 2)
+
+@zpl_command('BQ', Choice('orientation', 'N', 'N'), Int('model', 2, 1, 2), Int('magnification', 2, 1, 10),
+             Choice('level', 'Q', 'HQML'), Int('mask', None, 0, 7))
+def handle_bq(state, label, orientation, model, magnification, level, mask):
+    """Handle BQ (Barcode QR Code) command."""
+    if model != 2:
+        logger.warning("QR Code model 1 is not supported; using model 2")
+    state.expecting_barcode = True
+    state.barcode_type = 'qrcode'
+    state.barcode_rotation = 0
+    state.barcode_module_size = magnification
+    state.barcode_module_height = None
+    # The level in the field data takes precedence
+    state.barcode_options = (level, mask)
+
+@zpl_command('B7', Choice('orientation', 'N', ORIENTATIONS), Int('row_height', None, 1, 32000),
+             Int('security', 0, 0, 8), Int('columns', None, 1, 30), Int('rows', None, 3, 90),
+             Flag('truncate', False))
+def handle_b7(state, label, orientation, row_height, security, columns, rows, truncate):
+    """Handle B7 (Barcode PDF417) command."""
+    state.expecting_barcode = True
+    state.barcode_type = 'pdf417'
+    state.barcode_rotation = ORIENTATIONS[orientation]
+    state.barcode_module_size = state.module_width
+    # The row height is given in modules; without it the rows share the
+    # ^BY height
+    state.barcode_module_height = row_height * state.module_width if row_height else None
+    state.barcode_options = (security, columns, rows, truncate)
+
+@zpl_command('BO', Choice('orientation', 'N', ORIENTATIONS), Int('magnification', 2, 1, 10),
+             Flag('eci', False), Int('size', 0, 0, 300), Flag('menu', False), Int('symbols', 1, 1, 26),
+             Str('symbol_id', ''))
+def handle_bo(state, label, orientation, magnification, eci, size, menu, symbols, symbol_id):
+    """Handle BO (Barcode Aztec) command."""
+    if symbols > 1:
+        logger.warning("Aztec structured append is not supported; encoding a single symbol")
+    state.expecting_barcode = True
+    state.barcode_type = 'aztec'
+    state.barcode_rotation = ORIENTATIONS[orientation]
+    state.barcode_module_size = magnification
+    state.barcode_module_height = None
+    # Error correction percentage, or a compact (101-104) or full range
+    # (201-232) symbol with a fixed number of layers
+    if 1 <= size <= 99:
+        state.barcode_options = (size,)
+    elif 101 <= size <= 104:
+        state.barcode_options = (None, True, size - 100)
+    elif 201 <= size <= 232:
+        state.barcode_options = (None, False, size - 200)
+    else:
+        if size:
+            logger.warning(f"Aztec symbol size {size} is not supported; using the default size")
+        state.barcode_options = ()
+
+@zpl_command('BY', Int('module_width', 2, 1, 10), Float('ratio', 3.0, 2.0, 3.0), Int('height', 10, 1, 32000))
+def handle_by(state, label, module_width, ratio, height):
+    """Handle BY (Barcode Defaults) command."""
+    state.module_width = module_width
+    state.barcode_width_ratio = ratio
+    state.default_barcode_height = height
+
+def _field_top(state, height):
+    """Return the top of a barcode ``height`` dots tall at the field origin."""
+    return state.current_y - height if state.typeset else state.current_y
+
+def add_barcode_field(state, label, data):
+    """Add the barcode declared by the preceding barcode command.
     
-    if len(params) >= 5:
-        if params[1] and params[1].strip().isdigit():
-            state['barcode_height'] = int(params[1])
-        if params[3] and params[3].strip().isdigit():
-            state['barcode_width'] = int(params[3])
-        if params[4] and params[4].strip().isdigit():
-            state['barcode_quality'] = int(params[4])
-
-def handle_fd_barcode(params, state, label):
-    """Handle FD (Field Data) command for barcodes."""
-    if not params:
+    Called by the FD handler while a barcode command is pending.
+    """
+    if not data:
         # Create a placeholder barcode with dummy data if no data provided
         data = "SAMPLE"
-    else:
-        data = params[0]  # The entire field data
-    
-    # Always ensure we have reasonable dimensions
-    if state['barcode_type'] == 'datamatrix':
-        width = state.get('barcode_width', 100)
-        height = state.get('barcode_height', 100)
-    else:  # code128
-        width = state.get('barcode_width', 300)
-        height = state.get('barcode_height', 100)
-    
-    # Ensure width and height are at least 1 pixel
-    width = max(width, 20)
-    height = max(height, 20)
-    
-    try:
-        barcode_element = BarcodeElement(
-            state['current_x'],
-            state['current_y'],
+
+    if state.barcode_type in LINEAR_TYPES:
+        if state.barcode_composite:
+            # The linear component of a composite symbol precedes the '|'
+            data = data.split('|', 1)[0]
+        try:
+            linear_pattern(state.barcode_type, data, state.barcode_mode)
+        except ValueError as e:
+            logger.warning(f"Could not encode {state.barcode_type} barcode: {e}")
+            state.expecting_barcode = False
+            return
+        element = LinearBarcodeElement(
+            state.current_x,
+            state.current_y,
             data,
-            width=width,
-            height=height,
-            barcode_type=state['barcode_type'],
-            quality=state.get('barcode_quality', 200)
+            symbology=state.barcode_type,
+            mode=state.barcode_mode,
+            module_width=state.barcode_module_size or state.module_width,
+            height=state.barcode_height,
+            rotation=state.barcode_rotation,
+            interpretation=state.barcode_interpretation,
+            ratio=state.barcode_width_ratio
         )
-        
-        label.add_element(barcode_element)
-    except Exception as e:
-        # Add a fallback text element to show there was an error
-        label.add_element(TextElement(
-            state['current_x'],
-            state['current_y'],
-            f"[Barcode: {data}]",
-            font_size=12
-        ))
-    
-    # Reset barcode state regardless of success or failure
-    state['expecting_barcode'] = False
+        if state.typeset:
+            height = element.height if element.rotation in (0, 180) else element.width
+            element = element.replace(y=_field_top(state, height))
+        label.add_element(element, state.field_number)
+        state.expecting_barcode = False
+        return
 
-def handle_by(params, state, label):
-    """Handle BY (Barcode Defaults) command."""
-    # Always set default values first
-    state['barcode_width'] = 300
-    state['barcode_width_ratio'] = 3.0
-    state['barcode_height'] = 100
-    
-    if params and len(params) >= 3:
+    if state.barcode_type in MATRIX_TYPES:
+        module_size = state.barcode_module_size
+        module_height = state.barcode_module_height
         try:
-            # Module width in dots (1-10)
-            module_width = int(params[0]) if params[0].strip().isdigit() else 2
-            
-            # Width ratio between wide and narrow bars (2.0-3.0)
-            width_ratio = float(params[1]) if params[1].replace('.', '', 1).isdigit() else 3.0
-            
-            # Barcode height in dots
-            barcode_height = int(params[2]) if params[2].strip().isdigit() else 10
-            
-            # Width calculation more directly based on the spec
-            barcode_width = 300  # Reasonable width
-            
-            state['barcode_width'] = barcode_width
-            state['barcode_width_ratio'] = width_ratio
-            state['barcode_height'] = barcode_height
-        except (ValueError, IndexError) as e:
-            pass
-
-def register_barcode_commands(registry):
-    """Register all barcode-related command handlers."""
-    registry.register('BC', handle_bc)
-    registry.register('BX', handle_bx)
-    registry.register('BY', handle_by)
-    # Add an additional handler for FD command when in barcode mode
-    registry.register('FD_BARCODE', handle_fd_barcode)
+            symbol = matrix_symbol(state.barcode_type, data, state.barcode_options)
+            if module_size is None:
+                # Scale the symbol to about the ^BY height
+                module_size = max(state.default_barcode_height // symbol.height, 1)
+            if module_height is None and state.barcode_type in STACKED_TYPES:
+                module_height = max(state.default_barcode_height // symbol.height, 1)
+            if state.barcode_rotation in (0, 180):
+                height = symbol.height * (module_height or module_size)
+            else:
+                height = symbol.width * module_size
+            label.add_element(MatrixBarcodeElement(
+                state.current_x,
+                _field_top(state, height),
+                data,
+                symbology=state.barcode_type,
+                module_size=module_size,
+                rotation=state.barcode_rotation,
+                options=state.barcode_options,
+                module_height=module_height
+            ), state.field_number)
+        except ValueError as e:
+            logger.warning(f"Could not encode {state.barcode_type} barcode: {e}")
+
+    state.expecting_barcode = False
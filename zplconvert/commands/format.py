@@ -0,0 +1,48 @@
+"""Format-level ZPL command handlers: label boundaries and stored formats."""
+
+from .schema import zpl_command, Int, Flag, Str
+from ..templates import template_registry, normalize_object_name, end_format
+import logging
+
+logger = logging.getLogger(__name__)
+
+@zpl_command('XA')
+def handle_xa(state, label):
+    """Handle XA (Start Format) command."""
+    print("Start of ZPL data")
+
+@zpl_command('XZ')
+def handle_xz(state, label):
+    """Handle XZ (End Format) command."""
+    print("End of ZPL data")
+    state.format_stored = end_format(state, label)
+
+@zpl_command('DF', Str('name', 'R:UNKNOWN.ZPL'))
+def handle_df(state, label, name):
+    """Handle DF (Download Format) command."""
+    state.storing_format = normalize_object_name(name, '.ZPL')
+    state.format_start = len(label.elements)
+    label.cacheable = False
+
+@zpl_command('XF', Str('name', 'R:UNKNOWN.ZPL'))
+def handle_xf(state, label, name):
+    """Handle XF (Recall Format) command."""
+    label.cacheable = False
+    stored_format = template_registry.get(name)
+    if stored_format is None:
+        logger.warning(f"Stored format not found: {name}")
+        return
+    state.recalled_format = stored_format
+    state.field_values = {}
+
+@zpl_command('FN', Int('number', 0, 0, 9999))
+def handle_fn(state, label, number):
+    """Handle FN (Field Number) command."""
+    state.field_number = number
+
+@zpl_command('PQ', Int('quantity', 1, 1, 99999999), Int('pause', 0, 0, 99999999),
+             Int('replicates', 0, 0, 99999999), Flag('override', False), Flag('cut_on_error', True))
+def handle_pq(state, label, quantity, pause, replicates, override, cut_on_error):
+    """Handle PQ (Print Quantity) command."""
+    label.quantity = quantity
+    label.replicates = replicates
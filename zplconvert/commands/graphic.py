@@ -1,77 +1,146 @@
 """Graphic-related ZPL command handlers."""
 
-from ..elements.graphic import BoxElement, ImageElement, LineElement
+from ..elements.graphic import BoxElement, ImageElement
+from ..objects import object_store, OBJECT_EXTENSIONS, StoredGraphic, decode_object_data, image_to_graphic
+from ..fonts import FONT_EXTENSIONS
+from ..glyphs import forget_font
+from ..utils.image import cached_decode_graphic_field, scale_bitmap
+from .schema import zpl_command, Int, Choice, Str, Data
 import logging
 
 logger = logging.getLogger(__name__)
 
-def handle_gb(params, state, label):
+@zpl_command('GB', Int('width', None, 1, 32000), Int('height', None, 1, 32000), Int('thickness', 1, 0, 32000),
+             Choice('color', 'B', 'BW'), Int('rounding', 0, 0, 8))
+def handle_gb(state, label, width, height, thickness, color, rounding):
     """Handle GB (Graphic Box) command."""
-    if len(params) < 3:
-        logger.warning("Insufficient parameters for GB command")
-        return
-        
-    width, height, thickness = map(int, params[:3])
-    
-    # Default color is Black
-    color = 'B'
-    if len(params) >= 4:
-        color = params[3].upper()
-        
-    # Default rounding is 0
-    rounding = 0
-    if len(params) >= 5:
-        rounding = int(params[4])
+    # Width and height default to, and are at least, the line thickness
+    width = max(width or thickness, thickness)
+    height = max(height or thickness, thickness)
     
     # Convert color to RGB
     rgb_color = (0, 0, 0) if color == 'B' else (255, 255, 255)
     
     # Create and add the box element
     element = BoxElement(
-        state['current_x'],
-        state['current_y'],
+        state.current_x,
+        state.current_y,
         width,
         height,
         thickness,
         line_color=rgb_color,
         fill_color=rgb_color if thickness == 0 else None,
-        reverse=state['reverse_field']
+        reverse=state.reverse_field
     )
     label.add_element(element)
-    logger.info(f"Added box: {width}x{height} at ({state['current_x']}, {state['current_y']})")
+    logger.info(f"Added box: {width}x{height} at ({state.current_x}, {state.current_y})")
     
     # Turn off reverse field after use
-    state['reverse_field'] = False
+    state.reverse_field = False
 
-def handle_gf(params, state, label):
+@zpl_command('GF', Choice('format', 'A', 'ABC'), Int('data_bytes', 0, 0), Int('total_bytes', 0, 0),
+             Int('bytes_per_row', 0, 0), Data('data'))
+def handle_gf(state, label, format, data_bytes, total_bytes, bytes_per_row, data):
     """Handle GF (Graphic Field) command."""
-    if len(params) < 5:
+    if not bytes_per_row or not total_bytes:
         logger.warning("Insufficient parameters for GF command")
         return
-        
-    format_type, total, total_bytes, bytes_per_row, *data_parts = params
-    
-    # Join all parts to get the full data
-    full_data = ','.join(data_parts)
     
     # Calculate image dimensions
-    bytes_per_row_int = int(bytes_per_row)
-    width = bytes_per_row_int * 8
-    height = int(total) // bytes_per_row_int
+    width = bytes_per_row * 8
+    height = total_bytes // bytes_per_row
     
-    # Create and add the image element
-    element = ImageElement(
-        state['current_x'],
-        state['current_y'],
+    # Decode the data and add the image element
+    element = ImageElement.from_graphic_field(
+        state.current_x,
+        state.current_y,
         width,
         height,
-        full_data,
-        format_type
+        data,
+        format
     )
+    if element is None:
+        logger.warning(f"Could not decode GF data in format {format}")
+        return
     label.add_element(element)
-    logger.info(f"Added image: {width}x{height} at ({state['current_x']}, {state['current_y']})")
+    logger.info(f"Added image: {width}x{height} at ({state.current_x}, {state.current_y})")
+
+
+@zpl_command('DG', Str('name', 'R:UNKNOWN.GRF'), Int('total_bytes', 0, 0), Int('bytes_per_row', 0, 0), Data('data'))
+def handle_dg(state, label, name, total_bytes, bytes_per_row, data):
+    """Handle DG (Download Graphics) command."""
+    # The label's output depends on the object store from here on
+    label.cacheable = False
+    if not bytes_per_row or not total_bytes:
+        logger.warning("Insufficient parameters for DG command")
+        return
+    bitmap = cached_decode_graphic_field(data, 'A', bytes_per_row, total_bytes // bytes_per_row)
+    if bitmap is None:
+        logger.warning(f"Could not decode graphic {name}")
+        return
+    object_store.put(name, StoredGraphic(bitmap, bytes_per_row * 8, total_bytes // bytes_per_row))
+
+@zpl_command('DY', Str('name', 'R:UNKNOWN'), Choice('format', 'A', 'ABC'), Choice('extension', 'G', OBJECT_EXTENSIONS),
+             Int('total_bytes', 0, 0), Int('bytes_per_row', 0, 0), Data('data'))
+def handle_dy(state, label, name, format, extension, total_bytes, bytes_per_row, data):
+    """Handle DY (Download Objects) command."""
+    label.cacheable = False
+    default_extension = OBJECT_EXTENSIONS[extension]
+    if extension == 'G':
+        if not bytes_per_row or not total_bytes:
+            logger.warning("Insufficient parameters for DY graphic")
+            return
+        height = total_bytes // bytes_per_row
+        bitmap = cached_decode_graphic_field(data, format, bytes_per_row, height)
+        obj = StoredGraphic(bitmap, bytes_per_row * 8, height) if bitmap is not None else None
+    else:
+        obj = decode_object_data(data, format, total_bytes)
+        if obj is not None and extension == 'P':
+            try:
+                obj = image_to_graphic(obj)
+            except Exception as e:
+                logger.warning(f"Could not decode image {name}: {e}")
+                return
+    if obj is None:
+        logger.warning(f"Could not decode object {name}")
+        return
+    name = object_store.put(name, obj, default_extension)
+    if extension in 'BET':
+        # Fonts loaded from an earlier download of this name are stale
+        forget_font(name)
+
+def _recall_graphic(state, label, name, x_factor=1, y_factor=1):
+    """Add a stored graphic at the field origin."""
+    label.cacheable = False
+    graphic = object_store.get(name)
+    if graphic is None and '.' not in name:
+        graphic = object_store.get(name, '.PNG')
+    if not isinstance(graphic, StoredGraphic):
+        logger.warning(f"Stored graphic not found: {name}")
+        return
+    bitmap, width, height = scale_bitmap(graphic.bitmap, graphic.width, graphic.height, x_factor, y_factor)
+    label.add_element(ImageElement(state.current_x, state.current_y, width, height, bitmap))
+
+@zpl_command('XG', Str('name', 'R:UNKNOWN.GRF'), Int('x_factor', 1, 1, 10), Int('y_factor', 1, 1, 10))
+def handle_xg(state, label, name, x_factor, y_factor):
+    """Handle XG (Recall Graphic) command."""
+    _recall_graphic(state, label, name, x_factor, y_factor)
+
+@zpl_command('IM', Str('name', 'R:UNKNOWN.GRF'))
+def handle_im(state, label, name):
+    """Handle IM (Image Move) command."""
+    _recall_graphic(state, label, name)
 
-def register_graphic_commands(registry):
-    """Register all graphic-related command handlers."""
-    registry.register('GB', handle_gb)
-    registry.register('GF', handle_gf)
+@zpl_command('ID', Str('name', 'R:UNKNOWN.GRF'))
+def handle_id(state, label, name):
+    """Handle ID (Object Delete) command."""
+    label.cacheable = False
+    stored = object_store.names()
+    deleted = object_store.delete(name)
+    if deleted:
+        remaining = set(object_store.names())
+        for font in stored:
+            if font not in remaining and font.endswith(FONT_EXTENSIONS):
+                # Text must no longer print with the deleted font
+                forget_font(font)
+    logger.info(f"Deleted {deleted} objects matching {name}")
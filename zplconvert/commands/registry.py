@@ -1,33 +1,47 @@
 """Command registry for ZPL commands."""
 
+from .schema import COMMANDS, CommandSpec
+
 class CommandRegistry:
-    """Registry of ZPL command handlers."""
+    """Registry of ZPL command handlers.
+    
+    A registry is a view over a dispatch table of ``CommandSpec`` objects.
+    The default registry shares the module-level ``COMMANDS`` table that
+    ``zpl_command`` fills in at import time.
+    """
     
-    def __init__(self):
-        self.handlers = {}
+    def __init__(self, handlers=None):
+        self.handlers = COMMANDS if handlers is None else handlers
     
-    def register(self, command, handler):
+    def register(self, command, handler, *params):
         """Register a handler for a ZPL command.
         
         Args:
             command: ZPL command code (e.g., 'FO', 'BC')
-            handler: Function that processes the command parameters
+            handler: Function called as ``handler(state, label, *values)``
+            *params: ``Param`` schema of the command's parameters
         """
-        self.handlers[command] = handler
+        self.handlers[command] = CommandSpec(command, handler, params)
+    
+    def copy(self):
+        """Return a registry with its own copy of the dispatch table."""
+        return CommandRegistry(dict(self.handlers))
     
-    def handle(self, command, params, state, label):
+    def handle(self, command, params, state, label, delimiter=','):
         """Handle a ZPL command.
         
         Args:
             command: ZPL command code
-            params: List of command parameters
-            state: Current state dictionary
+            params: Raw parameter text of the command
+            state: Current ParserState
             label: Label object
+            delimiter: Parameter delimiter
             
         Returns:
             bool: True if command was handled, False otherwise
         """
-        if command in self.handlers:
-            self.handlers[command](params, state, label)
-            return True
-        return False
\ No newline at end of file
+        spec = self.handlers.get(command)
+        if spec is None:
+            return False
+        spec(state, label, params, delimiter)
+        return True
@@ -0,0 +1,212 @@
+"""Declarative parameter schemas for ZPL commands.
+
+Each command is declared once with the handler that implements it and a
+typed schema for its parameters::
+
+    @zpl_command('FO', Int('x', 0, 0, 32000), Int('y', 0, 0, 32000))
+    def handle_fo(state, label, x, y):
+        ...
+
+The schema is compiled into a ``CommandSpec`` when the module is imported
+and added to the module-level ``COMMANDS`` dispatch table, so the parser
+does no per-label setup and handlers receive ready-to-use values.
+"""
+
+import re
+
+_LEADING_INT = re.compile(r'\s*([-+]?\d+)')
+_LEADING_FLOAT = re.compile(r'\s*([-+]?\d*\.?\d+)')
+
+
+class Param:
+    """A positional command parameter.
+
+    Args:
+        name (str): Parameter name, used in error messages and docs
+        default: Value used when the parameter is missing, empty or invalid
+    """
+
+    __slots__ = ('name', 'default')
+
+    def __init__(self, name, default=None):
+        self.name = name
+        self.default = default
+
+    def converter(self):
+        """Return a function that converts the raw text of the parameter."""
+        return str
+
+
+class Int(Param):
+    """An integer parameter, clamped to ``[minimum, maximum]``.
+
+    Trailing garbage is ignored (``'28\\n'`` parses as 28), matching how a
+    printer reads numeric fields.
+    """
+
+    __slots__ = ('minimum', 'maximum')
+
+    def __init__(self, name, default=None, minimum=None, maximum=None):
+        super().__init__(name, default)
+        self.minimum = minimum
+        self.maximum = maximum
+
+    def converter(self):
+        default, minimum, maximum = self.default, self.minimum, self.maximum
+        match = _LEADING_INT.match
+
+        def convert(text):
+            try:
+                value = int(text)
+            except ValueError:
+                m = match(text)
+                if m is None:
+                    return default
+                value = int(m.group(1))
+            if minimum is not None and value < minimum:
+                return minimum
+            if maximum is not None and value > maximum:
+                return maximum
+            return value
+
+        return convert
+
+
+class Float(Int):
+    """A decimal parameter, clamped to ``[minimum, maximum]``."""
+
+    __slots__ = ()
+
+    def converter(self):
+        default, minimum, maximum = self.default, self.minimum, self.maximum
+        match = _LEADING_FLOAT.match
+
+        def convert(text):
+            try:
+                value = float(text)
+            except ValueError:
+                m = match(text)
+                if m is None:
+                    return default
+                value = float(m.group(1))
+            if minimum is not None and value < minimum:
+                return minimum
+            if maximum is not None and value > maximum:
+                return maximum
+            return value
+
+        return convert
+
+
+class Choice(Param):
+    """A single-letter option; anything not in ``choices`` gives the default."""
+
+    __slots__ = ('choices',)
+
+    def __init__(self, name, default, choices):
+        super().__init__(name, default)
+        self.choices = frozenset(choices)
+
+    def converter(self):
+        default, choices = self.default, self.choices
+
+        def convert(text):
+            value = text.strip().upper()
+            return value if value in choices else default
+
+        return convert
+
+
+class Flag(Param):
+    """A Y/N parameter converted to a bool."""
+
+    __slots__ = ()
+
+    def converter(self):
+        default = self.default
+
+        def convert(text):
+            value = text.strip().upper()
+            if value == 'Y':
+                return True
+            if value == 'N':
+                return False
+            return default
+
+        return convert
+
+
+class Str(Param):
+    """A free-form string parameter."""
+
+    __slots__ = ()
+
+
+class Data(Param):
+    """Trailing free-form data that may contain the delimiter.
+
+    Must be the last parameter of a schema. The text is passed unsplit and
+    unstripped.
+    """
+
+    __slots__ = ()
+
+    def __init__(self, name, default=''):
+        super().__init__(name, default)
+
+
+class CommandSpec:
+    """A command handler together with its compiled parameter schema."""
+
+    __slots__ = ('code', 'handler', 'params', 'converters', 'defaults', 'maxsplit')
+
+    def __init__(self, code, handler, params):
+        for param in params[:-1]:
+            if isinstance(param, Data):
+                raise ValueError(f"Data parameter must be last in ^{code}")
+        self.code = code
+        self.handler = handler
+        self.params = tuple(params)
+        self.converters = tuple(param.converter() for param in params)
+        self.defaults = tuple(param.default for param in params)
+        if params and isinstance(params[-1], Data):
+            self.maxsplit = len(params) - 1
+        else:
+            # Extra parameters beyond the schema are ignored
+            self.maxsplit = len(params)
+
+    def parse(self, text, delimiter=','):
+        """Convert raw parameter text into a tuple of typed values."""
+        if not self.params:
+            return ()
+        if self.maxsplit == 0:
+            return (text,)
+        values = list(self.defaults)
+        for index, part in enumerate(text.split(delimiter, self.maxsplit)[:len(values)]):
+            if part:
+                values[index] = self.converters[index](part)
+        return values
+
+    def __call__(self, state, label, text, delimiter=','):
+        """Parse ``text`` and invoke the handler."""
+        self.handler(state, label, *self.parse(text, delimiter))
+
+    def __repr__(self):
+        return f"CommandSpec({self.code!r}, {', '.join(p.name for p in self.params)})"
+
+
+# Module-level dispatch table: command code -> CommandSpec
+COMMANDS = {}
+
+
+def zpl_command(code, *params):
+    """Declare a command handler and add it to the dispatch table.
+
+    Args:
+        code (str): Two-letter command code, without the prefix
+        *params (Param): Schema of the command's positional parameters
+    """
+    def decorator(handler):
+        COMMANDS[code] = CommandSpec(code, handler, params)
+        return handler
+    return decorator
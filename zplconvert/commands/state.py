@@ -0,0 +1,113 @@
+"""Parser state shared by the command handlers."""
+
+
+class ParserState:
+    """Settings in effect while a label is being parsed.
+
+    Field settings (position, reverse, ^A font, text blocks, ^FH, pending
+    barcode) apply to the next field only and are cleared by ^FS; format
+    settings such as the ^CF font or ^BY defaults persist until they are
+    changed.
+    """
+
+    __slots__ = (
+        'current_x',
+        'current_y',
+        'typeset',
+        'current_font_name',
+        'current_font_size',
+        'current_font_width',
+        'field_font',
+        'field_block',
+        'text_block',
+        'byte_input',
+        'charset',
+        'hex_indicator',
+        'current_rotation',
+        'field_rotation',
+        'reverse_field',
+        'expecting_barcode',
+        'barcode_type',
+        'barcode_height',
+        'barcode_width_ratio',
+        'barcode_rotation',
+        'barcode_mode',
+        'barcode_interpretation',
+        'barcode_composite',
+        'barcode_module_size',
+        'barcode_module_height',
+        'barcode_options',
+        'default_barcode_height',
+        'module_width',
+        'field_number',
+        'field_data_seen',
+        'storing_format',
+        'format_start',
+        'format_stored',
+        'recalled_format',
+        'field_values',
+    )
+
+    def __init__(self, byte_input=False):
+        self.current_x = 0
+        self.current_y = 0
+        # True when the field origin was set by ^FT: barcodes then sit on it
+        # with their bottom-left corner
+        self.typeset = False
+        # ^CF default font; printers power up with font A at its base size
+        self.current_font_name = 'A'
+        self.current_font_size = 9
+        self.current_font_width = None
+        # (name, height, width) set by ^A for the next field only
+        self.field_font = None
+        # FieldBlock set by ^FB, or (width, height) set by ^TB
+        self.field_block = None
+        self.text_block = None
+        # True when the ZPL arrived as bytes, so field data holds one
+        # character per byte rather than Unicode text
+        self.byte_input = byte_input
+        # CharacterSet set by ^CI; None is the default set
+        self.charset = None
+        # ^FH escape character for the next field only
+        self.hex_indicator = None
+        self.current_rotation = 0
+        # Orientation set by ^A or ^TB for the next field only
+        self.field_rotation = None
+        self.reverse_field = False
+        self.expecting_barcode = False
+        self.barcode_type = None
+        self.barcode_height = None
+        self.barcode_width_ratio = 3.0
+        # Orientation, mode and interpretation line of the pending barcode
+        self.barcode_rotation = 0
+        self.barcode_mode = 'N'
+        self.barcode_interpretation = None
+        # True for ^BR, whose field data may append a composite component
+        self.barcode_composite = False
+        # Module size in dots (None to fit the ^BY height), row height of
+        # stacked symbologies and encoder arguments of a pending 2D barcode
+        self.barcode_module_size = None
+        self.barcode_module_height = None
+        self.barcode_options = ()
+        # ^BY bar height, used by barcode commands without a height
+        self.default_barcode_height = 10
+        self.module_width = 2
+        self.field_number = None
+        self.field_data_seen = False
+        self.storing_format = None
+        self.format_start = 0
+        self.format_stored = False
+        self.recalled_format = None
+        self.field_values = {}
+
+    def end_field(self):
+        """Reset the per-field settings at ^FS."""
+        self.reverse_field = False
+        self.expecting_barcode = False
+        self.field_font = None
+        self.field_rotation = None
+        self.field_block = None
+        self.text_block = None
+        self.hex_indicator = None
+        self.field_number = None
+        self.field_data_seen = False
@@ -1,90 +1,192 @@
 """Text-related ZPL command handlers."""
 
+import logging
+
 from ..elements.text import TextElement
+from ..encoding import character_set, decode_field_data, DEFAULT_HEX_INDICATOR
+from ..fonts import font_registry
+from ..glyphs import forget_font
+from ..layout import FieldBlock, JUSTIFICATIONS
+from ..objects import object_store, decode_object_data
+from ..serial import SerialNumber, SerialField
+from .schema import zpl_command, Int, Choice, Flag, Str, Data
+from .barcode import add_barcode_field
+
+logger = logging.getLogger(__name__)
+
+# Field orientation codes and the rotation they map to, in degrees clockwise
+ROTATIONS = {
+    'N': 0,    # Normal
+    'R': 90,   # Rotated 90° clockwise
+    'I': 180,  # Inverted (180°)
+    'B': 270,  # Bottom up (270°)
+}
+
+@zpl_command('FD', Data('data'))
+def handle_fd(state, label, data):
+    """Handle FD (Field Data) command."""
+    _add_field_data(state, label, decode_field_data(data, state.charset, state.hex_indicator, state.byte_input))
 
-def handle_fd(params, state, label):
-    """Handle FD (Field Data) command for text."""
-    if not params:
+def _add_field_data(state, label, data):
+    """Add the element of a field with decoded data."""
+    if state.field_number is not None and state.recalled_format is not None and state.storing_format is None:
+        # Data for a variable field of the recalled format
+        state.field_values[state.field_number] = data
         return
-        
-    data = params[0]  # The entire field data
     
-    if state.get('expecting_barcode'):
-        return  # Let barcode handler deal with this
+    state.field_data_seen = True
+    if state.expecting_barcode:
+        add_barcode_field(state, label, data)
+        return
         
+    font_name, font_size, font_width = state.field_font or (
+        state.current_font_name, state.current_font_size, state.current_font_width)
+    if len(font_registry):
+        resolved = font_registry.resolve(font_name)
+        if resolved != font_name:
+            # The field depends on a ^CW assignment that may change later
+            label.cacheable = False
+            font_name = resolved
+    block = state.field_block
+    if state.text_block is not None:
+        # A text block holds as many lines as fit its height
+        block_width, block_height = state.text_block
+        block = FieldBlock(block_width, max(block_height // max(font_size, 1), 1), 0, 'L', 0, True)
     text_element = TextElement(
-        state['current_x'],
-        state['current_y'],
+        state.current_x,
+        state.current_y,
         data,
-        font_size=state.get('current_font_size', 12),
-        bold=state.get('current_font_bold', False),
-        reverse=state.get('reverse_field', False),
-        rotation=state.get('current_rotation', 0)  # Pass the current rotation
+        font_size=font_size,
+        reverse=state.reverse_field,
+        rotation=state.current_rotation if state.field_rotation is None else state.field_rotation,
+        font_name=font_name,
+        font_width=font_width,
+        block=block
     )
-    label.add_element(text_element)
+    label.add_element(text_element, state.field_number)
+
+@zpl_command('SN', Str('start', '1'), Int('increment', 1, -99999999, 99999999), Flag('leading_zeros', False))
+def handle_sn(state, label, start, increment, leading_zeros):
+    """Handle SN (Serialization Data) command."""
+    count = len(label.elements)
+    start = decode_field_data(start, state.charset, state.hex_indicator, state.byte_input)
+    _add_field_data(state, label, start)
+    if len(label.elements) > count:
+        label.serials[count] = SerialNumber(start, increment, leading_zeros)
 
-def handle_fo(params, state, label):
+@zpl_command('SF', Str('mask', 'd'), Str('increment', '1'))
+def handle_sf(state, label, mask, increment):
+    """Handle SF (Serialization Field) command."""
+    if not state.field_data_seen or not label.elements:
+        return
+    index = len(label.elements) - 1
+    element = label.elements[index]
+    if element.data_field is not None:
+        label.serials[index] = SerialField(getattr(element, element.data_field), mask, increment)
+
+@zpl_command('FO', Int('x', 0, 0, 32000), Int('y', 0, 0, 32000), Choice('justification', '0', '012'))
+def handle_fo(state, label, x, y, justification):
     """Handle FO (Field Origin) command."""
-    if len(params) == 2:
-        state['current_x'], state['current_y'] = map(int, params)
+    state.current_x, state.current_y = x, y
+    state.typeset = False
 
-def handle_ft(params, state, label):
+@zpl_command('FT', Int('x', 0, 0, 32000), Int('y', 0, 0, 32000), Choice('justification', '0', '012'))
+def handle_ft(state, label, x, y, justification):
     """Handle FT (Field Typeset) command."""
-    if len(params) == 2:
-        state['current_x'], state['current_y'] = map(int, params)
+    state.current_x, state.current_y = x, y
+    state.typeset = True
 
-def handle_fs(params, state, label):
+@zpl_command('FS')
+def handle_fs(state, label):
     """Handle FS (Field Separator) command."""
-    state['reverse_field'] = False  # Reset reverse field after each field
+    if state.storing_format is not None and state.field_number is not None and not state.field_data_seen:
+        # A variable field of a stored format without default data
+        handle_fd(state, label, '')
+    state.end_field()
 
-def handle_fr(params, state, label):
+@zpl_command('FR')
+def handle_fr(state, label):
     """Handle FR (Field Reverse) command."""
-    state['reverse_field'] = True
-
-def handle_a0(params, state, label):
-    """Handle A0 (Font) command."""
-    if len(params) >= 3:
-        # Parse the font specifier which may include orientation
-        font_specifier = params[0]
-        font_width, font_height = params[1:3]
-        
-        # Extract the orientation code (N, R, I, B) from the font specifier
-        orientation = 'N'  # Default to normal orientation
-        if len(font_specifier) > 0:
-            orientation = font_specifier[-1]  # Last character is orientation
-        
-        # Set rotation based on orientation
-        if orientation == 'N':
-            state['current_rotation'] = 0  # Normal
-        elif orientation == 'R':
-            state['current_rotation'] = 90  # Rotated 90° clockwise
-        elif orientation == 'I':
-            state['current_rotation'] = 180  # Inverted (180°)
-        elif orientation == 'B':
-            state['current_rotation'] = 270  # Bottom up (270°)
-        
-        # Determine if the font should be bold (based on the font number)
-        is_bold = False
-        if len(font_specifier) > 0 and font_specifier[0] in ['0', '2', '4', '6', '8']:
-            is_bold = True
-        
-        # Set font size (ensure minimum font size of 12)
-        font_size = max(int(font_height), 12)
-        
-        state['current_font_size'] = font_size
-        state['current_font_bold'] = is_bold
+    state.reverse_field = True
+
+# Font names selectable with ^A<name> and ^CF
+FONT_NAMES = '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+
+def _font_handler(name):
+    """Create the handler of the ^A command for one font name."""
+    def handle_font(state, label, orientation, height, width):
+        state.field_rotation = ROTATIONS[orientation]
+        if height is None:
+            height = state.current_font_size
+            if width is None:
+                width = state.current_font_width
+        state.field_font = (name, height, width)
+    handle_font.__name__ = f"handle_a{name.lower()}"
+    handle_font.__doc__ = f"Handle A{name} (Font {name}) command."
+    return handle_font
+
+for _name in FONT_NAMES:
+    zpl_command('A' + _name, Choice('orientation', 'N', ROTATIONS), Int('height', None, 1, 32000),
+                Int('width', None, 1, 32000))(_font_handler(_name))
 
-def handle_cf(params, state, label):
+@zpl_command('CF', Str('font', None), Int('height', None, 1, 32000), Int('width', None, 1, 32000))
+def handle_cf(state, label, font, height, width):
     """Handle CF (Change Font) command."""
-    if len(params) >= 2:
-        state['current_font_size'] = int(params[1])
-
-def register_text_commands(registry):
-    """Register all text-related command handlers."""
-    registry.register('FD', handle_fd)
-    registry.register('FO', handle_fo)
-    registry.register('FT', handle_ft)
-    registry.register('FS', handle_fs)
-    registry.register('FR', handle_fr)
-    registry.register('A0', handle_a0)
-    registry.register('CF', handle_cf)
+    font = font.strip().upper()[:1] if font else ''
+    if font and font in FONT_NAMES:
+        state.current_font_name = font
+    if height is not None:
+        state.current_font_size = height
+        state.current_font_width = width
+    elif width is not None:
+        state.current_font_width = width
+
+@zpl_command('FB', Int('width', 0, 0, 9999), Int('max_lines', 1, 1, 9999), Int('spacing', 0, -9999, 9999),
+             Choice('justification', 'L', JUSTIFICATIONS), Int('indent', 0, 0, 9999))
+def handle_fb(state, label, width, max_lines, spacing, justification, indent):
+    """Handle FB (Field Block) command."""
+    state.field_block = FieldBlock(width, max_lines, spacing, justification, indent, False)
+
+@zpl_command('TB', Choice('orientation', 'N', ROTATIONS), Int('width', 0, 0, 32000), Int('height', 0, 0, 32000))
+def handle_tb(state, label, orientation, width, height):
+    """Handle TB (Text Block) command."""
+    state.field_rotation = ROTATIONS[orientation]
+    state.text_block = (width, height)
+
+@zpl_command('CW', Choice('font', None, FONT_NAMES), Str('name', None))
+def handle_cw(state, label, font, name):
+    """Handle CW (Font Identifier) command."""
+    label.cacheable = False
+    if font is None or not name:
+        return
+    font_registry.assign(font, name)
+
+@zpl_command('DU', Str('name', 'R:UNKNOWN.FNT'), Int('size', 0, 0), Data('data'))
+def handle_du(state, label, name, size, data):
+    """Handle DU (Download Unbounded TrueType Font) command."""
+    label.cacheable = False
+    font = decode_object_data(data, 'A', size)
+    if not font:
+        logger.warning(f"Could not decode font {name}")
+        return
+    forget_font(object_store.put(name, font, '.FNT'))
+
+@zpl_command('FH', Str('indicator', DEFAULT_HEX_INDICATOR))
+def handle_fh(state, label, indicator):
+    """Handle FH (Field Hexadecimal Indicator) command."""
+    state.hex_indicator = indicator[:1]
+
+@zpl_command('CI', Int('charset', 0, 0, 36), Data('remappings'))
+def handle_ci(state, label, charset, remappings):
+    """Handle CI (Change International Font/Encoding) command."""
+    values = []
+    for value in remappings.split(','):
+        value = value.strip()
+        if value.isdigit():
+            values.append(min(int(value), 255))
+    state.charset = character_set(charset, tuple(zip(values[::2], values[1::2])))
+
+@zpl_command('FX', Data('comment'))
+def handle_fx(state, label, comment):
+    """Handle FX (Comment) command."""
+    print("Comment: " + comment)
@@ -1,10 +1,13 @@
 """Core ZPL conversion functionality."""
 
 import os
-from .parser import parse_zpl
+import gzip
+from .parser import parse_zpl, iter_labels
+from .templates import TemplateDetector
+from .label import DEFAULT_MODE
 from .optimizer import optimize_image, optimize_zpl  # Add this import
 
-def convert_zpl_to_image(zpl_data, width=850, height=1200, dpi=203, optimize=False):
+def convert_zpl_to_image(zpl_data, width=850, height=1200, dpi=203, optimize=False, mode=DEFAULT_MODE):
     """Convert ZPL data to a PIL Image.
     
     Args:
@@ -13,6 +16,9 @@ def convert_zpl_to_image(zpl_data, width=850, height=1200, dpi=203, optimize=Fal
         height (int): Height of the output image in pixels
         dpi (int): Dots per inch resolution
         optimize (bool): Whether to apply optimization
+        mode (str): Canvas mode. The default '1' renders 1-bit black and
+            white as the printer would; 'L' keeps anti-aliased text and
+            'RGB' is for previews.
         
     Returns:
         PIL.Image: Rendered label image
@@ -28,7 +34,7 @@ def convert_zpl_to_image(zpl_data, width=850, height=1200, dpi=203, optimize=Fal
     label = parse_zpl(zpl_data, width, height, dpi)
     
     # Render the label
-    image = label.render()
+    image = label.render(mode)
     
     # Optimize the image if requested
     if optimize:
@@ -36,32 +42,98 @@ def convert_zpl_to_image(zpl_data, width=850, height=1200, dpi=203, optimize=Fal
     
     return image
 
-def convert_zpl_file_to_image(zpl_file, output_file=None, width=850, height=1200, dpi=203):
+def open_zpl_file(zpl_file):
+    """Open a ZPL file for streaming, transparently handling gzip.
+    
+    Args:
+        zpl_file (str): Path to a ZPL file, optionally ending in ``.gz``
+        
+    Returns:
+        file: A binary file object
+    """
+    if zpl_file.endswith('.gz'):
+        return gzip.open(zpl_file, 'rb')
+    return open(zpl_file, 'rb')
+
+def numbered_output_path(output_file, index):
+    """Return the output path for the label at ``index`` in a batch.
+    
+    ``output_file`` may contain an ``{index}`` placeholder; otherwise a
+    zero-padded index is inserted before the extension.
+    """
+    if '{index' in output_file:
+        return output_file.format(index=index)
+    root, ext = os.path.splitext(output_file)
+    return f"{root}_{index:05d}{ext or '.png'}"
+
+def _save_image(image, output_file):
+    """Save an image, creating the output directory if needed.
+    
+    1-bit images are written as 1-bit files: PNG and PBM natively, TIFF
+    with CCITT Group 4 compression.
+    """
+    directory = os.path.dirname(output_file)
+    if directory and not os.path.exists(directory):
+        os.makedirs(directory)
+    if image.mode == '1' and output_file.lower().endswith(('.tif', '.tiff')):
+        image.save(output_file, compression='group4')
+    else:
+        image.save(output_file)
+
+def _iter_file_images(zpl_file, width, height, dpi, detector, mode):
+    """Render every label in a ZPL file lazily, one image at a time."""
+    with open_zpl_file(zpl_file) as f:
+        for label in iter_labels(f, width, height, dpi, fingerprint=detector is not None):
+            if detector is not None:
+                detector.apply(label)
+            yield from label.render_copies(mode)
+
+def convert_zpl_file_to_image(zpl_file, output_file=None, width=850, height=1200, dpi=203, all_labels=False,
+                              detector=None, mode=DEFAULT_MODE):
     """Convert a ZPL file to an image file.
     
     Args:
-        zpl_file (str): Path to ZPL file
+        zpl_file (str): Path to ZPL file (``.gz`` files are decompressed on the fly)
         output_file (str, optional): Path to output image file. If None, returns the image object.
         width (int): Width of the output image in pixels
         height (int): Height of the output image in pixels
         dpi (int): Dots per inch resolution
+        all_labels (bool): Render every ^XA...^XZ block as its own image, one
+            per copy requested by ^PQ. The file is streamed and only one label
+            is held in memory at a time.
+            ``output_file`` is then used as a pattern (see ``numbered_output_path``).
+        detector (TemplateDetector, optional): Used with ``all_labels`` to share
+            static layers between labels of the same structure. A new detector
+            is used if None; pass one in to read its ``stats()`` afterwards.
+        mode (str): Canvas mode: '1' (default), 'L' or 'RGB'. 1-bit images
+            are saved as 1-bit PNG, PBM or Group 4 TIFF depending on the
+            extension of ``output_file``.
         
     Returns:
-        PIL.Image if output_file is None, otherwise None
+        PIL.Image if output_file is None, otherwise None. With ``all_labels``,
+        an iterator of images if output_file is None, otherwise the list of
+        written paths.
     """
-    # Read ZPL data from file
-    with open(zpl_file, 'r') as f:
-        zpl_data = f.read()
+    if all_labels:
+        if detector is None:
+            detector = TemplateDetector()
+        images = _iter_file_images(zpl_file, width, height, dpi, detector, mode)
+        if not output_file:
+            return images
+        paths = []
+        for index, image in enumerate(images, 1):
+            path = numbered_output_path(output_file, index)
+            _save_image(image, path)
+            paths.append(path)
+        return paths
     
-    # Convert ZPL data to image
-    image = convert_zpl_to_image(zpl_data, width, height, dpi)
+    # Stream ZPL data from file and convert it to an image
+    with open_zpl_file(zpl_file) as f:
+        image = parse_zpl(f, width, height, dpi).render(mode)
     
     # Save image or return it
     if output_file:
-        directory = os.path.dirname(output_file)
-        if directory and not os.path.exists(directory):
-            os.makedirs(directory)
-        image.save(output_file)
+        _save_image(image, output_file)
         return None
     else:
         return image
@@ -2,13 +2,14 @@
 
 from .base import BaseElement
 from .text import TextElement
-from .barcode import BarcodeElement
+from .barcode import LinearBarcodeElement, MatrixBarcodeElement
 from .graphic import BoxElement, LineElement, ImageElement, LogoElement
 
 __all__ = [
     'BaseElement',
     'TextElement',
-    'BarcodeElement',
+    'LinearBarcodeElement',
+    'MatrixBarcodeElement',
     'BoxElement',
     'LineElement',
     'ImageElement',
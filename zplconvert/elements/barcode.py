@@ -1,136 +1,200 @@
 """Barcode element classes for ZPL conversion."""
 
-import math
-from io import BytesIO
-from PIL import Image
-from pystrich.code128 import Code128Encoder
-from pystrich.datamatrix import DataMatrixEncoder
-from .base import BaseElement
-
-class BarcodeElement(BaseElement):
-    """Element for rendering barcodes on labels."""
-    
-    def __init__(self, x, y, data, width=300, height=100, barcode_type='code128', quality=200, width_ratio=3.0):
+from ..glyphs import get_atlas
+from ..symbologies import linear_pattern, matrix_symbol, matrix_mask
+from .base import BaseElement, BLACK, UNBOUNDED, field_box, intern_params, ink
+
+
+def _rotate_span(x0, y0, x1, y1, box, rotation):
+    """Map a rectangle inside an unrotated box to its rotated position."""
+    width, height = box
+    if rotation == 90:
+        return height - y1, x0, height - y0, x1
+    if rotation == 180:
+        return width - x1, height - y1, width - x0, height - y0
+    if rotation == 270:
+        return y0, width - x1, y1, width - x0
+    return x0, y0, x1, y1
+
+
+class LinearBarcodeElement(BaseElement):
+    """Element for rendering linear barcodes from a native encoder.
+
+    The bar pattern is drawn as filled rectangles ``module_width`` dots per
+    module, with wide elements of two-width symbologies ``ratio`` times as
+    wide, so the symbol is as wide as its data requires. The field origin
+    is the top-left corner of the symbol after rotation, including the
+    interpretation line.
+    """
+
+    __slots__ = ('data', 'symbol')
+    data_field = 'data'
+
+    def __init__(self, x, y, data, symbology='code128', mode='N', module_width=2, height=10, rotation=0,
+                 interpretation='below', ratio=3.0):
         super().__init__(x, y)
-        self.data = data
-        self.width = width
-        self.height = height
-        self.barcode_type = barcode_type
-        self.quality = quality
-        self.width_ratio = width_ratio
-
-    # Define a set of known GS1 Application Identifiers
-    GS1_AIS = {
-        '00', '01', '02', '10', '11', '12', '13', '15', '17', '20', 
-        '21', '22', '240', '241', '242', '250', '251', '253', '254', '255',
-        '30', '310', '311', '312', '313', '314', '315', '316', '320', '321', '322', '323', '324', '325', '326', '327', '328', '329',
-        '330', '331', '332', '333', '334', '335', '336', '337', '340', '341', '342', '343', '344', '345', '346', '347', '348', '349',
-        '350', '351', '352', '353', '354', '355', '356', '357', '360', '361', '362', '363', '364', '365', '366', '367', '368', '369',
-        '37', '390', '391', '392', '393', '394', '395', '400', '401', '402', '403',
-        '410', '411', '412', '413', '414', '415', '416', '417', '420', '421', '422', '423', '424', '425', '426', '427',
-        '7001', '7002', '7003', '7004', '7005', '7006', '7007', '7008', '7009', '7010',
-        '7020', '7021', '7022', '7023', '7030', '7031', '7032', '7033', '7034', '7035', '7036', '7037', '7038', '7039',
-        '710', '711', '712', '713', '714', '715', '723',
-        '8001', '8002', '8003', '8004', '8005', '8006', '8007', '8008', '8009', '8010', '8011', '8012', '8013', '8017', '8018', '8019',
-        '8020', '8026', '8110', '8111', '8112', '8200',
-        '90', '91', '92', '93', '94', '95', '96', '97', '98', '99'
-    }
-
-    def _format_gs1_128_data(self, data):
-        # Remove start and stop characters if present
-        if data.startswith('>;') and data.endswith('>;'):
-            data = data[2:-2]
-        
-        parts = data.split('>8')  # Split by the GS character
-        formatted_parts = []
-        for part in parts:
-            # Split each part by '>; ' in case there are multiple AIs within a GS section
-            subparts = part.split('>;')
-            for subpart in subparts:
-                if subpart.startswith(';'):
-                    # Remove the leading semicolon
-                    subpart = subpart[1:]
-                    # Find the longest matching AI
-                    ai = next((ai for ai in sorted(self.GS1_AIS, key=len, reverse=True) if subpart.startswith(ai)), None)
-                    if ai:
-                        value = subpart[len(ai):]
-                        formatted_parts.append(f'({ai}){value}')
-                    else:
-                        print(f"Warning: Unknown AI in part: {subpart}")
-                        formatted_parts.append(subpart)
-                elif subpart:  # Only add non-empty subparts
-                    formatted_parts.append(subpart)
-        
-        # Join all parts with the FNC1 character (ASCII 29) between them
-        return '\xf1' + '\xf1'.join(formatted_parts)
+        # Symbology settings are shared between all barcodes that use them
+        symbol = intern_params(symbology, mode, module_width, height, rotation, interpretation, ratio)
+        self._set(data=data, symbol=symbol)
+
+    @property
+    def symbology(self):
+        return self.symbol[0]
+
+    @property
+    def mode(self):
+        return self.symbol[1]
+
+    @property
+    def module_width(self):
+        return self.symbol[2]
+
+    @property
+    def height(self):
+        return self.symbol[3]
+
+    @property
+    def rotation(self):
+        return self.symbol[4]
+
+    @property
+    def interpretation(self):
+        """Position of the interpretation line: ``below``, ``above`` or None."""
+        return self.symbol[5]
+
+    @property
+    def ratio(self):
+        """Wide to narrow element ratio of two-width symbologies."""
+        return self.symbol[6]
+
+    @property
+    def pattern(self):
+        return linear_pattern(self.symbology, self.data, self.mode)
+
+    @property
+    def width(self):
+        return sum(self.pattern.spans(self.module_width, self.ratio))
+
+    def _line_atlas(self):
+        # Font A magnified by the module width
+        return get_atlas('A', 9 * self.module_width, 5 * self.module_width)
+
+    def _box(self, width, interpretation):
+        band = self._line_atlas().height + self.module_width if interpretation else 0
+        # The centred interpretation line may be wider than a short symbol
+        return field_box(self.x, self.y, width, self.height + band, self.rotation, band)
+
+    def bounds(self):
+        return self._box(self.width, self.interpretation and self.pattern.text)
+
+    def data_bounds(self):
+        return self._box(UNBOUNDED, self.interpretation)
 
     def draw(self, draw):
         try:
-            if self.barcode_type == 'datamatrix':
-                img = self._generate_datamatrix()
-                adjusted_y = self.y - (self.height - img.height)
-                draw._image.paste(img, (self.x, adjusted_y))
-            else:
-                # Existing logic for other barcode types
-                actual_type = 'gs1-128' if self.data.startswith('>;') and self.data.endswith('>;') else self.barcode_type
-                
-                if actual_type == 'gs1-128':
-                    barcode_image = self._generate_gs1_128()
-                elif actual_type == 'datamatrix':
-                    barcode_image = self._generate_datamatrix()
-                else:  # Default to Code 128
-                    barcode_image = self._generate_code_128()
-
-                # Resize the barcode image
-                barcode_image = barcode_image.resize((self.width, self.height), Image.NEAREST)
-
-                # Paste the barcode onto the label
-                draw._image.paste(barcode_image, (self.x, self.y))
-
-            print(f"Drew barcode: {self.data} at ({self.x}, {self.y}) with size {self.width}x{self.height}")
+            pattern = self.pattern
+            module_width = self.module_width
+            fill = ink(draw, BLACK)
+            spans = pattern.spans(module_width, self.ratio)
+            width = sum(spans)
+            bar_top, height = 0, self.height
+            guard_bottom = bar_top + self.height
+            atlas = None
+            if self.interpretation and pattern.text:
+                atlas = self._line_atlas()
+                band = atlas.height + module_width
+                if self.interpretation == 'above':
+                    bar_top = band
+                    guard_bottom = bar_top + self.height
+                else:
+                    # EAN/UPC guard bars reach halfway down the digits
+                    guard_bottom += band // 2
+                height += band
+            box = (width, height)
+            rotation = self.rotation
+            guards = pattern.guards
+
+            x0, y0 = self.x, self.y
+            x = 0
+            for index, span in enumerate(spans):
+                if index % 2 == 0 and span:
+                    bottom = guard_bottom if index in guards else bar_top + self.height
+                    left, top, right, bottom = _rotate_span(x, bar_top, x + span, bottom, box, rotation)
+                    draw.rectangle([x0 + left, y0 + top, x0 + right - 1, y0 + bottom - 1], fill=fill)
+                x += span
+
+            if atlas is not None:
+                text_y = 0 if bar_top else self.height + module_width
+                if pattern.groups:
+                    runs = [(text, (left + right) * module_width // 2 - atlas.text_width(text) // 2, text_y)
+                            for text, left, right in pattern.groups]
+                else:
+                    runs = [(pattern.text, (width - atlas.text_width(pattern.text)) // 2, text_y)]
+                atlas.draw_runs(draw, (x0, y0), runs, box, fill, rotation)
         except Exception as e:
-            print(f"Error drawing BarcodeElement: {str(e)}")
+            print(f"Error drawing LinearBarcodeElement: {str(e)}")
             import traceback
             traceback.print_exc()
 
-    def _generate_code_128(self):
-        encoder = Code128Encoder(self.data, options={'show_label': False})
-        return self._encoder_to_image(encoder)
 
-    def _generate_gs1_128(self):
-        formatted_data = self._format_gs1_128_data(self.data)
-        print("Raw data sent to encoder:")
-        print(' '.join(f'{ord(c):02X}' for c in formatted_data))  # Print hex values
-        print(''.join(c if ord(c) >= 32 and ord(c) <= 126 else '.' for c in formatted_data))  # Print ASCII
-        encoder = Code128Encoder(formatted_data, options={'mode': 'C', 'show_label': False})
-        return self._encoder_to_image(encoder)
+class MatrixBarcodeElement(BaseElement):
+    """Element for rendering 2D barcodes from a native encoder.
+
+    The module matrix is scaled by an integer module size and blitted with
+    its top-left corner at the field origin. Stacked symbologies set
+    ``module_height`` to their row height.
+    """
+
+    __slots__ = ('data', 'symbol')
+    data_field = 'data'
+
+    def __init__(self, x, y, data, symbology='datamatrix', module_size=1, rotation=0, options=(),
+                 module_height=None):
+        super().__init__(x, y)
+        # Symbology settings are shared between all barcodes that use them
+        symbol = intern_params(symbology, module_size, rotation, options, module_height)
+        self._set(data=data, symbol=symbol)
+
+    @property
+    def symbology(self):
+        return self.symbol[0]
+
+    @property
+    def module_size(self):
+        return self.symbol[1]
+
+    @property
+    def rotation(self):
+        return self.symbol[2]
 
-    def _generate_datamatrix(self):
+    @property
+    def options(self):
+        """Symbology specific encoder arguments."""
+        return self.symbol[3]
+
+    @property
+    def module_height(self):
+        """Module height in dots; the module size for square modules."""
+        return self.symbol[4] or self.symbol[1]
+
+    @property
+    def matrix(self):
+        return matrix_symbol(self.symbology, self.data, self.options)
+
+    def bounds(self):
+        width, height = matrix_mask(self.matrix, self.module_size, self.rotation, self.symbol[4]).size
+        return (self.x, self.y, self.x + width, self.y + height)
+
+    def data_bounds(self):
+        # The symbol grows right and down from its top-left corner
+        return (self.x, self.y, UNBOUNDED, UNBOUNDED)
+
+    def draw(self, draw):
         try:
-            if self.data.startswith('_1'):
-                # Remove the '_1' prefix before formatting
-                data_without_prefix = self.data[2:]
-                # Replace internal '_1' with FNC1 character (ASCII 29)
-                data_without_prefix = data_without_prefix.replace('_1', chr(29))
-                formatted_data = self._format_gs1_128_data(data_without_prefix)
-                # Remove the FNC1 character that _format_gs1_128_data adds at the start
-                formatted_data = formatted_data[1:]
-                # Add the GS1 FNC1 character (ASCII 232) at the start
-                gs1_data = chr(231) + formatted_data
-            else:
-                gs1_data = self.data
-            print(f"GS1 Data: {gs1_data}")
-            encoder = DataMatrixEncoder(gs1_data)
-            # Calculate the module size based on the quality (DPI)
-            module_size = math.ceil(self.quality / 25.4)  # Convert DPI to modules per mm
-            return self._encoder_to_image(encoder)
+            mask = matrix_mask(self.matrix, self.module_size, self.rotation, self.symbol[4])
+            draw.bitmap((self.x, self.y), mask, fill=ink(draw, BLACK))
         except Exception as e:
-            print(f"Error generating GS1 DataMatrix: {str(e)}")
-            # Return a blank image in case of error
-            return Image.new('RGB', (100, 100), color=(255, 255, 255))
-
-    def _encoder_to_image(self, encoder):
-        # Get the PNG data as bytes
-        png_data = encoder.get_imagedata()
-        # Create a PIL Image from the PNG data
-        return Image.open(BytesIO(png_data))
\ No newline at end of file
+            print(f"Error drawing MatrixBarcodeElement: {str(e)}")
+            import traceback
+            traceback.print_exc()
+
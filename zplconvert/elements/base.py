@@ -1,34 +1,146 @@
 """Base element class for ZPL elements."""
 
-import os
-from io import BytesIO
-from PIL import Image, ImageDraw, ImageFont
+_interned = {}
 
-class BaseElement:
-    """Base class for all ZPL elements."""
+BLACK = (0, 0, 0)
+WHITE = (255, 255, 255)
+
+# Extent of a field side that grows with its data
+UNBOUNDED = float('inf')
+
+def ink(draw, color):
+    """Return an element color as a fill value for the canvas being drawn on.
     
+    Elements keep RGB colors; on monochrome canvases (mode '1' or 'L') a
+    thermal printer can only print black or white, so colors are
+    thresholded at mid-grey.
+    """
+    if color is None or draw.mode == 'RGB' or isinstance(color, str):
+        return color
+    return 255 if sum(color) >= 383 else 0
+
+def intern_params(*params):
+    """Return a shared tuple for a combination of element parameters.
+
+    Labels repeat the same few font and barcode settings on every field, so
+    elements hold one shared tuple per combination instead of their own copy.
+    """
+    return _interned.setdefault(params, params)
+
+def field_box(x, y, width, height, rotation=0, margin=0):
+    """Return the ``(left, top, right, bottom)`` bounds of a field.
+
+    Args:
+        x, y: Field origin, the top-left corner after rotation
+        width, height: Size of the field before rotation; ``UNBOUNDED``
+            for a side that grows with the field data
+        rotation (int): Clockwise rotation, a multiple of 90 degrees
+        margin (int): Dots added on every side
+    """
+    if rotation in (90, 270):
+        width, height = height, width
+    return (x - margin, y - margin, x + width + margin, y + height + margin)
+
+def _rebuild(cls, values):
+    """Recreate an element from its slot values (used by pickle)."""
+    element = object.__new__(cls)
+    for name, value in zip(cls._fields(), values):
+        object.__setattr__(element, name, value)
+    return element
+
+class BaseElement:
+    """Base class for all ZPL elements.
+
+    Elements form an immutable display list: they use ``__slots__``, refuse
+    attribute assignment after construction and are cheap to pickle. Use
+    ``replace`` to derive a modified copy.
+    """
+
+    __slots__ = ('x', 'y')
+
+    # Name of the slot holding ^FD field data, for elements created from fields
+    data_field = None
+
     def __init__(self, x=0, y=0):
-        self.x = x
-        self.y = y
+        self._set(x=x, y=y)
+
+    def _set(self, **fields):
+        """Assign slot values during construction."""
+        for name, value in fields.items():
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is immutable; use replace()")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"{type(self).__name__} is immutable; use replace()")
+
+    @classmethod
+    def _fields(cls):
+        """Return the names of all slots, base classes first."""
+        fields = cls.__dict__.get('_field_names')
+        if fields is None:
+            fields = tuple(
+                name
+                for klass in reversed(cls.__mro__)
+                for name in klass.__dict__.get('__slots__', ())
+            )
+            type.__setattr__(cls, '_field_names', fields)
+        return fields
+
+    def _values(self):
+        return tuple(getattr(self, name) for name in self._fields())
+
+    def replace(self, **changes):
+        """Return a copy of the element with some slot values replaced."""
+        element = object.__new__(type(self))
+        for name in self._fields():
+            object.__setattr__(element, name, changes.pop(name) if name in changes else getattr(self, name))
+        if changes:
+            raise TypeError(f"Unknown fields for {type(self).__name__}: {', '.join(changes)}")
+        return element
+
+    def with_data(self, data):
+        """Return a copy of the element showing different field data."""
+        if self.data_field is None:
+            raise TypeError(f"{type(self).__name__} has no field data")
+        return self.replace(**{self.data_field: data})
+
+    def bounds(self):
+        """Return the ``(left, top, right, bottom)`` box the element draws in.
+
+        ``right`` and ``bottom`` are exclusive. None means the extent is
+        unknown and the element may cover the whole label.
+        """
+        return None
+
+    def data_bounds(self):
+        """Return a box that holds the element whatever its field data.
+
+        Used for variable fields, whose data changes from label to label.
+        Sides that grow with the data are ``UNBOUNDED``.
+        """
+        return self.bounds()
+
+    def __reduce__(self):
+        return (_rebuild, (type(self), self._values()))
+
+    def __eq__(self, other):
+        if type(other) is not type(self):
+            return NotImplemented
+        return self._values() == other._values()
+
+    def __hash__(self):
+        return hash((type(self), self._values()))
+
+    def __repr__(self):
+        fields = ', '.join(f"{name}={getattr(self, name)!r}" for name in self._fields())
+        return f"{type(self).__name__}({fields})"
 
     def draw(self, draw):
         """Draw the element on the given drawing context.
-        
-        Args:
-            draw: PIL.ImageDraw object
-        """
-        raise NotImplementedError("Subclasses must implement the draw method.")
 
-    def optimize_drawing(self, draw):
-        """Optimize the drawing process for the element.
-        
         Args:
             draw: PIL.ImageDraw object
         """
-        # Implement more efficient drawing techniques here
-        pass
-
-    def cache_element(self):
-        """Cache the element to avoid redundant processing."""
-        # Implement caching mechanism here
-        pass
+        raise NotImplementedError("Subclasses must implement the draw method.")
@@ -1,28 +1,32 @@
 """Graphic element classes for ZPL conversion."""
 
 import os
-import math
-from io import BytesIO
-from PIL import Image, ImageDraw, ImageFont
-from .base import BaseElement
+from PIL import Image
+from .base import BaseElement, BLACK, WHITE, ink
+from ..cache import LRUCache
+from ..utils.image import cached_decode_graphic_field, bitmap_to_image
 
 
 class LineElement(BaseElement):
     """Element for rendering lines on labels."""
     
+    __slots__ = ('width', 'height', 'thickness', 'line_color', 'reverse')
+    
     def __init__(self, x, y, width, height, thickness=1, line_color=(0, 0, 0), reverse=False):
         super().__init__(x, y)
-        self.width = width
-        self.height = height
-        self.thickness = thickness
-        self.line_color = line_color
-        self.reverse = reverse
+        self._set(width=width, height=height, thickness=thickness, line_color=line_color, reverse=reverse)
+
+    def bounds(self):
+        if self.width > self.height:
+            return (self.x, self.y, self.x + self.width, self.y + self.thickness)
+        return (self.x, self.y, self.x + self.thickness, self.y + self.height)
 
     def draw(self, draw):
         # Apply reverse effect to line color if needed
         line_color = self.line_color
         if self.reverse:
-            line_color = (255, 255, 255) if self.line_color == (0, 0, 0) else (0, 0, 0)
+            line_color = WHITE if self.line_color == BLACK else BLACK
+        line_color = ink(draw, line_color)
 
         if self.width > self.height:
             # Horizontal line
@@ -39,27 +43,39 @@ class LineElement(BaseElement):
 class BoxElement(BaseElement):
     """Element for rendering boxes on labels."""
     
+    __slots__ = ('width', 'height', 'thickness', 'line_color', 'fill_color', 'reverse')
+    
     def __init__(self, x, y, width, height, thickness=1, line_color=(0, 0, 0), fill_color=None, reverse=False):
         super().__init__(x, y)
-        self.width = max(width, 1)  # Ensure minimum width of 1
-        self.height = max(height, 1)  # Ensure minimum height of 1
-        self.thickness = thickness
-        self.line_color = line_color
-        self.fill_color = fill_color
-        self.reverse = reverse
+        self._set(
+            width=max(width, 1),  # Ensure minimum width of 1
+            height=max(height, 1),  # Ensure minimum height of 1
+            thickness=thickness,
+            line_color=line_color,
+            fill_color=fill_color,
+            reverse=reverse
+        )
+
+    def bounds(self):
+        return (self.x, self.y, self.x + self.width, self.y + self.height)
 
     def draw(self, draw):
         try:
+            line_color = self.line_color
+            fill_color = self.fill_color
             if self.reverse:
-                temp = self.line_color
-                self.line_color = self.fill_color or (255, 255, 255)
-                self.fill_color = temp
-
-            if self.fill_color:
-                draw.rectangle([self.x, self.y, self.x + self.width, self.y + self.height], fill=self.fill_color)
-
-            for i in range(self.thickness):
-                draw.rectangle([self.x + i, self.y + i, self.x + self.width - i, self.y + self.height - i], outline=self.line_color)
+                line_color, fill_color = fill_color or WHITE, line_color
+            line_color, fill_color = ink(draw, line_color), ink(draw, fill_color)
+
+            # Boxes span width x height dots; a border at least half the
+            # smaller side fills the box completely
+            box = [self.x, self.y, self.x + self.width - 1, self.y + self.height - 1]
+            if self.thickness * 2 >= min(self.width, self.height):
+                draw.rectangle(box, fill=line_color)
+            else:
+                if fill_color is not None:
+                    draw.rectangle(box, fill=fill_color)
+                draw.rectangle(box, outline=line_color, width=self.thickness)
 
         except Exception as e:
             import traceback
@@ -71,21 +87,41 @@ class BoxElement(BaseElement):
     def __repr__(self):
         return self.__str__()
 
+# Resized logo images keyed by (path, mtime, size), so logo files are read
+# once rather than on every draw
+_logo_cache = LRUCache(max_entries=32)
+
+def _load_logo(path, width, height):
+    """Return the logo at ``path`` resized to ``width`` x ``height``."""
+    key = (path, os.stat(path).st_mtime_ns, width, height)
+    logo = _logo_cache.get(key)
+    if logo is None:
+        with Image.open(path) as image:
+            logo = image.resize((width, height))
+        _logo_cache.put(key, logo)
+    return logo
+
 class LogoElement(BaseElement):
     """Element for rendering logo images on labels."""
     
+    __slots__ = ('image_path', 'width', 'height')
+    
     def __init__(self, x, y, image_path, width=None, height=None):
         super().__init__(x, y)
-        self.image_path = image_path
-        self.width = width if width is not None else 100  # Default width
-        self.height = height if height is not None else 100  # Default height
+        self._set(
+            image_path=image_path,
+            width=width if width is not None else 100,  # Default width
+            height=height if height is not None else 100  # Default height
+        )
+
+    def bounds(self):
+        # The placeholder outline reaches one dot further than the image
+        return (self.x, self.y, self.x + self.width + 1, self.y + self.height + 1)
 
     def draw(self, draw):
         try:
             if os.path.exists(self.image_path):
-                logo = Image.open(self.image_path)
-                logo = logo.resize((self.width, self.height))
-                draw._image.paste(logo, (self.x, self.y))
+                draw._image.paste(_load_logo(self.image_path, self.width, self.height), (self.x, self.y))
             else:
                 # Draw a placeholder
                 draw.rectangle([self.x, self.y, self.x + self.width, self.y + self.height], outline="black")
@@ -96,112 +132,55 @@ class LogoElement(BaseElement):
             draw.text((self.x + 5, self.y + self.height // 2), "Error", fill="red")
 
 class ImageElement(BaseElement):
-    """Element for rendering bitmap images on labels."""
+    """Element for rendering bitmap images on labels.
+    
+    The bitmap is stored packed, one bit per dot, rather than as the
+    source text of the graphic field.
+    """
     
-    def __init__(self, x, y, width, height, image_data, format='A'):
+    __slots__ = ('width', 'height', 'bitmap')
+    
+    def __init__(self, x, y, width, height, bitmap):
+        """Create an image element.
+        
+        Args:
+            x, y: Position of the top left corner
+            width (int): Width in dots
+            height (int): Height in dots
+            bitmap (bytes): Packed rows of ``(width + 7) // 8`` bytes; set bits are black
+        """
         super().__init__(x, y)
-        self.width = width
-        self.height = height
-        self.image_data = image_data
-        self.format = format
-        self.widthBytes = (width + 7) // 8
-        self.total = self.widthBytes * height
-        self.mapCode = self.initialize_map_code()
-        self._cache = None  # Initialize cache
-
-    @staticmethod
-    def initialize_map_code():
-        mapCode = {}
-        for i in range(1, 20):
-            mapCode[i] = chr(ord('G') + i - 1)
-        for i in range(20, 401, 20):
-            mapCode[i] = chr(ord('g') + (i // 20) - 1)
-        return mapCode
-
-    def gfa_to_image(self):
-        hex_data = self.ascii_to_hex(self.image_data)
-        binary_data = self.hex_to_binary(hex_data)
-        image = Image.new('1', (self.width, self.height))
-        pixels = image.load()
-
-        for y in range(self.height):
-            for x in range(self.width):
-                byte_index = (y * self.widthBytes) + (x // 8)
-                bit_index = 7 - (x % 8)
-                if byte_index < len(binary_data):
-                    pixel = (binary_data[byte_index] >> bit_index) & 1
-                    pixels[x, y] = 255 if pixel == 0 else 0  # 0 for black, 255 for white
-
-        return image
-
-    def ascii_to_hex(self, ascii_data):
-        hex_lines = []
-        current_line = ""
-        previous_line = ""
+        self._set(width=width, height=height, bitmap=bitmap)
+
+    @classmethod
+    def from_graphic_field(cls, x, y, width, height, image_data, format='A'):
+        """Create an image element from ^GF data.
         
-        for char in ascii_data:
-            if char in '0123456789ABCDEF':
-                current_line += char
-            elif char in self.mapCode.values():
-                count = next(key for key, value in self.mapCode.items() if value == char)
-                current_line += '0' * count
-            elif char == ',':
-                # Pad the current line to the full width before adding it
-                padded_line = self.pad_line(current_line)
-                if padded_line:
-                    hex_lines.append(padded_line)
-                    previous_line = padded_line
-                current_line = ""
-            elif char == ':':
-                if previous_line:
-                    hex_lines.append(previous_line)
-            # Ignore other characters
-
-        # Don't forget to add the last line if there's no trailing comma
-        if current_line:
-            padded_line = self.pad_line(current_line)
-            if padded_line:
-                hex_lines.append(padded_line)
-
-        return '\n'.join(hex_lines)
-
-    def pad_line(self, line):
-        # Calculate how many hex characters we need for a full line
-        full_line_length = self.widthBytes * 2
-        if len(line) > full_line_length:
-            # If the line is too long, truncate it
-            padded_line = line[:full_line_length]
-            return padded_line
-        elif len(line) < full_line_length:
-            # If the line is too short, pad it with '0's
-            padded_line = line.ljust(full_line_length, '0')
-            return padded_line
-        else:
-            # If the line is exactly the right length, return it as is
-            return line
-
-    def hex_to_binary(self, hex_data):
-        binary_data = bytearray()
-        for line in hex_data.split('\n'):
-            for i in range(0, len(line), 2):
-                if i + 1 < len(line):
-                    binary_data.append(int(line[i:i+2], 16))
-                else:
-                    binary_data.append(int(line[i] + '0', 16))
-        return binary_data
+        ASCII hex, binary and ``:B64:``/``:Z64:`` data are supported.
+        Decoded bitmaps are shared through ``utils.image.graphic_cache``.
+        
+        Returns:
+            ImageElement or None: None if the data cannot be decoded
+        """
+        bitmap = cached_decode_graphic_field(image_data, format, (width + 7) // 8, height)
+        if bitmap is None:
+            return None
+        return cls(x, y, width, height, bitmap)
+
+    def bounds(self):
+        return (self.x, self.y, self.x + self.width, self.y + self.height)
+
+    @property
+    def width_bytes(self):
+        return (self.width + 7) // 8
+
+    def to_image(self):
+        """Return the bitmap as a PIL image in mode '1'."""
+        return bitmap_to_image(self.bitmap, self.width, self.height)
 
     def draw(self, draw):
-        if self._cache:
-            draw._image.paste(self._cache, (self.x, self.y))
-            return
-
-        if self.format == 'A':  # ASCII format
-            try:
-                image = self.gfa_to_image()
-                draw._image.paste(image, (self.x, self.y))
-                self._cache = image  # Cache the image
-            except Exception as e:
-                import traceback
-                traceback.print_exc()
-        else:
-            pass
+        try:
+            draw._image.paste(self.to_image(), (self.x, self.y))
+        except Exception as e:
+            import traceback
+            traceback.print_exc()
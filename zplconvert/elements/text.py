@@ -1,83 +1,79 @@
-import os
-from PIL import Image, ImageFont, ImageDraw
-from .base import BaseElement
+from ..glyphs import get_atlas
+from ..layout import layout_block
+from .base import BaseElement, BLACK, WHITE, UNBOUNDED, field_box, intern_params, ink
 
 class TextElement(BaseElement):
-    """Element for rendering text on labels."""
+    """Element for rendering text on labels.
+
+    Text is drawn in a ZPL font (``A``-``H`` or ``0``) at a height and
+    optional width in dots, from the font's glyph atlas. Fields with a
+    ``FieldBlock`` are wrapped into the block.
+    """
+    
+    __slots__ = ('text', 'font', 'reverse', 'block')
+    data_field = 'text'
     
-    def __init__(self, x, y, text, font_size=12, bold=False, reverse=False, rotation=0):
+    def __init__(self, x, y, text, font_size=12, reverse=False, rotation=0, font_name='0', font_width=None,
+                 block=None):
         super().__init__(x, y)
-        self.text = text
-        self.font_size = font_size
-        self.bold = bold
-        self.reverse = reverse
-        self.rotation = rotation
-        self.font_path = self._get_font_path()
-        self._cache = None  # Initialize cache
+        # Font settings are shared between all fields that use them
+        font = intern_params(font_name, font_size, font_width, rotation)
+        self._set(text=text, font=font, reverse=reverse, block=block)
 
-    def _get_font_path(self):
-        base_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-        font_name = "RobotoCondensed-Bold.ttf" if self.bold else "RobotoCondensed-Regular.ttf"
-        font_path = os.path.join(base_dir, "fonts", font_name)
-        return font_path
+    @property
+    def font_name(self):
+        return self.font[0]
 
-    def draw(self, draw):
-        if self._cache:
-            draw._image.paste(self._cache, (self.x, self.y))
-            return
+    @property
+    def font_size(self):
+        return self.font[1]
+
+    @property
+    def font_width(self):
+        return self.font[2]
+
+    @property
+    def rotation(self):
+        return self.font[3]
 
+    @property
+    def atlas(self):
+        return get_atlas(self.font_name, self.font_size, self.font_width)
+
+    @property
+    def font_path(self):
+        return self.atlas.face
+
+    def bounds(self):
+        atlas = self.atlas
+        if self.block is None:
+            width, height = atlas.text_width(self.text), atlas.height
+        else:
+            layout = layout_block(self.text, self.font_name, self.font_size, self.font_width, self.block)
+            width, height = layout.width, layout.height
+        # Accents and descenders may reach beyond the character cell
+        return field_box(self.x, self.y, width, height, self.rotation, atlas.height // 2)
+
+    def data_bounds(self):
+        atlas = self.atlas
+        block = self.block
+        if block is None:
+            width, height = UNBOUNDED, atlas.height
+        else:
+            # Lines beyond the last one print over it, so the block never grows taller
+            width = block.width or UNBOUNDED
+            height = max((block.max_lines - 1) * (atlas.height + block.spacing) + atlas.height, atlas.height)
+        return field_box(self.x, self.y, width, height, self.rotation, atlas.height // 2)
+
+    def draw(self, draw):
         try:
-            font = ImageFont.truetype(self.font_path, self.font_size)
-            text_color = (255, 255, 255) if self.reverse else (0, 0, 0)
-            
-            # Get text dimensions using textbbox
-            bbox = draw.textbbox((0, 0), self.text, font=font)
-            text_width = bbox[2] - bbox[0]
-            text_height = bbox[3] - bbox[1]
-            
-            # Add padding to avoid text cutoff
-            padding = max(10, self.font_size // 2)
-            
-            # Draw according to rotation
-            if self.rotation == 0:
-                # Standard orientation
-                draw.text((self.x, self.y), self.text, font=font, fill=text_color, anchor="lt")
-            
-            elif self.rotation == 90:
-                # Rotate 90 degrees (clockwise)
-                # Create larger temp image with proper padding
-                temp_img = Image.new('RGBA', (text_height + padding*2, text_width + padding*2), (255, 255, 255, 0))
-                temp_draw = ImageDraw.Draw(temp_img)
-                
-                # Draw text in the center of the temp image
-                temp_draw.text((temp_img.width // 2, temp_img.height // 2), self.text, 
-                              font=font, fill=text_color, anchor="mm")
-                
-                # Rotate clockwise (270 degrees counter-clockwise is actually 90 degrees clockwise)
-                rotated = temp_img.rotate(270, expand=True, resample=Image.BICUBIC)
-                
-                # Adjust position to maintain alignment with original position - moved to the left
-                draw._image.paste(rotated, (self.x - padding, self.y - padding), rotated)
-            
-            elif self.rotation == 180:
-                # Rotate 180 degrees
-                temp_img = Image.new('RGBA', (text_width + padding*2, text_height + padding*2), (255, 255, 255, 0))
-                temp_draw = ImageDraw.Draw(temp_img)
-                temp_draw.text((temp_img.width // 2, temp_img.height // 2), self.text, 
-                              font=font, fill=text_color, anchor="mm")
-                rotated = temp_img.rotate(180, expand=True, resample=Image.BICUBIC)
-                draw._image.paste(rotated, (self.x - padding, self.y - padding), rotated)
-            
-            elif self.rotation == 270:
-                # Rotate 270 degrees (counter-clockwise)
-                temp_img = Image.new('RGBA', (text_height + padding * 2, text_width + padding * 2), (255, 255, 255, 0))
-                temp_draw = ImageDraw.Draw(temp_img)
-                temp_draw.text((temp_img.width // 2, temp_img.height // 2), self.text, 
-                               font=font, fill=text_color, anchor="mm")
-                rotated = temp_img.rotate(90, expand=True, resample=Image.BICUBIC)
-                draw._image.paste(rotated, (self.x - padding, self.y - padding), rotated)
-            
-            self._cache = temp_img  # Cache the rendered text image
+            text_color = ink(draw, WHITE if self.reverse else BLACK)
+            if self.block is None:
+                self.atlas.draw(draw, (self.x, self.y), self.text, text_color, self.rotation)
+                return
+            layout = layout_block(self.text, self.font_name, self.font_size, self.font_width, self.block)
+            self.atlas.draw_runs(draw, (self.x, self.y), layout.runs, (layout.width, layout.height),
+                                 text_color, self.rotation)
         except Exception as e:
             import traceback
             traceback.print_exc()
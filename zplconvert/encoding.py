@@ -0,0 +1,173 @@
+"""Field data decoding for ^FH hexadecimal escapes and ^CI character sets.
+
+ZPL that arrives as bytes reaches the handlers as latin-1 text, one
+character per input byte, so ``data.encode('latin-1')`` gives back the
+bytes the printer would have received and the code page of the active
+character set applies, ^CI0 (code page 850) by default. ZPL passed as
+``str`` is already Unicode: it prints unchanged unless a ^CI command or
+^FH asks for byte semantics. Then the text is encoded with the selected
+code page, or without ^CI its ^FH escapes stand for the characters
+U+0000-U+00FF.
+
+Decoding works on the bytes as a whole: ^FH escapes are replaced in one
+regex pass through a precomputed table, ^CI character remapping is a
+single ``bytes.translate`` and the code page is applied with one codec
+call. Labels repeat the same field values, so decoded values are cached.
+"""
+
+import re
+import codecs
+import logging
+from collections import namedtuple
+
+from .cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+# Python codecs for the ^CI character sets. Sets 0-12 are the international
+# variants of the USA set and use code page 850 above 127; their national
+# replacements of individual ASCII characters are not emulated.
+CODE_PAGES = dict.fromkeys(range(14), 'cp850')
+CODE_PAGES.update({
+    15: 'shift_jis',
+    16: 'euc_jp',
+    17: 'utf-16-be',
+    27: 'cp1252',
+    28: 'utf-8',
+    29: 'utf-16-be',
+    30: 'utf-16-le',
+    31: 'cp1250',
+    33: 'cp1251',
+    34: 'cp1253',
+    35: 'cp1254',
+    36: 'cp1255',
+})
+
+DEFAULT_CHARSET = 0
+DEFAULT_HEX_INDICATOR = '_'
+
+
+class CharacterSet(namedtuple('CharacterSet', 'number codec remap ascii')):
+    """An active ^CI character set.
+
+    ``remap`` is a ``bytes.translate`` table built from the ^CI character
+    remapping pairs, or None, and ``ascii`` tells whether ASCII text
+    decodes to itself.
+    """
+
+    __slots__ = ()
+
+
+_charsets = {}
+
+
+def character_set(number=DEFAULT_CHARSET, remappings=()):
+    """Return the ``CharacterSet`` for a ^CI command.
+
+    Args:
+        number (int): ^CI character set number
+        remappings (tuple): ``(source, destination)`` byte value pairs
+
+    Returns:
+        CharacterSet: A shared instance for the combination
+    """
+    key = (number, tuple(remappings))
+    charset = _charsets.get(key)
+    if charset is None:
+        codec = CODE_PAGES.get(number)
+        if codec is None:
+            logger.warning(f"Unsupported character set {number}; using code page 850")
+            codec = CODE_PAGES[DEFAULT_CHARSET]
+        remap = None
+        if remappings:
+            table = bytearray(range(256))
+            for source, destination in remappings:
+                table[source] = destination
+            remap = bytes(table)
+        ascii_compatible = codecs.lookup(codec).name not in ('utf-16-be', 'utf-16-le')
+        charset = _charsets.setdefault(key, CharacterSet(number, codec, remap, ascii_compatible and remap is None))
+    return charset
+
+
+# Every two-digit hex escape, in any case, and the byte it stands for
+_HEX_DIGITS = '0123456789abcdefABCDEF'
+_HEX_BYTES = {
+    (high + low).encode('ascii'): bytes((int(high + low, 16),))
+    for high in _HEX_DIGITS
+    for low in _HEX_DIGITS
+}
+
+_escape_patterns = {}
+_text_escape_patterns = {}
+
+
+def _escape_pattern(indicator):
+    pattern = _escape_patterns.get(indicator)
+    if pattern is None:
+        pattern = _escape_patterns[indicator] = re.compile(
+            re.escape(indicator.encode('latin-1', 'replace')) + rb'([0-9A-Fa-f]{2})'
+        )
+    return pattern
+
+
+def _text_escape_pattern(indicator):
+    pattern = _text_escape_patterns.get(indicator)
+    if pattern is None:
+        pattern = _text_escape_patterns[indicator] = re.compile(re.escape(indicator) + '([0-9A-Fa-f]{2})')
+    return pattern
+
+
+def _unescape(match):
+    return _HEX_BYTES[match.group(1)]
+
+
+def _unescape_text(match):
+    return chr(int(match.group(1), 16))
+
+
+def _decode(data, charset, hex_indicator, raw):
+    if raw:
+        raw_bytes = data.encode('latin-1')
+        if charset is None:
+            charset = character_set()
+    elif charset is None:
+        # Unicode text without ^CI: only the ^FH escapes are decoded
+        return _text_escape_pattern(hex_indicator).sub(_unescape_text, data)
+    else:
+        raw_bytes = data.encode(charset.codec, 'replace')
+    if hex_indicator is not None:
+        raw_bytes = _escape_pattern(hex_indicator).sub(_unescape, raw_bytes)
+    if charset.remap is not None:
+        raw_bytes = raw_bytes.translate(charset.remap)
+    return raw_bytes.decode(charset.codec, 'replace')
+
+
+# Decoded field values keyed by (data, character set, hex indicator, raw)
+decode_cache = LRUCache(max_entries=4096)
+
+
+def decode_field_data(data, charset=None, hex_indicator=None, raw=False):
+    """Decode ^FD data using the active ^FH and ^CI settings.
+
+    Args:
+        data (str): Field data as passed by the tokenizer
+        charset (CharacterSet, optional): Character set selected by ^CI;
+            None if there was no ^CI
+        hex_indicator (str, optional): ^FH escape character, or None if
+            ^FH is not in effect
+        raw (bool): Whether the ZPL arrived as bytes, so ``data`` holds one
+            character per byte; ``str`` input is Unicode text
+
+    Returns:
+        str: The text to print
+    """
+    if hex_indicator is None:
+        if charset is None and not raw:
+            return data
+        if (charset is None or charset.ascii) and data.isascii():
+            return data
+    key = (data, charset, hex_indicator, raw)
+    text = decode_cache.get(key)
+    if text is None:
+        text = decode_cache.put(key, _decode(data, charset, hex_indicator, raw))
+    return text
@@ -0,0 +1,165 @@
+"""Process-wide cache of loaded TrueType fonts and downloaded fonts."""
+
+import os
+import logging
+from io import BytesIO
+from PIL import ImageFont
+
+from .cache import LRUCache
+from .objects import object_store
+from .templates import normalize_object_name
+
+logger = logging.getLogger(__name__)
+
+FONT_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'fonts')
+
+# Faces used for scalable text
+REGULAR_FONT = os.path.join(FONT_DIR, 'RobotoCondensed-Regular.ttf')
+BOLD_FONT = os.path.join(FONT_DIR, 'RobotoCondensed-Bold.ttf')
+
+# Character heights (in dots) most labels use; loaded by glyphs.preload_fonts
+COMMON_SIZES = (12, 15, 18, 20, 22, 24, 25, 28, 30, 32, 35, 36, 40, 42, 44, 45, 48, 50, 60)
+
+# Baseline of the scalable font as a fraction of its height; capitals
+# fill the cell above it
+SCALABLE_BASELINE = 0.75
+
+# Memory cap of the font cache, counted in downloaded font data
+DEFAULT_FONT_CACHE_BYTES = 64 * 1024 * 1024
+
+# Extensions tried for a downloaded font whose name has none of its own
+FONT_EXTENSIONS = ('.FNT', '.TTF', '.TTE')
+
+
+def _font_size(font):
+    """Return the memory charged to a loaded font.
+
+    Fonts loaded from files are memory-mapped by FreeType and only count
+    towards the entry limit; downloaded fonts hold their data in memory.
+    """
+    return len(getattr(font, 'font_bytes', b''))
+
+
+# Loaded fonts keyed by (face, size). Parsing a TTF costs far more
+# than drawing a field with it, and labels use only a handful of sizes.
+font_cache = LRUCache(max_entries=512, max_bytes=DEFAULT_FONT_CACHE_BYTES, sizeof=_font_size)
+
+
+def font_stem(name):
+    """Return a downloaded font name without its extension, e.g. ``R:ARIAL``."""
+    return normalize_object_name(name, '').rpartition('.')[0] or normalize_object_name(name, '')
+
+
+class FontRegistry:
+    """Downloaded fonts and the font identifiers assigned to them with ^CW.
+
+    Fonts downloaded with ~DU or ~DY are kept as raw bytes in the printer
+    object store and opened from memory by ``get_font``, so each is parsed
+    once per size and shares the memory cap of ``font_cache``. Like the
+    object store, assignments last for the life of the process, as they
+    last until power-off on a printer.
+    """
+
+    def __init__(self, store=object_store):
+        self._store = store
+        self._aliases = {}
+
+    def __len__(self):
+        return len(self._aliases)
+
+    def assign(self, identifier, name):
+        """Assign a font identifier (``A``-``Z``, ``0``-``9``) to a downloaded font."""
+        name = normalize_object_name(name, '.FNT')
+        self._aliases[identifier] = name
+        logger.info(f"Assigned font {identifier} to {name}")
+        return name
+
+    def resolve(self, identifier):
+        """Return the downloaded font name assigned to an identifier, or the identifier."""
+        return self._aliases.get(identifier, identifier)
+
+    def aliases(self):
+        """Return the assignments as a dictionary."""
+        return dict(self._aliases)
+
+    def find(self, name):
+        """Return the stored name of a downloaded font, trying each font
+        extension in turn, or None if it is missing."""
+        name = normalize_object_name(name, FONT_EXTENSIONS[0])
+        stem = name.rpartition('.')[0]
+        for candidate in (name,) + tuple(stem + extension for extension in FONT_EXTENSIONS):
+            if isinstance(self._store.get(candidate), bytes):
+                return candidate
+        return None
+
+    def data(self, name):
+        """Return the bytes of a downloaded font, or None."""
+        if len(name) < 2 or name[1] != ':' or os.path.isabs(name):
+            return None
+        data = self._store.get(name)
+        return data if isinstance(data, bytes) else None
+
+    def forget(self, name):
+        """Drop the loaded sizes of a font that was downloaded, replaced or
+        deleted, under any of its font extensions."""
+        stem = font_stem(name)
+        for key in font_cache.keys():
+            if font_stem(key[0]) == stem:
+                font_cache.pop(key)
+        for face in list(_cap_ratios):
+            if font_stem(face) == stem:
+                del _cap_ratios[face]
+
+    def clear(self):
+        """Remove every assignment."""
+        self._aliases.clear()
+
+
+# Process-wide registry used by the parser
+font_registry = FontRegistry()
+
+
+def face_path(bold=False):
+    """Return the path of the scalable text face."""
+    return BOLD_FONT if bold else REGULAR_FONT
+
+
+def get_font(face, size):
+    """Return a loaded font, from ``font_cache`` when possible.
+
+    Fonts are loaded at their own proportions; glyph atlases scale them
+    horizontally for ^A character widths.
+
+    Args:
+        face (str): Path of a TrueType font file, or the name of a
+            downloaded font in the object store
+        size (int): Em size in dots
+
+    Returns:
+        PIL.ImageFont.FreeTypeFont: The font at ``size``
+    """
+    key = (face, size)
+    font = font_cache.get(key)
+    if font is None:
+        data = font_registry.data(face)
+        font = ImageFont.truetype(face if data is None else BytesIO(data), size)
+        font = font_cache.put(key, font)
+    return font
+
+
+# Cap height of each face as a fraction of its em size
+_cap_ratios = {}
+
+
+def _cap_ratio(face):
+    ratio = _cap_ratios.get(face)
+    if ratio is None:
+        top = get_font(face, 100).getbbox('H', anchor='ls')[1]
+        ratio = _cap_ratios[face] = -top / 100 or 0.7
+    return ratio
+
+
+def em_size(face, cap_height):
+    """Return the em size at which a face's capitals are ``cap_height`` tall."""
+    return max(int(cap_height / _cap_ratio(face) + 0.5), 1)
+
@@ -0,0 +1,387 @@
+"""Glyph atlases for the ZPL printer fonts.
+
+Labels print the same small alphabet (digits, capitals, a few symbols) at
+a handful of font settings. Rather than have FreeType shape and rasterize
+every string, each glyph is rasterized once per font setting into a
+``GlyphAtlas``; text is laid out from the cached advances and drawn by
+blitting the cached glyph bitmaps.
+
+ZPL describes fonts by their character cell in dots. The bitmap fonts A-H
+print at whole multiples of a fixed matrix and are drawn with a monospaced
+face fitted to that matrix. The scalable font 0 (CG Triumvirate Bold
+Condensed on a printer) is drawn with a condensed bold face whose height
+and width scale independently, as ``^A0N,h,w`` requires.
+"""
+
+import os
+import logging
+from collections import namedtuple
+from PIL import Image, ImageDraw
+
+from .cache import LRUCache
+from .fonts import (COMMON_SIZES, FONT_DIR, SCALABLE_BASELINE, em_size, face_path, font_cache, font_registry,
+                    font_stem, get_font)
+
+logger = logging.getLogger(__name__)
+
+# Face standing in for the bitmap fonts
+MONO_FONT = os.path.join(FONT_DIR, 'LiberationMono-Regular.ttf')
+
+
+class BitmapFont(namedtuple('BitmapFont', 'height width gap baseline uppercase')):
+    """Base matrix of a ZPL bitmap font at 203 dpi, in dots.
+
+    ``gap`` is the space between characters and ``baseline`` the distance
+    from the top of the cell to the baseline. Fonts marked ``uppercase``
+    have no lowercase letters.
+    """
+
+    __slots__ = ()
+
+
+BITMAP_FONTS = {
+    'A': BitmapFont(9, 5, 1, 7, False),
+    'B': BitmapFont(11, 7, 2, 11, True),
+    'C': BitmapFont(18, 10, 2, 14, False),
+    'D': BitmapFont(18, 10, 2, 14, False),
+    'E': BitmapFont(28, 15, 5, 23, False),
+    'F': BitmapFont(26, 13, 3, 21, False),
+    'G': BitmapFont(60, 40, 8, 48, False),
+    'H': BitmapFont(21, 13, 6, 21, True),
+}
+
+# Font used for names without a font of their own (resident fonts P-V,
+# unassigned names, missing downloaded fonts)
+SCALABLE_FONT = '0'
+
+# Lookup table thresholding an 'L' glyph into a '1' glyph
+_THRESHOLD = [0] * 128 + [255] * 128
+
+# Image.transpose operation for each clockwise rotation
+ROTATE_TRANSPOSE = {
+    90: Image.Transpose.ROTATE_270,
+    180: Image.Transpose.ROTATE_180,
+    270: Image.Transpose.ROTATE_90,
+}
+
+
+def _magnification(size, base):
+    """Return the whole magnification of a bitmap font dimension (1-10)."""
+    return min(max(int(size / base + 0.5), 1), 10)
+
+
+class Glyph(namedtuple('Glyph', 'mask left top advance')):
+    """A rasterized glyph: an 'L' coverage mask (None for blank glyphs),
+    its offset from the pen position at the top of the cell, and the
+    distance to the next pen position."""
+
+    __slots__ = ()
+
+
+class GlyphAtlas:
+    """Rasterized glyphs of one font at one height and width.
+
+    Glyphs are rasterized on first use and kept, together with their
+    1-bit variants, for the life of the atlas. A rotated field is composed
+    unrotated into one mask, which is rotated once and kept in
+    ``line_cache``.
+
+    Args:
+        face (str): Path of the TrueType face
+        size (int): Em size the face is rasterized at
+        baseline (int): Distance from the top of the cell to the baseline
+        height (int): Height of the character cell in dots
+        x_scale (float): Horizontal scale applied to the face
+        advance (int, optional): Fixed advance of every character, for
+            monospaced bitmap fonts; None uses the face's advances
+        uppercase (bool): Print lowercase letters as capitals
+    """
+
+    def __init__(self, face, size, baseline, height, x_scale=1.0, advance=None, uppercase=False):
+        self.face = face
+        self.size = size
+        self.baseline = baseline
+        self.height = height
+        self.x_scale = x_scale
+        self.advance = advance
+        self.uppercase = uppercase
+        self.font = get_font(face, size)
+        self._glyphs = {}
+        self._bitmaps = {}
+
+    def glyph(self, char):
+        """Return the ``Glyph`` for a character."""
+        glyph = self._glyphs.get(char)
+        if glyph is None:
+            glyph = self._glyphs[char] = self._rasterize(char)
+        return glyph
+
+    def _rasterize(self, char):
+        font = self.font
+        advance = font.getlength(char) * self.x_scale if self.advance is None else self.advance
+        left, top, right, bottom = font.getbbox(char, anchor='ls')
+        if right <= left or bottom <= top:
+            return Glyph(None, 0, 0, advance)
+        mask = Image.new('L', (right - left, bottom - top), 0)
+        ImageDraw.Draw(mask).text((-left, -top), char, font=font, fill=255, anchor='ls')
+        if self.x_scale != 1:
+            scaled_left = int(left * self.x_scale + 0.5)
+            width = max(int(right * self.x_scale + 0.5) - scaled_left, 1)
+            mask = mask.resize((width, mask.height), Image.BILINEAR)
+            left = scaled_left
+        return Glyph(mask, left, self.baseline + top, advance)
+
+    def bitmap(self, char, one_bit=False):
+        """Return the glyph mask of a character as blitted onto a canvas.
+
+        Args:
+            char (str): Character
+            one_bit (bool): Return a thresholded '1' mask, for 1-bit
+                canvases, instead of an anti-aliased 'L' mask
+        """
+        key = (char, one_bit)
+        bitmap = self._bitmaps.get(key)
+        if bitmap is None:
+            bitmap = self.glyph(char).mask
+            if bitmap is not None and one_bit:
+                bitmap = bitmap.point(_THRESHOLD, '1')
+            self._bitmaps[key] = bitmap
+        return bitmap
+
+    def layout(self, text):
+        """Lay out a line of text from the cached advances.
+
+        Returns:
+            tuple: ``(positions, width)``; ``positions`` holds a
+            ``(char, glyph, x, y)`` tuple per visible glyph relative to
+            the top-left of the cell, and ``width`` is the extent of the
+            line in dots
+        """
+        if self.uppercase:
+            text = text.upper()
+        positions = []
+        pen = 0.0
+        width = 0
+        for char in text:
+            glyph = self.glyph(char)
+            if glyph.mask is not None:
+                x = int(pen + 0.5) + glyph.left
+                positions.append((char, glyph, x, glyph.top))
+                width = max(width, x + glyph.mask.width)
+            pen += glyph.advance
+        return positions, max(width, int(pen + 0.5))
+
+    def text_width(self, text):
+        """Return the width of a line of text in dots."""
+        return self.layout(text)[1]
+
+    def measure(self, text):
+        """Return the sum of the advances of a text, in fractional dots."""
+        if self.uppercase:
+            text = text.upper()
+        glyph = self.glyph
+        return sum(glyph(char).advance for char in text)
+
+    def draw(self, draw, xy, text, fill, rotation=0):
+        """Blit a line of text onto a canvas.
+
+        The field origin ``xy`` is the top-left corner of the text's
+        bounding box after rotation, as for ^FO.
+
+        Args:
+            draw: PIL.ImageDraw object of the canvas
+            xy (tuple): Field origin
+            text (str): Text to draw
+            fill: Ink in the canvas mode
+            rotation (int): Clockwise rotation, a multiple of 90 degrees
+        """
+        if rotation:
+            self._blit_line(draw, xy, ((text, 0, 0),), None, fill, rotation)
+        else:
+            self._blit(draw, xy, self.layout(text)[0], fill)
+
+    def draw_runs(self, draw, xy, runs, box, fill, rotation=0):
+        """Blit runs of text laid out inside a box, such as a field block.
+
+        Args:
+            draw: PIL.ImageDraw object of the canvas
+            xy (tuple): Field origin, the top-left corner of the box after
+                rotation
+            runs (iterable): ``(text, x, y)`` tuples; each run is drawn as
+                one line with its cell's top-left corner at ``(x, y)``
+            box (tuple): Width and height of the box before rotation
+            fill: Ink in the canvas mode
+            rotation (int): Clockwise rotation, a multiple of 90 degrees
+        """
+        runs = tuple(runs)
+        if rotation:
+            self._blit_line(draw, xy, runs, tuple(box), fill, rotation)
+        else:
+            self._blit(draw, xy, self._positions(runs), fill)
+
+    def _positions(self, runs):
+        positions = []
+        for text, dx, dy in runs:
+            for char, glyph, x, y in self.layout(text)[0]:
+                positions.append((char, glyph, x + dx, y + dy))
+        return positions
+
+    def _blit(self, draw, xy, positions, fill):
+        one_bit = draw.mode == '1'
+        x0, y0 = xy
+        for char, glyph, x, y in positions:
+            draw.bitmap((x0 + x, y0 + y), self.bitmap(char, one_bit), fill=fill)
+
+    def _blit_line(self, draw, xy, runs, box, fill, rotation):
+        one_bit = draw.mode == '1'
+        key = (self, runs, box, rotation, one_bit)
+        line = line_cache.get(key)
+        if line is None:
+            line = line_cache.put(key, self._line_mask(runs, box, rotation, one_bit))
+        mask, x, y = line
+        if mask is not None:
+            draw.bitmap((xy[0] + x, xy[1] + y), mask, fill=fill)
+
+    def _line_mask(self, runs, box, rotation, one_bit):
+        """Compose rotated runs of text into one mask.
+
+        Args:
+            box (tuple): Width and height of the box before rotation;
+                None for a single run in a box as wide as its text
+
+        Returns:
+            tuple: ``(mask, x, y)``, the rotated mask and its offset from
+            the field origin; the mask is None if no glyph is visible
+        """
+        if box is None:
+            positions, width = self.layout(runs[0][0])
+            box = (width, self.height)
+        else:
+            positions = self._positions(runs)
+        if not positions:
+            return None, 0, 0
+
+        bitmaps = []
+        left = top = float('inf')
+        right = bottom = -left
+        for char, glyph, x, y in positions:
+            bitmap = self.bitmap(char, one_bit)
+            width, height = bitmap.size
+            left, top = min(left, x), min(top, y)
+            right, bottom = max(right, x + width), max(bottom, y + height)
+            bitmaps.append((x, y, bitmap))
+        mask = Image.new('1' if one_bit else 'L', (right - left, bottom - top), 0)
+        line = ImageDraw.Draw(mask)
+        for x, y, bitmap in bitmaps:
+            line.bitmap((x - left, y - top), bitmap, fill=255)
+        mask = mask.transpose(ROTATE_TRANSPOSE[rotation])
+
+        width, height = box
+        if rotation == 90:
+            return mask, height - bottom, left
+        if rotation == 180:
+            return mask, width - right, height - bottom
+        return mask, top, width - right
+
+
+def _line_size(line):
+    mask = line[0]
+    return mask.width * mask.height if mask is not None else 0
+
+
+# Rotated lines of text keyed by (atlas, runs, box, rotation, one_bit).
+# Composing a rotated field costs more than drawing its glyphs, so fields
+# printed again, like the captions of rotated labels, are blitted from here.
+line_cache = LRUCache(max_entries=1024, max_bytes=8 * 1024 * 1024, sizeof=_line_size)
+
+
+def create_atlas(name, height, width=None):
+    """Create the glyph atlas of a ZPL font.
+
+    Args:
+        name (str): Font name, ``A``-``H`` or ``0``, or the object name of
+            a downloaded font; other names use font 0
+        height (int): Character height in dots
+        width (int, optional): Character width in dots; None keeps the
+            font's own proportions
+
+    Returns:
+        GlyphAtlas: The atlas
+    """
+    spec = BITMAP_FONTS.get(name)
+    if spec is not None:
+        y_mag = _magnification(height, spec.height)
+        x_mag = y_mag if width is None else _magnification(width, spec.width)
+        baseline = spec.baseline * y_mag
+        size = em_size(MONO_FONT, baseline)
+        # Fit the face's advance to the width of the character matrix
+        x_scale = spec.width * x_mag / get_font(MONO_FONT, size).getlength('0')
+        return GlyphAtlas(MONO_FONT, size, baseline, spec.height * y_mag, x_scale,
+                          advance=(spec.width + spec.gap) * x_mag, uppercase=spec.uppercase)
+    face = face_path(True)
+    if len(name) > 1:
+        # A downloaded TrueType font, scaled like font 0
+        stored = font_registry.find(name)
+        if stored is None:
+            logger.warning(f"Downloaded font not found: {name}")
+        else:
+            face = stored
+    baseline = int(height * SCALABLE_BASELINE + 0.5)
+    x_scale = 1.0 if width is None else width / height
+    return GlyphAtlas(face, em_size(face, baseline), baseline, height, x_scale)
+
+
+# Glyph atlases keyed by (font name, height, width). Each holds the glyphs
+# of one font setting; labels use only a few settings.
+atlas_cache = LRUCache(max_entries=64)
+
+
+def get_atlas(name, height, width=None):
+    """Return the glyph atlas of a ZPL font, from ``atlas_cache`` when possible."""
+    key = (name, height, width)
+    atlas = atlas_cache.get(key)
+    if atlas is None:
+        atlas = atlas_cache.put(key, create_atlas(name, height, width))
+    return atlas
+
+
+def forget_font(name):
+    """Drop the atlases and loaded sizes of a downloaded font after it was
+    downloaded again or deleted."""
+    stem = font_stem(name)
+    for key in atlas_cache.keys():
+        if len(key[0]) > 1 and font_stem(key[0]) == stem:
+            atlas_cache.pop(key)
+    for key in line_cache.keys():
+        if font_stem(key[0].face) == stem:
+            line_cache.pop(key)
+    font_registry.forget(name)
+
+
+def preload_fonts(names=None, sizes=COMMON_SIZES):
+    """Load fonts ahead of the first label, e.g. before workers fork.
+
+    The atlas of each font name at each character height is created and
+    dropped, so exactly the faces and em sizes text at those heights is
+    drawn with stay in ``font_cache``. ``atlas_cache`` is left alone.
+
+    Args:
+        names (iterable, optional): ZPL font names; defaults to the
+            bitmap fonts and the scalable font
+        sizes (iterable): Character heights in dots
+
+    Returns:
+        int: Number of fonts loaded
+    """
+    if names is None:
+        names = sorted(BITMAP_FONTS) + [SCALABLE_FONT]
+    before = set(font_cache.keys())
+    for name in names:
+        for height in sizes:
+            try:
+                create_atlas(name, height)
+            except OSError as e:
+                logger.warning(f"Could not load font {name} at {height}: {e}")
+    loaded = len(set(font_cache.keys()) - before)
+    logger.info(f"Preloaded {loaded} fonts")
+    return loaded
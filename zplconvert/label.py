@@ -1,7 +1,68 @@
 """Label container for ZPL elements."""
 
+import threading
 from PIL import Image, ImageDraw
 
+# Canvas modes: '1' is what a thermal printer prints, 'L' keeps anti-aliased
+# text and 'RGB' is for previews
+RENDER_MODES = ('1', 'L', 'RGB')
+DEFAULT_MODE = '1'
+
+def new_canvas(width, height, mode=DEFAULT_MODE):
+    """Return a blank white canvas in one of ``RENDER_MODES``."""
+    if mode not in RENDER_MODES:
+        raise ValueError(f"Unsupported render mode {mode!r}; expected one of {', '.join(RENDER_MODES)}")
+    return Image.new(mode, (width, height), color='white')
+
+def draw_elements(image, elements):
+    """Draw a sequence of elements onto an image.
+    
+    Args:
+        image (PIL.Image): Canvas to draw on
+        elements: Iterable of BaseElement subclass instances
+        
+    Returns:
+        PIL.Image: The same image
+    """
+    draw = ImageDraw.Draw(image)
+    for element in elements:
+        try:
+            element.draw(draw)
+        except Exception as e:
+            print(f"Error drawing element {type(element).__name__}: {str(e)}")
+    return image
+
+class StaticLayer:
+    """Elements that are rasterized once and reused as the base of many labels.
+    
+    The rendered bitmap is cached per canvas size, resolution and mode; labels
+    that share the layer start from a copy of it and only draw their own
+    elements on top.
+    """
+    
+    max_images = 4
+    
+    def __init__(self, elements):
+        self.elements = tuple(elements)
+        self.renders = 0
+        self._images = {}
+        self._lock = threading.Lock()
+    
+    def render(self, width, height, dpi, mode=DEFAULT_MODE):
+        """Return the cached rendering of the layer. Do not modify it."""
+        key = (width, height, dpi, mode)
+        image = self._images.get(key)
+        if image is None:
+            with self._lock:
+                image = self._images.get(key)
+                if image is None:
+                    image = draw_elements(new_canvas(width, height, mode), self.elements)
+                    if len(self._images) >= self.max_images:
+                        self._images.clear()
+                    self._images[key] = image
+                    self.renders += 1
+        return image
+
 class Label:
     """Container for label elements."""
     
@@ -17,28 +78,97 @@ class Label:
         self.height = height
         self.dpi = dpi
         self.elements = []
+        # Maps element index -> ^FN field number for variable fields
+        self.field_numbers = {}
+        # Pre-rendered base layer drawn underneath the elements
+        self.static = None
+        # False if the label depends on state outside its own ZPL
+        self.cacheable = True
+        # Digest of the command sequence with field data masked, if computed
+        self.fingerprint = None
+        # Maps element index -> serializer (^SN/^SF) for serialized fields
+        self.serials = {}
+        # Copies to print (^PQ) and copies of each serial value
+        self.quantity = 1
+        self.replicates = 0
 
-    def add_element(self, element):
+    def add_element(self, element, field_number=None):
         """Add an element to the label.
         
         Args:
             element: A BaseElement subclass instance
+            field_number (int, optional): ^FN number if the element is a variable field
         """
+        if field_number is not None:
+            self.field_numbers[len(self.elements)] = field_number
         self.elements.append(element)
 
-    def render(self):
+    def copy(self, width=None, height=None, dpi=None):
+        """Return a label sharing this label's elements, optionally resized."""
+        label = Label(
+            self.width if width is None else width,
+            self.height if height is None else height,
+            self.dpi if dpi is None else dpi
+        )
+        label.elements.extend(self.elements)
+        label.field_numbers.update(self.field_numbers)
+        label.static = self.static
+        label.cacheable = self.cacheable
+        label.fingerprint = self.fingerprint
+        label.serials.update(self.serials)
+        label.quantity = self.quantity
+        label.replicates = self.replicates
+        return label
+
+    def render(self, mode=DEFAULT_MODE):
         """Render the label to an image.
         
+        Args:
+            mode (str): Canvas mode, one of ``RENDER_MODES``. The default
+                '1' draws directly in 1-bit black and white; use 'RGB' for
+                previews.
+        
         Returns:
             PIL.Image: The rendered label
         """
-        image = Image.new('RGB', (self.width, self.height), color='white')
-        draw = ImageDraw.Draw(image)
-        
-        for element in self.elements:
-            try:
-                element.draw(draw)
-            except Exception as e:
-                print(f"Error drawing element {type(element).__name__}: {str(e)}")
-                
-        return image
\ No newline at end of file
+        if self.static is not None:
+            image = self.static.render(self.width, self.height, self.dpi, mode).copy()
+        else:
+            image = new_canvas(self.width, self.height, mode)
+        return draw_elements(image, self.elements)
+
+
+    def render_copies(self, mode=DEFAULT_MODE):
+        """Render every copy requested by ^PQ, lazily.
+        
+        The elements before the first serialized field are rendered once;
+        each copy starts from that base raster and draws the rest, in
+        order, with the serialized fields' data for that copy.
+        
+        Args:
+            mode (str): Canvas mode, see ``render``
+        
+        Yields:
+            PIL.Image: One image per copy
+        """
+        if not self.serials:
+            image = self.render(mode)
+            for _ in range(self.quantity):
+                yield image.copy()
+            return
+        
+        first = min(self.serials)
+        base = Label(self.width, self.height, self.dpi)
+        base.elements = self.elements[:first]
+        base.static = self.static
+        base_image = base.render(mode)
+        
+        serials = self.serials
+        replicates = max(self.replicates, 1)
+        for copy in range(self.quantity):
+            step = copy // replicates
+            elements = [
+                element if index not in serials else element.with_data(serials[index].value(step))
+                for index, element in enumerate(self.elements[first:], first)
+            ]
+            yield draw_elements(base_image.copy(), elements)
@@ -0,0 +1,182 @@
+"""Line breaking for field blocks (^FB) and text blocks (^TB).
+
+A block's field data is split into paragraphs at ``\\&`` and each
+paragraph is wrapped greedily at spaces in a single pass: every word is
+measured once from the glyph atlas's cached advances and words longer than
+a line are broken between characters. The resulting layout depends only
+on the text, the font and the block, so it is memoized in ``layout_cache``
+and repeated blocks are laid out once.
+"""
+
+import re
+from collections import namedtuple
+
+from .cache import LRUCache
+from .glyphs import get_atlas
+
+# Field block justifications
+JUSTIFICATIONS = 'LCRJ'
+
+
+class FieldBlock(namedtuple('FieldBlock', 'width max_lines spacing justification indent clip')):
+    """Layout settings of a text block.
+
+    Args:
+        width (int): Width of the block in dots; 0 wraps only at ``\\&``
+        max_lines (int): Number of lines in the block
+        spacing (int): Dots added between lines (negative to remove)
+        justification (str): ``L``, ``C``, ``R`` or ``J`` (justified)
+        indent (int): Hanging indent of every line after the first
+        clip (bool): Drop lines beyond ``max_lines`` (^TB) instead of
+            printing them over the last line (^FB)
+    """
+
+    __slots__ = ()
+
+
+class BlockLayout(namedtuple('BlockLayout', 'runs width height')):
+    """Laid out block: ``(text, x, y)`` runs inside a ``width`` x ``height`` box."""
+
+    __slots__ = ()
+
+
+_BREAK = re.compile(r'(\\[&\\])')
+
+
+def split_paragraphs(text):
+    """Split field data at ``\\&`` line breaks; ``\\\\`` is a literal backslash."""
+    if '\\' not in text:
+        return [text]
+    paragraphs = []
+    current = []
+    for part in _BREAK.split(text):
+        if part == '\\&':
+            paragraphs.append(''.join(current))
+            current = []
+        elif part == '\\\\':
+            current.append('\\')
+        else:
+            current.append(part)
+    paragraphs.append(''.join(current))
+    return paragraphs
+
+
+def _break_word(atlas, word, available, first_available):
+    """Split a word wider than a line between characters.
+
+    Returns:
+        list: ``(text, width)`` pieces; all but the last fill a line
+    """
+    pieces = []
+    start = 0
+    pen = 0.0
+    limit = first_available
+    for index, char in enumerate(word):
+        advance = atlas.measure(char)
+        if pen + advance > limit and index > start:
+            pieces.append((word[start:index], pen))
+            start = index
+            pen = 0.0
+            limit = available
+        pen += advance
+    pieces.append((word[start:], pen))
+    return pieces
+
+
+def wrap_lines(atlas, text, width, indent=0):
+    """Wrap text into lines no wider than ``width``.
+
+    Args:
+        atlas (GlyphAtlas): Font the text is measured in
+        text (str): Field data, with ``\\&`` line breaks
+        width (int): Line width in dots; 0 or less breaks only at ``\\&``
+        indent (int): Indent of every line after the first
+
+    Returns:
+        list: ``(words, widths, width)`` per line: the line's words, their
+        widths and the width of the line with single spaces between words,
+        all in fractional dots
+    """
+    space = atlas.measure(' ')
+    lines = []
+    for paragraph in split_paragraphs(text):
+        words, widths, line_width = [], [], 0.0
+        for word in paragraph.split():
+            available = width - (indent if lines else 0)
+            word_width = atlas.measure(word)
+            if width > 0 and words and line_width + space + word_width > available:
+                lines.append((words, widths, line_width))
+                words, widths, line_width = [], [], 0.0
+                available = width - indent
+            if width > 0 and not words and word_width > available:
+                pieces = _break_word(atlas, word, width - indent, available)
+                lines.extend(([piece], [piece_width], piece_width) for piece, piece_width in pieces[:-1])
+                word, word_width = pieces[-1]
+            if words:
+                line_width += space
+            words.append(word)
+            widths.append(word_width)
+            line_width += word_width
+        lines.append((words, widths, line_width))
+    return lines
+
+
+def _layout_block(text, font_name, height, font_width, block):
+    atlas = get_atlas(font_name, height, font_width)
+    lines = wrap_lines(atlas, text, block.width, block.indent)
+    if len(lines) > block.max_lines and block.clip:
+        lines = lines[:block.max_lines]
+    box_width = block.width if block.width > 0 else int(max(line[2] for line in lines) + 0.5)
+    line_height = atlas.height + block.spacing
+    last = min(len(lines), block.max_lines) - 1
+    space = atlas.measure(' ')
+
+    runs = []
+    for number, (words, widths, line_width) in enumerate(lines):
+        # Lines beyond the last one print over it
+        y = min(number, last) * line_height
+        indent = block.indent if number else 0
+        extra = box_width - indent - line_width
+        justification = block.justification
+        if justification == 'J' and (number == len(lines) - 1 or len(words) < 2):
+            # The last line of a justified block stays left-aligned
+            justification = 'L'
+        if justification == 'J':
+            gap = space + extra / (len(words) - 1)
+            pen = float(indent)
+            for word, word_width in zip(words, widths):
+                runs.append((word, int(pen + 0.5), y))
+                pen += word_width + gap
+            continue
+        if justification == 'C':
+            x = indent + extra / 2
+        elif justification == 'R':
+            x = indent + extra
+        else:
+            x = indent
+        runs.append((' '.join(words), int(x + 0.5), y))
+    return BlockLayout(tuple(runs), box_width, max(last, 0) * line_height + atlas.height)
+
+
+# Block layouts keyed by (text, font, block); labels repeat the same blocks
+layout_cache = LRUCache(max_entries=2048)
+
+
+def layout_block(text, font_name, height, font_width, block):
+    """Lay out field data in a text block, using ``layout_cache``.
+
+    Args:
+        text (str): Field data
+        font_name (str): ZPL font name
+        height (int): Character height in dots
+        font_width (int, optional): Character width in dots
+        block (FieldBlock): Block settings
+
+    Returns:
+        BlockLayout: The runs of text and the size of the block
+    """
+    key = (text, font_name, height, font_width, block)
+    layout = layout_cache.get(key)
+    if layout is None:
+        layout = layout_cache.put(key, _layout_block(text, font_name, height, font_width, block))
+    return layout
@@ -0,0 +1,151 @@
+"""Emulated printer object store for downloaded graphics and fonts.
+
+Printers keep objects downloaded with ~DG or ~DY in drive memory (``R:``
+is RAM, ``E:`` and ``B:`` are flash) and later labels recall them by name
+with ^XG or ^IM. The store below plays that role for the renderer: it is
+shared by every label in the process, holds objects already decoded and
+evicts the least recently used ones once its memory cap is reached.
+"""
+
+import fnmatch
+import logging
+from collections import namedtuple
+from io import BytesIO
+
+from PIL import Image
+
+from .cache import LRUCache
+from .templates import normalize_object_name
+from .utils.image import decode_base64_graphic
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BYTES = 32 * 1024 * 1024
+
+# ~DY extension codes and the file extensions they stand for
+OBJECT_EXTENSIONS = {
+    'B': '.FNT',  # Bitmap font
+    'E': '.TTE',  # TrueType extension
+    'G': '.GRF',  # Raw bitmap graphic
+    'P': '.PNG',  # PNG image
+    'T': '.TTF',  # TrueType font
+}
+
+
+class StoredGraphic(namedtuple('StoredGraphic', 'bitmap width height')):
+    """A packed 1-bit bitmap; rows are ``(width + 7) // 8`` bytes and set bits are black."""
+
+    __slots__ = ()
+
+
+def _object_size(obj):
+    """Return the memory charged to a stored object."""
+    if isinstance(obj, StoredGraphic):
+        return len(obj.bitmap)
+    return len(obj)
+
+
+class ObjectStore:
+    """Downloaded printer objects by name, bounded by total size.
+
+    Graphics are stored as ``StoredGraphic`` bitmaps and other objects,
+    such as fonts, as their raw bytes.
+
+    Args:
+        max_bytes (int): Memory cap; least recently used objects are
+            evicted once it is exceeded
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self._objects = LRUCache(max_bytes=max_bytes, sizeof=_object_size)
+
+    def __len__(self):
+        return len(self._objects)
+
+    @property
+    def max_bytes(self):
+        return self._objects.max_bytes
+
+    @max_bytes.setter
+    def max_bytes(self, value):
+        self._objects.max_bytes = value
+
+    def put(self, name, obj, default_extension='.GRF'):
+        """Store an object, replacing any object with the same name."""
+        name = normalize_object_name(name, default_extension)
+        self._objects.put(name, obj)
+        logger.info(f"Stored object {name} ({_object_size(obj)} bytes)")
+        return name
+
+    def get(self, name, default_extension='.GRF'):
+        """Return the object with the given name, or None."""
+        return self._objects.get(normalize_object_name(name, default_extension))
+
+    def names(self):
+        """Return the names of all stored objects."""
+        return self._objects.keys()
+
+    def delete(self, pattern):
+        """Delete the objects matching a name pattern such as ``R:*.GRF``.
+
+        Returns:
+            int: Number of objects deleted
+        """
+        pattern = normalize_object_name(pattern, '.*')
+        deleted = 0
+        for name in self.names():
+            if fnmatch.fnmatchcase(name, pattern):
+                self._objects.pop(name)
+                deleted += 1
+        return deleted
+
+    def clear(self):
+        """Delete every object."""
+        self._objects.clear()
+
+    def stats(self):
+        """Return the store's counters as a dictionary."""
+        return self._objects.stats()
+
+
+# Process-wide store used by the parser
+object_store = ObjectStore()
+
+
+def decode_object_data(data, format, size):
+    """Return the raw bytes of ~DY object data.
+
+    Args:
+        data (str): Object data: ASCII hex, binary as latin-1 text, or
+            ``:B64:``/``:Z64:`` text
+        format (str): ~DY format, ``A`` (ASCII hex) or ``B``/``C`` (binary)
+        size (int): Declared size of the object in bytes
+
+    Returns:
+        bytes or None: None if the data cannot be decoded
+    """
+    if data.startswith((':Z64:', ':B64:')):
+        return decode_base64_graphic(data, size, 1)
+    if format == 'A':
+        try:
+            return bytes.fromhex(''.join(data.split()))[:size]
+        except ValueError as e:
+            logger.warning(f"Invalid hex object data: {e}")
+            return None
+    return data[:size].encode('latin-1', 'replace')
+
+
+def image_to_graphic(data):
+    """Decode an image file such as a PNG into a ``StoredGraphic``.
+
+    Transparent areas print white and anything darker than mid-grey
+    prints black.
+    """
+    image = Image.open(BytesIO(data))
+    if image.mode in ('RGBA', 'LA', 'P'):
+        image = image.convert('RGBA')
+        background = Image.new('RGBA', image.size, 'white')
+        image = Image.alpha_composite(background, image)
+    image = image.convert('L').point(lambda value: 255 if value >= 128 else 0, '1')
+    # The '1;I' raw mode packs black pixels as set bits
+    return StoredGraphic(image.tobytes('raw', '1;I'), image.width, image.height)
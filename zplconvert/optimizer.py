@@ -19,12 +19,12 @@ def optimize_image(image, quality=85, max_size=(800, 1200)):
     if image.width > max_size[0] or image.height > max_size[1]:
         image.thumbnail(max_size, Image.Resampling.BILINEAR)
         
-    # Convert to RGB if needed (for JPEG)
-    if image.mode != 'RGB':
+    # Convert to RGB if needed (for JPEG); monochrome renders stay monochrome
+    if image.mode not in ('1', 'L', 'RGB'):
         image = image.convert('RGB')
         
     # Create a new optimized image
-    optimized = Image.new('RGB', image.size, (255, 255, 255))
+    optimized = Image.new(image.mode, image.size, 'white')
     optimized.paste(image)
     
     return optimized
@@ -1,14 +1,96 @@
 """ZPL parser module."""
 
+import hashlib
+import io
 from .label import Label
-from .commands import create_command_registry
-from .optimizer import optimize_zpl
+from .cache import LRUCache
+from .commands import COMMANDS, ParserState
+from .tokenizer import tokenize
+from .templates import end_format
+
+# Parsed labels keyed by a digest of the ZPL text. Elements are immutable,
+# so one parse can back labels rendered at any size or DPI. Labels that use
+# stored formats depend on the template registry and are not cached.
+parse_cache = LRUCache(max_entries=128)
+
+# Commands whose text is masked out of label fingerprints
+FINGERPRINT_MASKED = frozenset(('FD', 'FV', 'FX'))
+
+def _fingerprint(parts):
+    """Return the digest of a label's masked command sequence."""
+    return hashlib.blake2b('\0'.join(parts).encode('utf-8', 'surrogatepass'), digest_size=16).digest()
+
+def _parse_labels(zpl_data, width, height, dpi, split_labels, fingerprint=False):
+    """Parse ZPL input and yield the labels it describes.
+    
+    Args:
+        zpl_data: ZPL commands as ``str``, bytes or a readable file object
+        width (int): Width of the label in pixels
+        height (int): Height of the label in pixels
+        dpi (int): Dots per inch resolution
+        split_labels (bool): Start a new label at every ^XA and yield it at
+            the matching ^XZ. If False, the whole input is one label.
+        fingerprint (bool): Set ``Label.fingerprint`` to a digest of the
+            label's command sequence with field data masked out
+        
+    Yields:
+        Label: Each populated label object
+    """
+    label = None
+    state = None
+    parts = [] if fingerprint else None
+    # Only bytes carry code page semantics; str input is already Unicode
+    byte_input = not isinstance(zpl_data, (str, io.TextIOBase))
+    
+    for token in tokenize(zpl_data):
+        cmd = token.command
+        spec = COMMANDS.get(cmd)
+        
+        if parts is not None:
+            parts.append(cmd if cmd in FINGERPRINT_MASKED else cmd + token.text)
+        
+        if cmd == 'XZ':  # End of label
+            if label is not None:
+                spec.handler(state, label)
+                if parts is not None:
+                    label.fingerprint = _fingerprint(parts)
+                    parts = []
+                if split_labels:
+                    if not state.format_stored:
+                        yield label
+                    label = None
+            continue
+        
+        if label is None or (split_labels and cmd == 'XA'):
+            label = Label(width, height, dpi)
+            state = ParserState(byte_input)
+        
+        if spec is None:
+            print(f"Unknown or unhandled command: {cmd}")
+            continue
+        
+        # Parse the parameters against the command's schema and dispatch
+        spec.handler(state, label, *spec.parse(token.source[token.start:token.end], token.delimiter))
+    
+    if label is None and not split_labels:
+        label = Label(width, height, dpi)
+    if state is not None and label is not None:
+        end_format(state, label)
+    if parts and label is not None:
+        label.fingerprint = _fingerprint(parts)
+    if label is not None and (label.elements or not split_labels):
+        yield label
 
 def parse_zpl(zpl_data, width=850, height=1200, dpi=203):
     """Parse ZPL data and return a Label object.
     
+    All commands in the input are drawn onto a single label. Use
+    ``iter_labels`` to split a spool into one label per ^XA...^XZ block.
+    ``str`` and bytes input is looked up in ``parse_cache`` first, so the
+    same ZPL is only tokenized and parsed once.
+    
     Args:
-        zpl_data (str): ZPL commands as text
+        zpl_data: ZPL commands as ``str``, bytes or a readable file object
         width (int): Width of the label in pixels
         height (int): Height of the label in pixels
         dpi (int): Dots per inch resolution
@@ -16,53 +98,39 @@ def parse_zpl(zpl_data, width=850, height=1200, dpi=203):
     Returns:
         Label: The populated label object
     """
-    # Optimize ZPL data before parsing
-    zpl_data = optimize_zpl(zpl_data)
+    if isinstance(zpl_data, str):
+        key = hashlib.blake2b(zpl_data.encode('utf-8', 'surrogatepass'), digest_size=16).digest()
+    elif isinstance(zpl_data, (bytes, bytearray, memoryview)):
+        key = b'b' + hashlib.blake2b(zpl_data, digest_size=16).digest()
+    else:
+        return next(_parse_labels(zpl_data, width, height, dpi, split_labels=False))
     
-    # Create a new label
-    label = Label(width, height, dpi)
+    cached = parse_cache.get(key)
+    if cached is None:
+        label = next(_parse_labels(zpl_data, width, height, dpi, split_labels=False))
+        if label.cacheable:
+            parse_cache.put(key, label.copy())
+        return label
     
-    # Create a command registry
-    registry = create_command_registry()
+    return cached.copy(width, height, dpi)
+
+def iter_labels(stream, width=850, height=1200, dpi=203, fingerprint=False):
+    """Parse a ZPL stream lazily, one label at a time.
     
-    # Initialize state
-    state = {
-        'current_x': 0,
-        'current_y': 0,
-        'current_font_size': 12,
-        'reverse_field': False,
-        'current_font_bold': False,
-        'current_rotation': 0,
-        'expecting_barcode': False,
-        'barcode_type': None,
-        'barcode_height': None,
-        'barcode_width': None,
-        'barcode_width_ratio': 3.0,
-    }
+    The stream is read in chunks and each label is yielded as soon as its
+    ^XZ is seen, so memory stays bounded by the largest single label no
+    matter how many labels the stream holds.
     
-    # Parse ZPL commands
-    commands = zpl_data.strip().split('^')
-    for command in commands:
-        if not command or command.startswith('XZ'):  # Empty or end of file
-            continue
-            
-        # Extract command and parameters
-        cmd = command[:2]
-        params = []
-        
-        if cmd == 'FD':
-            # For FD command, keep everything after 'FD' as a single string
-            params = [command[2:]]
-        else:
-            # For other commands, split by comma
-            params = command[2:].split(',')
+    Args:
+        stream: ZPL as ``str``, bytes or a readable file object, e.g. an
+            open file, ``gzip.open(...)`` or ``socket.makefile('rb')``
+        width (int): Width of each label in pixels
+        height (int): Height of each label in pixels
+        dpi (int): Dots per inch resolution
+        fingerprint (bool): Fingerprint each label's structure for
+            ``TemplateDetector``
         
-        # Special handling for FD command when expecting a barcode
-        if cmd == 'FD' and state.get('expecting_barcode'):
-            registry.handle('FD_BARCODE', params, state, label)
-        else:
-            # Handle the command
-            if not registry.handle(cmd, params, state, label):
-                print(f"Unknown or unhandled command: {cmd}")
-    
-    return label
+    Yields:
+        Label: One populated label per ^XA...^XZ block
+    """
+    return _parse_labels(stream, width, height, dpi, split_labels=True, fingerprint=fingerprint)
@@ -0,0 +1,118 @@
+"""Serialized field data for ^SN and ^SF.
+
+A serialized field is printed with different data on each copy requested
+by ^PQ. The field's element is created once with the starting value; the
+serializers below compute the data for any later copy directly, so copies
+can be rendered lazily and in any order.
+"""
+
+import re
+
+_TRAILING_NUMBER = re.compile(r'(\d+)(\D*)$')
+
+# ^SF mask characters and the digits they count through
+MASK_DIGITS = {
+    'D': '0123456789',
+    'H': '0123456789ABCDEF',
+    'O': '01234567',
+    'A': 'ABCDEFGHIJKLMNOPQRSTUVWXYZ',
+    'N': '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ',
+}
+
+
+class SerialNumber:
+    """Serialization data (^SN): the rightmost number in the data counts.
+
+    Args:
+        start (str): Data of the first copy
+        increment (int): Added per serial step; may be negative
+        leading_zeros (bool): Keep the number zero-padded to its original width
+    """
+
+    __slots__ = ('prefix', 'number', 'suffix', 'width', 'increment', 'leading_zeros')
+
+    def __init__(self, start, increment=1, leading_zeros=False):
+        match = _TRAILING_NUMBER.search(start)
+        if match is None:
+            self.prefix, self.number, self.suffix, self.width = start, None, '', 0
+        else:
+            self.prefix = start[:match.start()]
+            self.number = int(match.group(1))
+            self.suffix = match.group(2)
+            self.width = len(match.group(1))
+        self.increment = increment
+        self.leading_zeros = leading_zeros
+
+    def value(self, step):
+        """Return the field data after ``step`` serial increments."""
+        if self.number is None:
+            return self.prefix
+        number = self.number + step * self.increment
+        if self.leading_zeros:
+            text = str(abs(number)).zfill(self.width)
+            if number < 0:
+                text = '-' + text
+        else:
+            text = str(number)
+        return f"{self.prefix}{text}{self.suffix}"
+
+
+class SerialField:
+    """Serialization field (^SF): a mask selects and typesets the counting digits.
+
+    The mask and increment are aligned to the right end of the data. Each
+    mask character gives the radix of its position (``D`` decimal, ``H``
+    hex, ``O`` octal, ``A`` letters, ``N`` alphanumeric; lowercase for
+    lowercase output) and ``%`` leaves a character unchanged. Carries
+    propagate leftwards across the masked positions and wrap at the top.
+
+    Args:
+        data (str): Data of the first copy
+        mask (str): Serialization mask
+        increment (str): Increment, typeset in the same mask
+    """
+
+    __slots__ = ('data', 'positions', 'start', 'step', 'modulus')
+
+    def __init__(self, data, mask, increment='1'):
+        mask = mask[-len(data):] if data else ''
+        offset = len(data) - len(mask)
+        # (index into data, digits) for each serialized position, rightmost first
+        self.positions = []
+        for index in range(len(mask) - 1, -1, -1):
+            digits = MASK_DIGITS.get(mask[index].upper())
+            if digits is not None:
+                if mask[index].islower():
+                    digits = digits.lower()
+                self.positions.append((offset + index, digits))
+        self.data = data
+        self.start = self._to_int(data, 0)
+        self.step = self._to_int(increment, len(data) - len(increment))
+        self.modulus = 1
+        for _, digits in self.positions:
+            self.modulus *= len(digits)
+
+    def _to_int(self, text, offset):
+        """Read the masked positions of ``text`` as a mixed-radix number."""
+        value = 0
+        scale = 1
+        for index, digits in self.positions:
+            index -= offset
+            if 0 <= index < len(text):
+                digit = digits.find(text[index])
+                if digit < 0:
+                    digit = digits.upper().find(text[index].upper())
+                value += max(digit, 0) * scale
+            scale *= len(digits)
+        return value
+
+    def value(self, step):
+        """Return the field data after ``step`` serial increments."""
+        if not self.positions:
+            return self.data
+        number = (self.start + step * self.step) % self.modulus
+        chars = list(self.data)
+        for index, digits in self.positions:
+            number, digit = divmod(number, len(digits))
+            chars[index] = digits[digit]
+        return ''.join(chars)
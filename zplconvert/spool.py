@@ -0,0 +1,237 @@
+"""Random access to individual labels in large ZPL spool files."""
+
+import os
+import mmap
+import struct
+import logging
+from array import array
+
+from .exceptions import ZPLConvertError
+from .parser import iter_labels
+from .label import DEFAULT_MODE
+from .tokenizer import tokenize, tokenize_with_offsets
+
+logger = logging.getLogger(__name__)
+
+INDEX_SUFFIX = '.zidx'
+_INDEX_MAGIC = b'ZPLIDX2\x00'
+# Magic, spool size, spool mtime in ns, label count, stored format count
+_INDEX_HEADER = struct.Struct('<8sQqQQ')
+
+
+class SpoolIndex:
+    """Byte spans of the labels and stored formats in a spool file.
+
+    The spans are the ^XA...^XZ blocks as the parser sees them, so label
+    ``n`` is the ``n``-th label yielded by ``iter_labels``: ^XA or ^XZ
+    bytes inside binary graphic payloads do not split labels, and ^DF
+    blocks, which store a format instead of printing, are kept apart in
+    ``formats``. Each span is a start and end offset (16 bytes per label).
+
+    A label is read on its own, so it starts with the default prefix
+    characters and does not see objects downloaded outside ^XA...^XZ
+    (e.g. ~DG). Formats it recalls with ^XF are loaded by replaying the
+    ^DF blocks that precede it.
+    """
+
+    def __init__(self, path, labels, formats, size, mtime_ns):
+        self.path = path
+        # Flat (start, end) offset pairs
+        self.labels = labels
+        self.formats = formats
+        self.size = size
+        self.mtime_ns = mtime_ns
+
+    def __len__(self):
+        return len(self.labels) // 2
+
+    @property
+    def sidecar_path(self):
+        """Path of the sidecar file the index is persisted to."""
+        return self.path + INDEX_SUFFIX
+
+    def is_current(self):
+        """Return True if the spool file is unchanged since indexing."""
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return False
+        return stat.st_size == self.size and stat.st_mtime_ns == self.mtime_ns
+
+    @classmethod
+    def build(cls, path):
+        """Tokenize a spool file and record its label boundaries.
+
+        The file is memory-mapped and tokenized in chunks, so it is never
+        read into memory as a whole. Labels start at ^XA, or at the first
+        command after the previous ^XZ, and end at ^XZ; an unterminated
+        ^XA block at the end of the file is a label as well.
+
+        Args:
+            path (str): Path to an uncompressed ZPL spool file
+
+        Returns:
+            SpoolIndex: The freshly built index
+        """
+        stat = os.stat(path)
+        labels = array('Q')
+        formats = array('Q')
+        if stat.st_size:
+            with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                start = None
+                started_by_xa = stores_format = False
+                for offset, token in tokenize_with_offsets(mm):
+                    command = token.command
+                    if command == 'XA' or start is None:
+                        # The parameters follow the prefix and the command code
+                        start = offset + token.start - 3
+                        started_by_xa = command == 'XA'
+                        stores_format = False
+                    if command == 'DF':
+                        stores_format = True
+                    elif command == 'XZ':
+                        (formats if stores_format else labels).extend((start, offset + token.end))
+                        start = None
+                if start is not None and started_by_xa:
+                    (formats if stores_format else labels).extend((start, len(mm)))
+        logger.info(f"Indexed {len(labels) // 2} labels and {len(formats) // 2} stored formats in {path}")
+        return cls(path, labels, formats, stat.st_size, stat.st_mtime_ns)
+
+    @classmethod
+    def load(cls, path):
+        """Load the sidecar index for a spool file if it is still valid.
+
+        Args:
+            path (str): Path to the spool file (not the sidecar)
+
+        Returns:
+            SpoolIndex or None: The index, or None if the sidecar is
+            missing, unreadable or out of date.
+        """
+        try:
+            with open(path + INDEX_SUFFIX, 'rb') as f:
+                magic, size, mtime_ns, label_count, format_count = _INDEX_HEADER.unpack(
+                    f.read(_INDEX_HEADER.size))
+                if magic != _INDEX_MAGIC:
+                    return None
+                labels = array('Q')
+                labels.fromfile(f, 2 * label_count)
+                formats = array('Q')
+                formats.fromfile(f, 2 * format_count)
+        except (OSError, EOFError, struct.error):
+            return None
+        index = cls(path, labels, formats, size, mtime_ns)
+        return index if index.is_current() else None
+
+    def save(self):
+        """Write the index to its sidecar file next to the spool."""
+        with open(self.sidecar_path, 'wb') as f:
+            f.write(_INDEX_HEADER.pack(_INDEX_MAGIC, self.size, self.mtime_ns, len(self), len(self.formats) // 2))
+            self.labels.tofile(f)
+            self.formats.tofile(f)
+
+    def read_label(self, n):
+        """Return the raw bytes of label ``n``.
+
+        Args:
+            n (int): Zero-based label number; negative values count from the end
+
+        Returns:
+            bytes: The ZPL from ^XA up to and including ^XZ
+        """
+        start, end = self._label_span(n)
+        with open(self.path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return mm[start:end]
+
+    def read_formats(self, n):
+        """Return the raw bytes of the ^DF blocks that precede label ``n``.
+
+        Args:
+            n (int): Zero-based label number; negative values count from the end
+
+        Returns:
+            list: The ^XA...^XZ blocks storing formats, in spool order
+        """
+        start = self._label_span(n)[0]
+        formats = self.formats
+        with open(self.path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return [mm[formats[i]:formats[i + 1]] for i in range(0, len(formats), 2) if formats[i] < start]
+
+    def _label_span(self, n):
+        count = len(self)
+        if not -count <= n < count:
+            raise IndexError(f"Label {n} is out of range; {self.path} has {count} labels")
+        n %= count
+        return self.labels[2 * n], self.labels[2 * n + 1]
+
+
+def open_spool_index(path, rebuild=False):
+    """Return an up-to-date index for a spool file.
+
+    A sidecar index is reused when the spool's size and mtime match the
+    ones it was built for; otherwise the spool is rescanned and the sidecar
+    rewritten.
+
+    Args:
+        path (str): Path to an uncompressed ZPL spool file
+        rebuild (bool): Ignore any existing sidecar
+
+    Returns:
+        SpoolIndex: The index for ``path``
+    """
+    if path.endswith('.gz'):
+        raise ZPLConvertError(f"Cannot index compressed spool {path}; decompress it first")
+
+    index = None if rebuild else SpoolIndex.load(path)
+    if index is None:
+        index = SpoolIndex.build(path)
+        try:
+            index.save()
+        except OSError as e:
+            logger.warning(f"Could not write spool index {index.sidecar_path}: {e}")
+    return index
+
+
+def parse_label_at(path, n, width=850, height=1200, dpi=203):
+    """Parse only label ``n`` of a spool file.
+
+    Labels are numbered as ``iter_labels`` yields them: stored formats
+    are not counted and a label printed in several ^PQ copies counts once.
+
+    Args:
+        path (str): Path to an uncompressed ZPL spool file
+        n (int): Zero-based label number; negative values count from the end
+        width (int): Width of the label in pixels
+        height (int): Height of the label in pixels
+        dpi (int): Dots per inch resolution
+
+    Returns:
+        Label: The populated label object
+    """
+    index = open_spool_index(path)
+    data = index.read_label(n)
+    if any(token.command == 'XF' for token in tokenize(data)):
+        # Store the formats the label recalls, as printing the spool would
+        for stored_format in index.read_formats(n):
+            for _ in iter_labels(stored_format, width, height, dpi):
+                pass
+    for label in iter_labels(data, width, height, dpi):
+        return label
+    raise ZPLConvertError(f"Label {n} of {path} is empty")
+
+
+def render_label_at(path, n, width=850, height=1200, dpi=203, mode=DEFAULT_MODE):
+    """Render only label ``n`` of a spool file.
+
+    Args:
+        path (str): Path to an uncompressed ZPL spool file
+        n (int): Zero-based label number; negative values count from the end
+        width (int): Width of the output image in pixels
+        height (int): Height of the output image in pixels
+        dpi (int): Dots per inch resolution
+        mode (str): Canvas mode: '1' (default), 'L' or 'RGB'
+
+    Returns:
+        PIL.Image: Rendered label image
+    """
+    return parse_label_at(path, n, width, height, dpi).render(mode)
@@ -0,0 +1,193 @@
+"""Native barcode encoders.
+
+Each encoder turns field data into the modules of a symbol: linear
+symbologies produce run-length bar patterns and the renderer draws them
+as filled spans at the ^BY module width, with no intermediate images;
+2D symbologies produce a module matrix that is scaled by an integer
+module size into a mask and blitted. Stacked symbologies such as PDF417
+have one matrix row per symbol row, scaled by their own row height.
+"""
+
+from collections import namedtuple
+
+from PIL import Image
+
+from ..cache import LRUCache
+from ..glyphs import ROTATE_TRANSPOSE
+from . import aztec, code128, databar, datamatrix, linear, pdf417, qrcode
+
+
+class LinearPattern(namedtuple('LinearPattern', 'runs modules text wide guards groups', defaults=(False, (), ()))):
+    """Encoded linear barcode.
+
+    Args:
+        runs (tuple): Alternating bar and space widths in modules, starting
+            with a bar (0 wide for symbols that start with a space)
+        modules (int): Width of the symbol in modules
+        text (str): Human readable interpretation line
+        wide (bool): Whether the runs are narrow (1) and wide (2) elements,
+            the wide ones drawn at the ^BY wide to narrow ratio
+        guards (tuple): Indexes of the bar runs that extend into the
+            interpretation line (EAN/UPC guard bars)
+        groups (tuple): ``(text, left, right)`` digit groups printed
+            centered between modules ``left`` and ``right`` instead of
+            ``text`` centered under the symbol
+    """
+
+    __slots__ = ()
+
+    def spans(self, module_width, ratio=3.0):
+        """Return the run widths in dots at a module width and wide ratio."""
+        if not self.wide:
+            return tuple(run * module_width for run in self.runs)
+        wide = int(module_width * ratio + 0.5)
+        return tuple(wide if run == linear.WIDE else run * module_width for run in self.runs)
+
+
+def _code128(data, mode):
+    if mode == 'D':
+        # One parse gives both the GS1-128 data and its interpretation
+        element = code128.element_string(data)
+        runs = code128.bar_runs(code128.encode_gs1(element))
+        return LinearPattern(runs, sum(runs), element.text)
+    runs = code128.bar_runs(code128.encode(data, mode))
+    return LinearPattern(runs, sum(runs), code128.interpretation(data, mode))
+
+
+def _two_width(encoder):
+    """Wrap a narrow/wide ``(runs, text)`` encoder."""
+    def encode(data, mode):
+        runs, text = encoder(data, mode)
+        return LinearPattern(runs, sum(runs), text, True)
+    return encode
+
+
+def _ean_upc(encoder):
+    """Wrap an EAN/UPC ``(runs, text, guards, groups)`` encoder."""
+    def encode(data, mode):
+        runs, text, guards, groups = encoder(data, mode)
+        return LinearPattern(runs, sum(runs), text, False, guards, groups)
+    return encode
+
+
+def _databar(data, kind):
+    if kind == 'expanded':
+        widths = databar.expanded(data)
+    elif kind == 'limited':
+        widths = databar.limited(databar.gtin_value(data))
+    else:
+        widths = databar.omnidirectional(databar.gtin_value(data))
+    # DataBar symbols start with a space
+    runs = (0,) + widths
+    return LinearPattern(runs, sum(runs), '')
+
+
+# Encoders of the linear symbologies: (data, mode) -> LinearPattern; the
+# mode is symbology specific (Code 128 subset, check digit flag, DataBar
+# kind)
+LINEAR_SYMBOLOGIES = {
+    'code128': _code128,
+    'code39': _two_width(linear.code39),
+    'databar': _databar,
+    'ean13': _ean_upc(linear.ean13),
+    'ean8': _ean_upc(linear.ean8),
+    'interleaved2of5': _two_width(linear.interleaved_2of5),
+    'upca': _ean_upc(linear.upc_a),
+}
+
+# Encoded patterns keyed by (symbology, data, mode); labels repeat the
+# same barcodes
+pattern_cache = LRUCache(max_entries=1024)
+
+
+def linear_pattern(symbology, data, mode='N'):
+    """Encode a linear barcode, using ``pattern_cache``.
+
+    Args:
+        symbology (str): Key of ``LINEAR_SYMBOLOGIES``
+        data (str): Field data
+        mode: Symbology specific mode
+
+    Returns:
+        LinearPattern: The bar pattern and interpretation line
+
+    Raises:
+        ValueError: if the symbology cannot encode the data
+    """
+    key = (symbology, data, mode)
+    pattern = pattern_cache.get(key)
+    if pattern is None:
+        pattern = pattern_cache.put(key, LINEAR_SYMBOLOGIES[symbology](data, mode))
+    return pattern
+
+
+class MatrixSymbol(namedtuple('MatrixSymbol', 'modules width height')):
+    """Encoded 2D symbol: ``width`` x ``height`` module bytes, row by row, 1 for dark."""
+
+    __slots__ = ()
+
+
+# Encoders of the 2D symbologies: (data, *options) -> (modules, width, height)
+MATRIX_SYMBOLOGIES = {
+    'aztec': aztec.encode,
+    'datamatrix': datamatrix.encode,
+    'pdf417': pdf417.encode,
+    'qrcode': qrcode.encode,
+}
+
+# Encoded symbols keyed by (symbology, data, options)
+symbol_cache = LRUCache(max_entries=1024)
+
+
+def matrix_symbol(symbology, data, options=()):
+    """Encode a 2D symbol, using ``symbol_cache``.
+
+    Args:
+        symbology (str): Key of ``MATRIX_SYMBOLOGIES``
+        data (str): Field data
+        options (tuple): Symbology specific encoder arguments
+
+    Returns:
+        MatrixSymbol: The module matrix
+    """
+    key = (symbology, data, options)
+    symbol = symbol_cache.get(key)
+    if symbol is None:
+        symbol = symbol_cache.put(key, MatrixSymbol(*MATRIX_SYMBOLOGIES[symbology](data, *options)))
+    return symbol
+
+
+def _mask_size(mask):
+    return mask.width * mask.height // 8
+
+
+# Module values to mask pixel values
+_INK = bytes([0, 255]) + bytes(254)
+
+# Scaled symbol masks keyed by (symbol, module size, rotation, module height)
+mask_cache = LRUCache(max_entries=256, max_bytes=32 * 1024 * 1024, sizeof=_mask_size)
+
+
+def matrix_mask(symbol, module_size, rotation=0, module_height=None):
+    """Return a symbol as a mode '1' mask at an integer module size.
+
+    Args:
+        symbol (MatrixSymbol): Encoded symbol
+        module_size (int): Module size in dots
+        rotation (int): Clockwise rotation, a multiple of 90 degrees
+        module_height (int, optional): Module height in dots, if the
+            modules are not square
+
+    Returns:
+        PIL.Image.Image: Mask with dark modules set
+    """
+    key = (symbol, module_size, rotation, module_height)
+    mask = mask_cache.get(key)
+    if mask is None:
+        size = (symbol.width * module_size, symbol.height * (module_height or module_size))
+        mask = Image.frombytes('L', (symbol.width, symbol.height), symbol.modules.translate(_INK))
+        mask = mask.resize(size, Image.NEAREST).convert('1')
+        if rotation:
+            mask = mask.transpose(ROTATE_TRANSPOSE[rotation])
+        mask = mask_cache.put(key, mask)
+    return mask
@@ -0,0 +1,324 @@
+"""Aztec Code encoder.
+
+Field data is encoded in the five character modes (upper, lower, mixed,
+punctuation and digit) with latches, single character shifts and binary
+shifts for anything else. The bits are stuffed into codewords of the word
+size of the smallest fitting symbol, extended with Reed–Solomon check
+words over GF(64), GF(256), GF(1024) or GF(4096), and laid out in layers
+that spiral around the bullseye finder and the mode message, which has its
+own check words over GF(16). Full range symbols also carry the reference
+grid.
+"""
+
+from .reedsolomon import galois_field
+
+UPPER, LOWER, MIXED, PUNCTUATION, DIGIT = range(5)
+
+# Values of the characters of every mode
+CHAR_VALUES = (
+    dict({chr(65 + index): index + 2 for index in range(26)}, **{' ': 1}),
+    dict({chr(97 + index): index + 2 for index in range(26)}, **{' ': 1}),
+    {char: value for value, char in enumerate(
+        ' ' + ''.join(chr(code) for code in range(1, 14)) + ''.join(chr(code) for code in range(27, 32)) +
+        '@\\^_`|~\x7f', 1)},
+    dict({char: value for value, char in enumerate('!"#$%&\'()*+,-./:;<=>?[]{}', 6)}, **{'\r': 1}),
+    dict({chr(48 + index): index + 2 for index in range(10)}, **{' ': 1, ',': 12, '.': 13}),
+)
+# Width of the codes of every mode
+CODE_BITS = (5, 5, 5, 5, 4)
+
+# Codes that latch from one mode (first index) to another, as
+# (value, bits) pairs
+LATCHES = (
+    (None, ((28, 5),), ((29, 5),), ((29, 5), (30, 5)), ((30, 5),)),
+    (((30, 5), (14, 4)), None, ((29, 5),), ((29, 5), (30, 5)), ((30, 5),)),
+    (((29, 5),), ((28, 5),), None, ((30, 5),), ((29, 5), (30, 5))),
+    (((31, 5),), ((31, 5), (28, 5)), ((31, 5), (29, 5)), None, ((31, 5), (30, 5))),
+    (((14, 4),), ((14, 4), (28, 5)), ((14, 4), (29, 5)), ((14, 4), (29, 5), (30, 5)), None),
+)
+PUNCTUATION_SHIFT = 0
+# Codes of the upper shift in the modes that have one
+UPPER_SHIFTS = {LOWER: 28, DIGIT: 15}
+BINARY_SHIFT = 31
+MAX_BINARY = 31 + 2047
+
+# Modes to latch to for a character found in several, in order of preference
+_LATCH_ORDER = (UPPER, LOWER, DIGIT, MIXED, PUNCTUATION)
+_ENCODABLE = frozenset().union(*CHAR_VALUES)
+
+# Primitive polynomials of the codeword sizes, and of the mode message
+FIELDS = {6: (0x43, 64), 8: (0x12D, 256), 10: (0x409, 1024), 12: (0x1069, 4096)}
+MODE_FIELD = galois_field(0x13, 16)
+
+# Minimum error correction as a percentage of the data, ISO/IEC 24778's
+# recommended level
+DEFAULT_ECC_PERCENT = 23
+
+
+def _binary_shift(data, index, bits):
+    """Append a binary shift of the characters at ``index`` that no mode has.
+
+    Returns:
+        int: Index after the shifted characters
+    """
+    end = index + 1
+    while end < len(data) and end - index < MAX_BINARY and data[end] not in _ENCODABLE:
+        end += 1
+    count = end - index
+    bits.append(f'{BINARY_SHIFT:05b}')
+    if count <= 31:
+        bits.append(f'{count:05b}')
+    else:
+        bits.append(f'{0:05b}{count - 31:011b}')
+    bits.extend(f'{min(ord(char), 255):08b}' for char in data[index:end])
+    return end
+
+
+def encode_bits(data):
+    """Encode field data as an Aztec bit string.
+
+    Characters of the current mode are encoded directly. A character of
+    another mode latches to it when the next character is also in that
+    mode, and uses a punctuation or upper shift otherwise, where there is
+    one.
+
+    Returns:
+        str: Bits, ``'0'`` and ``'1'``
+    """
+    bits = []
+    mode = UPPER
+    index = 0
+    length = len(data)
+    while index < length:
+        char = data[index]
+        values = CHAR_VALUES[mode]
+        if char in values:
+            bits.append(f'{values[char]:0{CODE_BITS[mode]}b}')
+            index += 1
+            continue
+        candidates = [target for target in _LATCH_ORDER if char in CHAR_VALUES[target]]
+        if not candidates:
+            if mode in (DIGIT, PUNCTUATION):
+                bits.extend(f'{value:0{width}b}' for value, width in LATCHES[mode][UPPER])
+                mode = UPPER
+            index = _binary_shift(data, index, bits)
+            continue
+        following = data[index + 1] if index + 1 < length else None
+        target = next((target for target in candidates if following in CHAR_VALUES[target]), None)
+        if target is None and mode != PUNCTUATION:
+            if PUNCTUATION in candidates:
+                bits.append(f'{PUNCTUATION_SHIFT:0{CODE_BITS[mode]}b}')
+                bits.append(f'{CHAR_VALUES[PUNCTUATION][char]:05b}')
+                index += 1
+                continue
+            if UPPER in candidates and mode in UPPER_SHIFTS:
+                bits.append(f'{UPPER_SHIFTS[mode]:0{CODE_BITS[mode]}b}')
+                bits.append(f'{CHAR_VALUES[UPPER][char]:05b}')
+                index += 1
+                continue
+        target = candidates[0] if target is None else target
+        bits.extend(f'{value:0{width}b}' for value, width in LATCHES[mode][target])
+        mode = target
+    return ''.join(bits)
+
+
+def stuff_bits(bits, word_size):
+    """Split bits into codewords, avoiding all-zero and all-one codewords.
+
+    A codeword whose first ``word_size - 1`` bits are all equal gets the
+    complement as its last bit, and the bit it displaces starts the next
+    codeword. The last codeword is padded with ones.
+
+    Returns:
+        list: Codeword values
+    """
+    words = []
+    mask = (1 << word_size) - 2
+    index = 0
+    length = len(bits)
+    while index < length:
+        word = int(bits[index:index + word_size].ljust(word_size, '1'), 2)
+        if word & mask == mask:
+            word &= mask
+            index += word_size - 1
+        elif not word & mask:
+            word |= 1
+            index += word_size - 1
+        else:
+            index += word_size
+        words.append(word)
+    return words
+
+
+def word_size(layers):
+    """Return the codeword size in bits of a symbol with ``layers`` layers."""
+    if layers <= 2:
+        return 6
+    if layers <= 8:
+        return 8
+    return 10 if layers <= 22 else 12
+
+
+def layer_bits(layers, compact):
+    """Return the number of module bits in ``layers`` data layers."""
+    return ((88 if compact else 112) + 16 * layers) * layers
+
+
+def choose_size(bits, ecc_percent=DEFAULT_ECC_PERCENT, compact=None, layers=None):
+    """Return the smallest symbol that holds the bits and their error correction.
+
+    An explicit ``layers`` count (with ``compact``) is used as is.
+
+    Returns:
+        tuple: ``(compact, layers, words)`` with ``words`` the stuffed data
+        codewords
+    """
+    ecc_bits = len(bits) * ecc_percent // 100 + 11
+    if layers:
+        sizes = ((compact, layers),)
+    else:
+        # Compact symbols are smaller than full range ones of 1 to 3 layers
+        sizes = tuple((True, count) for count in range(1, 5)) + tuple((False, count) for count in range(4, 33))
+    stuffed = {}
+    for compact, layers in sizes:
+        size = word_size(layers)
+        words = stuffed.get(size)
+        if words is None:
+            words = stuffed[size] = stuff_bits(bits, size)
+        total = layer_bits(layers, compact)
+        # Compact symbols hold at most 64 data codewords
+        if compact and len(words) > 64:
+            continue
+        if len(words) * size + ecc_bits <= total - total % size:
+            return compact, layers, words
+    raise ValueError(f"Data too long for Aztec: {len(bits)} bits")
+
+
+def mode_message(compact, layers, data_words):
+    """Return the bits of the mode message with its GF(16) check words."""
+    if compact:
+        value, words, check = (layers - 1) << 6 | (data_words - 1), 2, 5
+    else:
+        value, words, check = (layers - 1) << 11 | (data_words - 1), 4, 6
+    nibbles = [value >> (4 * (words - 1 - index)) & 15 for index in range(words)]
+    nibbles.extend(MODE_FIELD.encode(nibbles, check))
+    return ''.join(f'{nibble:04b}' for nibble in nibbles)
+
+
+def build_matrix(compact, layers, message, mode):
+    """Lay out the message bits, mode message, bullseye and reference grid.
+
+    Returns:
+        tuple: ``(modules, size)`` with ``size * size`` module bytes, row
+        by row, 1 for dark
+    """
+    base_size = (11 if compact else 14) + layers * 4
+    if compact:
+        size = base_size
+        alignment = list(range(base_size))
+    else:
+        # Full range symbols insert a reference grid line every 16 modules
+        size = base_size + 1 + 2 * ((base_size // 2 - 1) // 15)
+        alignment = [0] * base_size
+        original_center, center = base_size // 2, size // 2
+        for index in range(original_center):
+            offset = index + index // 15
+            alignment[original_center - index - 1] = center - offset - 1
+            alignment[original_center + index] = center + offset + 1
+    modules = bytearray(size * size)
+
+    def dark(x, y):
+        modules[y * size + x] = 1
+
+    row_offset = 0
+    last = base_size - 1
+    for layer in range(layers):
+        row_size = (layers - layer) * 4 + (9 if compact else 12)
+        inner = layer * 2
+        for column in range(row_size):
+            column_offset = column * 2
+            for k in range(2):
+                if message[row_offset + column_offset + k] == '1':
+                    dark(alignment[inner + k], alignment[inner + column])
+                if message[row_offset + row_size * 2 + column_offset + k] == '1':
+                    dark(alignment[inner + column], alignment[last - inner - k])
+                if message[row_offset + row_size * 4 + column_offset + k] == '1':
+                    dark(alignment[last - inner - k], alignment[last - inner - column])
+                if message[row_offset + row_size * 6 + column_offset + k] == '1':
+                    dark(alignment[last - inner - column], alignment[inner + k])
+        row_offset += row_size * 8
+
+    center = size // 2
+    if compact:
+        for index in range(7):
+            offset = center - 3 + index
+            if mode[index] == '1':
+                dark(offset, center - 5)
+            if mode[index + 7] == '1':
+                dark(center + 5, offset)
+            if mode[20 - index] == '1':
+                dark(offset, center + 5)
+            if mode[27 - index] == '1':
+                dark(center - 5, offset)
+    else:
+        for index in range(10):
+            offset = center - 5 + index + index // 5
+            if mode[index] == '1':
+                dark(offset, center - 7)
+            if mode[index + 10] == '1':
+                dark(center + 7, offset)
+            if mode[29 - index] == '1':
+                dark(offset, center + 7)
+            if mode[39 - index] == '1':
+                dark(center - 7, offset)
+
+    # Bullseye rings and the orientation marks at its corners
+    radius = 5 if compact else 7
+    for ring in range(0, radius, 2):
+        for position in range(center - ring, center + ring + 1):
+            dark(position, center - ring)
+            dark(position, center + ring)
+            dark(center - ring, position)
+            dark(center + ring, position)
+    for x, y in ((-radius, -radius), (-radius + 1, -radius), (-radius, -radius + 1), (radius, -radius),
+                 (radius, -radius + 1), (radius, radius - 1)):
+        dark(center + x, center + y)
+
+    if not compact:
+        for line in range(0, base_size // 2 - 1, 15):
+            offset = line // 15 * 16
+            for position in range(center & 1, size, 2):
+                dark(center - offset, position)
+                dark(center + offset, position)
+                dark(position, center - offset)
+                dark(position, center + offset)
+    return modules, size
+
+
+def encode(data, ecc_percent=None, compact=None, layers=None):
+    """Encode ^BO field data as an Aztec symbol.
+
+    Args:
+        data (str): Field data
+        ecc_percent (int, optional): Minimum error correction as a
+            percentage of the data; defaults to ``DEFAULT_ECC_PERCENT``
+        compact (bool, optional): Compact rather than full range symbol,
+            with ``layers``
+        layers (int, optional): Number of data layers, 1-4 for compact
+            and 1-32 for full range symbols; chosen from the data when
+            omitted
+
+    Returns:
+        tuple: ``(modules, width, height)`` with ``modules`` the bytes of
+        ``build_matrix``
+    """
+    bits = encode_bits(data)
+    compact, layers, words = choose_size(bits, ecc_percent or DEFAULT_ECC_PERCENT, compact, layers)
+    size = word_size(layers)
+    total = layer_bits(layers, compact)
+    field = galois_field(*FIELDS[size])
+    # The check words fill the layers; leftover bits pad the start
+    check = field.encode(words, total // size - len(words))
+    message = '0' * (total % size) + ''.join(f'{word:0{size}b}' for word in words + check)
+    modules, width = build_matrix(compact, layers, message, mode_message(compact, layers, len(words)))
+    return bytes(modules), width, width
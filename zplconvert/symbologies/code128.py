@@ -0,0 +1,314 @@
+"""Code 128 and GS1-128 encoder.
+
+Data is encoded as a sequence of symbol values (start character, data,
+check character, stop character) and turned into a run-length pattern of
+bar and space widths in modules. Field data is a list of tokens: character
+codes 0-255 and the function characters ``FNC1``-``FNC4``.
+
+In ^BC mode N the printer follows the ZPL invocation codes in the data
+(``>9``, ``>:``, ``>;`` start codes, ``>5``-``>7`` subset switches,
+``>8`` FNC1 and so on) and otherwise stays in the subset it started in.
+In the automatic modes the code sets are chosen by a dynamic program that
+gives the fewest symbol characters.
+"""
+
+from . import gs1
+from .gs1 import mod10_check_digit
+
+SET_A, SET_B, SET_C = range(3)
+
+FNC1, FNC2, FNC3, FNC4 = 256, 257, 258, 259
+
+# Bar and space widths of every symbol value; the stop pattern has a
+# final 2-module bar
+PATTERNS = (
+    '212222', '222122', '222221', '121223', '121322', '131222', '122213', '122312', '132212', '221213',
+    '221312', '231212', '112232', '122132', '122231', '113222', '123122', '123221', '223211', '221132',
+    '221231', '213212', '223112', '312131', '311222', '321122', '321221', '312212', '322112', '322211',
+    '212123', '212321', '232121', '111323', '131123', '131321', '112313', '132113', '132311', '211313',
+    '231113', '231311', '112133', '112331', '132131', '113123', '113321', '133121', '313121', '211331',
+    '231131', '213113', '213311', '213131', '311123', '311321', '331121', '312113', '312311', '332111',
+    '314111', '221411', '431111', '111224', '111422', '121124', '121421', '141122', '141221', '112214',
+    '112412', '122114', '122411', '142112', '142211', '241211', '221114', '413111', '241112', '134111',
+    '111242', '121142', '121241', '114212', '124112', '124211', '411212', '421112', '421211', '212141',
+    '214121', '412121', '111143', '111341', '131141', '114113', '114311', '411113', '411311', '113141',
+    '114131', '311141', '411131', '211412', '211214', '211232', '2331112',
+)
+PATTERN_WIDTHS = tuple(tuple(int(width) for width in pattern) for pattern in PATTERNS)
+
+START = (103, 104, 105)
+STOP = 106
+SHIFT = 98
+# Symbol value that switches from one code set (first index) to another
+SWITCH = (
+    (None, 100, 99),
+    (101, None, 99),
+    (101, 100, None),
+)
+# Values of the function characters in code sets A and B; code set C
+# only has FNC1
+FUNCTIONS = (
+    {FNC1: 102, FNC2: 97, FNC3: 96, FNC4: 101},
+    {FNC1: 102, FNC2: 97, FNC3: 96, FNC4: 100},
+    {FNC1: 102},
+)
+
+# Symbol values of the ZPL invocation codes; ``><`` and ``>0`` print ``>``
+# and ``>=`` prints ``~``
+INVOCATIONS = {'1': 95, '2': 96, '3': 97, '4': 98, '5': 99, '6': 100, '7': 101, '8': 102}
+INVOCATION_CHARS = {'<': ord('>'), '0': ord('>'), '=': ord('~')}
+START_CODES = {'9': SET_A, ':': SET_B, ';': SET_C}
+
+_INFINITY = float('inf')
+
+
+def _char_value(code_set, token):
+    """Return the symbol values of a single token in code set A or B, or None."""
+    if token >= 256:
+        value = FUNCTIONS[code_set].get(token)
+        return None if value is None else (value,)
+    if token >= 128:
+        # Extended ASCII: FNC4 followed by the character minus 128
+        base = _char_value(code_set, token - 128)
+        return None if base is None else (FUNCTIONS[code_set][FNC4],) + base
+    if code_set == SET_A:
+        if token < 32:
+            return (token + 64,)
+        return (token - 32,) if token < 96 else None
+    return (token - 32,) if token >= 32 else None
+
+
+def _is_digit(token):
+    return 48 <= token <= 57
+
+
+def _encode_at(code_set, tokens, index):
+    """Return ``(values, consumed)`` encoding the tokens at ``index`` in a
+    code set, or None if the set cannot encode them."""
+    token = tokens[index]
+    if code_set == SET_C:
+        if token == FNC1:
+            return (102,), 1
+        if index + 1 < len(tokens) and _is_digit(token) and _is_digit(tokens[index + 1]):
+            return ((token - 48) * 10 + tokens[index + 1] - 48,), 2
+        return None
+    values = _char_value(code_set, token)
+    return None if values is None else (values, 1)
+
+
+def encode_auto(tokens):
+    """Encode tokens with the fewest symbol characters.
+
+    A dynamic program over (position, code set) weighs encoding the next
+    token in the current set, shifting between A and B for one
+    character, and switching sets.
+
+    Returns:
+        list: Symbol values from the start character to the stop character
+    """
+    count = len(tokens)
+    # cost[i][s]: fewest symbols for tokens[i:] when in code set s at i
+    cost = [[_INFINITY] * 3 for _ in range(count + 1)]
+    choice = [[None] * 3 for _ in range(count + 1)]
+    cost[count] = [0, 0, 0]
+    encodings = [None] * 3
+    for index in range(count - 1, -1, -1):
+        for code_set in range(3):
+            encodings[code_set] = _encode_at(code_set, tokens, index)
+        for code_set in range(3):
+            best, best_choice = _INFINITY, None
+            encoded = encodings[code_set]
+            if encoded is not None:
+                values, consumed = encoded
+                best = len(values) + cost[index + consumed][code_set]
+                best_choice = (code_set, values, consumed, ())
+            if code_set != SET_C:
+                other = SET_B if code_set == SET_A else SET_A
+                encoded = encodings[other]
+                if encoded is not None and tokens[index] < 128:
+                    values, consumed = encoded
+                    total = 1 + len(values) + cost[index + consumed][code_set]
+                    if total < best:
+                        best, best_choice = total, (code_set, values, consumed, (SHIFT,))
+            for target in range(3):
+                encoded = encodings[target]
+                if target == code_set or encoded is None:
+                    continue
+                values, consumed = encoded
+                total = 1 + len(values) + cost[index + consumed][target]
+                if total < best:
+                    best, best_choice = total, (target, values, consumed, (SWITCH[code_set][target],))
+            cost[index][code_set] = best
+            choice[index][code_set] = best_choice
+
+    if not count:
+        start_set = SET_B
+    else:
+        start_set = min(range(3), key=lambda code_set: (cost[0][code_set], code_set != SET_B))
+        if cost[0][start_set] == _INFINITY:
+            raise ValueError("Data cannot be encoded in Code 128")
+    values = [START[start_set]]
+    code_set = start_set
+    index = 0
+    while index < count:
+        next_set, encoded, consumed, prefix = choice[index][code_set]
+        values.extend(prefix)
+        values.extend(encoded)
+        code_set = next_set
+        index += consumed
+    return _finish(values)
+
+
+def encode_invocations(data):
+    """Encode ^BC mode N data, following its ZPL invocation codes.
+
+    Characters the current code set cannot encode switch to code set B,
+    or to A for control characters.
+
+    Returns:
+        list: Symbol values from the start character to the stop character
+    """
+    code_set = SET_B
+    index = 0
+    if data[:1] == '>' and data[1:2] in START_CODES:
+        code_set = START_CODES[data[1]]
+        index = 2
+    values = [START[code_set]]
+    shifted = False
+    length = len(data)
+    while index < length:
+        char = data[index]
+        index += 1
+        if char == '>' and index < length:
+            code = data[index]
+            index += 1
+            if code in START_CODES:
+                continue
+            if code in INVOCATIONS:
+                value = INVOCATIONS[code]
+                values.append(value)
+                if value == SHIFT:
+                    shifted = code_set != SET_C
+                elif code_set == SET_A and value in (99, 100):
+                    code_set = SET_C if value == 99 else SET_B
+                elif code_set == SET_B and value in (99, 101):
+                    code_set = SET_C if value == 99 else SET_A
+                elif code_set == SET_C and value in (100, 101):
+                    code_set = SET_B if value == 100 else SET_A
+                continue
+            char = chr(INVOCATION_CHARS.get(code, ord(code)))
+        token = ord(char) if ord(char) < 256 else ord('?')
+        if code_set == SET_C:
+            if _is_digit(token) and index < length and data[index].isdigit():
+                values.append(int(char + data[index]))
+                index += 1
+                continue
+            code_set = SET_B
+            values.append(SWITCH[SET_C][SET_B])
+        encode_set = (SET_B if code_set == SET_A else SET_A) if shifted else code_set
+        shifted = False
+        encoded = _char_value(encode_set, token)
+        if encoded is None:
+            # Lowercase in code set A or a control character in code set B
+            code_set = SET_A if encode_set == SET_B else SET_B
+            values.append(SWITCH[encode_set][code_set])
+            encoded = _char_value(code_set, token) or (0,)
+        values.extend(encoded)
+    return _finish(values)
+
+
+def _finish(values):
+    """Append the check and stop characters to a symbol value list."""
+    checksum = values[0]
+    for position, value in enumerate(values[1:], 1):
+        checksum += position * value
+    values.append(checksum % 103)
+    values.append(STOP)
+    return values
+
+
+def tokenize_data(data, fnc1='\xf1'):
+    """Convert field data into tokens, mapping ``fnc1`` characters to FNC1."""
+    return [FNC1 if char == fnc1 else min(ord(char), 255) for char in data]
+
+
+def element_string(data):
+    """Parse ^BC mode D data, in which ``>8`` is also accepted as FNC1.
+
+    Returns:
+        gs1.ElementString: The GS1 fields, encoder input and interpretation
+
+    Raises:
+        ValueError: if the data is not a valid GS1 element string
+    """
+    return gs1.parse(data.replace('>8', gs1.FNC1))
+
+
+def encode_gs1(element):
+    """Encode a GS1 element string as GS1-128: FNC1 first, then its data."""
+    return encode_auto([FNC1] + tokenize_data(element.encoded, gs1.FNC1))
+
+
+def _ucc_case_digits(data):
+    """Return ^BC mode U data: 19 digits, zero padded, and a check digit."""
+    digits = ''.join(char for char in data if char.isdigit())[:19].ljust(19, '0')
+    return digits + mod10_check_digit(digits)
+
+
+def interpretation(data, mode='N'):
+    """Return the human readable interpretation line of ^BC field data."""
+    if mode == 'U':
+        return _ucc_case_digits(data)
+    if mode == 'D':
+        return element_string(data).text
+    if mode != 'N' or '>' not in data:
+        return data
+    text = []
+    index = 0
+    length = len(data)
+    while index < length:
+        char = data[index]
+        index += 1
+        if char == '>' and index < length:
+            code = data[index]
+            index += 1
+            if code in INVOCATION_CHARS:
+                text.append(chr(INVOCATION_CHARS[code]))
+            continue
+        text.append(char)
+    return ''.join(text)
+
+
+def encode(data, mode='N'):
+    """Encode ^BC field data.
+
+    Args:
+        data (str): Field data
+        mode (str): ^BC mode: ``N`` follows the invocation codes in the
+            data, ``A`` chooses the code sets automatically, ``D`` encodes
+            GS1-128 data with parenthesized application identifiers and
+            ``U`` is UCC case mode
+
+    Returns:
+        list: Symbol values from the start character to the stop character
+    """
+    if mode == 'N':
+        return encode_invocations(data)
+    if mode == 'D':
+        return encode_gs1(element_string(data))
+    if mode == 'U':
+        return encode_auto([FNC1] + tokenize_data(_ucc_case_digits(data)))
+    return encode_auto(tokenize_data(data))
+
+
+def bar_runs(values):
+    """Return the run-length pattern of a symbol value list.
+
+    Returns:
+        tuple: Alternating bar and space widths in modules, starting and
+        ending with a bar
+    """
+    runs = []
+    for value in values:
+        runs.extend(PATTERN_WIDTHS[value])
+    return tuple(runs)
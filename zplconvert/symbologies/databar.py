@@ -0,0 +1,329 @@
+"""GS1 DataBar Omnidirectional, Truncated, Limited and Expanded encoders.
+
+A DataBar symbol encodes a GTIN, or for Expanded a bit stream of GS1
+element strings, as a few large numbers. Each one becomes a symbol
+character, a set of odd and even element widths chosen by combinatorial
+enumeration (``element_widths``) from the character's group. A modular
+checksum over the widths selects the finder patterns between the
+characters, or for Expanded an extra check character. Unlike the
+table-driven symbologies in ``linear``, the element widths are computed,
+but the resulting runs are plain module widths.
+"""
+
+from math import comb
+
+from . import gs1
+from .gs1 import FNC1
+
+
+def _combinations(n, r):
+    return comb(n, r) if 0 <= r <= n else 0
+
+
+def element_widths(value, modules, elements, widest, no_narrow):
+    """Return the element widths of the ``value``-th combination.
+
+    The combinations are the ways to split ``modules`` modules into
+    ``elements`` elements of 1 to ``widest`` modules; with ``no_narrow``
+    false at least one element must be one module wide.
+
+    Returns:
+        list: ``elements`` widths in modules
+    """
+    widths = [0] * elements
+    narrow_mask = 0
+    for bar in range(elements - 1):
+        width = 1
+        narrow_mask |= 1 << bar
+        while True:
+            # Combinations that remain with this element ``width`` wide
+            sub_value = _combinations(modules - width - 1, elements - bar - 2)
+            if not no_narrow and not narrow_mask and \
+                    modules - width - (elements - bar - 1) >= elements - bar - 1:
+                sub_value -= _combinations(modules - width - (elements - bar), elements - bar - 2)
+            if elements - bar - 1 > 1:
+                less_value = 0
+                widest_element = modules - width - (elements - bar - 2)
+                while widest_element > widest:
+                    less_value += _combinations(modules - width - widest_element - 1, elements - bar - 3)
+                    widest_element -= 1
+                sub_value -= less_value * (elements - 1 - bar)
+            elif modules - width > widest:
+                sub_value -= 1
+            value -= sub_value
+            if value < 0:
+                break
+            width += 1
+            narrow_mask &= ~(1 << bar)
+        value += sub_value
+        modules -= width
+        widths[bar] = width
+    widths[elements - 1] = modules
+    return widths
+
+
+def _character(value, groups, odd_quotient, odd_no_narrow):
+    """Return the odd and even element widths of a symbol character.
+
+    Args:
+        value (int): Character value
+        groups (tuple): ``(first value, odd modules, even modules, widest
+            odd, widest even, divisor)`` per character group
+        odd_quotient (bool): Whether the odd widths are selected by the
+            quotient of the value within its group by the divisor, and the
+            even widths by the remainder, or the other way round
+        odd_no_narrow (bool): Whether the odd widths may lack a narrow
+            element; the even widths may exactly when the odd ones may not
+
+    Returns:
+        tuple: ``(odd, even)`` width lists
+    """
+    for group in reversed(groups):
+        if value >= group[0]:
+            break
+    start, odd_modules, even_modules, odd_widest, even_widest, divisor = group
+    quotient, remainder = divmod(value - start, divisor)
+    odd_value, even_value = (quotient, remainder) if odd_quotient else (remainder, quotient)
+    elements = 7 if odd_modules + even_modules == 26 else 4
+    return (element_widths(odd_value, odd_modules, elements, odd_widest, odd_no_narrow),
+            element_widths(even_value, even_modules, elements, even_widest, not odd_no_narrow))
+
+
+def gtin_value(data):
+    """Return the 13 digit GTIN of ^BR field data as a number.
+
+    An ``(01)`` application identifier and a 14th (check) digit are
+    dropped; DataBar decoders recompute the check digit.
+    """
+    digits = ''.join(char for char in data if char.isdigit())
+    if data.startswith('(01)'):
+        digits = digits[2:]
+    if len(digits) >= 14:
+        digits = digits[:13]
+    return int(digits[-13:] or 0)
+
+
+# DataBar Omnidirectional: outside characters 0 and 2 and inside
+# characters 1 and 3, as (first value, odd modules, even modules, widest
+# odd, widest even, divisor)
+OMNI_OUTSIDE = ((0, 12, 4, 8, 1, 1), (161, 10, 6, 6, 3, 10), (961, 8, 8, 4, 5, 34), (2015, 6, 10, 3, 6, 70),
+                (2715, 4, 12, 1, 8, 126))
+OMNI_INSIDE = ((0, 5, 10, 2, 7, 4), (336, 7, 8, 4, 5, 20), (1036, 9, 6, 6, 3, 48), (1516, 11, 4, 8, 1, 81))
+OMNI_FINDERS = ((3, 8, 2, 1, 1), (3, 5, 5, 1, 1), (3, 3, 7, 1, 1), (3, 1, 9, 1, 1), (2, 7, 4, 1, 1), (2, 5, 6, 1, 1),
+                (2, 3, 8, 1, 1), (1, 5, 7, 1, 1), (1, 3, 9, 1, 1))
+# Weights of the 32 character elements in the modulo 79 checksum
+OMNI_WEIGHTS = tuple(pow(3, index, 79) for index in range(32))
+
+LIMITED_GROUPS = ((0, 17, 9, 6, 3, 28), (183064, 13, 13, 5, 4, 728), (820064, 9, 17, 3, 6, 6454),
+                  (1000776, 15, 11, 5, 4, 203), (1491021, 11, 15, 4, 5, 2408), (1979845, 19, 7, 8, 1, 1),
+                  (1996939, 7, 19, 1, 8, 16632))
+# DataBar Limited finder (check) patterns, indexed by the modulo 89 checksum
+LIMITED_FINDERS = tuple(tuple(int(width) for width in pattern) for pattern in (
+    '11111111113311', '11111111123211', '11111111133111', '11111112113211', '11111112123111', '11111113113111', '11111211113211',
+    '11111211123111', '11111212113111', '11111311113111', '11121111113211', '11121111123111', '11121112113111', '11121211113111',
+    '11131111113111', '12111111113211', '12111111123111', '12111112113111', '12111211113111', '12121111113111', '13111111113111',
+    '11111111212311', '11111111222211', '11111111232111', '11111112212211', '11111112222111', '11111113212111', '11111211212211',
+    '11111211222111', '11111212212111', '11111311212111', '11121111212211', '11121111222111', '11121112212111', '11121211212111',
+    '11131111212111', '12111111212211', '12111111222111', '12111112212111', '12111211212111', '12121111212111', '13111111212111',
+    '11111111311311', '11111111321211', '11111112311211', '11121111311211', '12111111311211', '11111121112311', '11111121122211',
+    '11111121132111', '11111122112211', '11121121112211', '11121121122111', '11121122112111', '11121221112111', '11131121112111',
+    '12111121112211', '12111121122111', '12121121112111', '11112111112311', '11112111122211', '11112111132111', '11112112112211',
+    '11112112122111', '11112211112211', '12112111112211', '12112111122111', '12112112112111', '12112211112111', '12122111112111',
+    '13112111112111', '11211111112311', '11211111122211', '11211111132111', '11211112112211', '11211112122111', '11211113112111',
+    '11211211112211', '11211211122111', '11221111112211', '21111111122211', '21111111132111', '21111112112211', '21111112122111',
+    '21111113112111', '21111211122111', '21111212112111', '21121111122111', '21111111221211',
+))
+LIMITED_WEIGHTS = tuple(pow(3, index, 89) for index in range(28))
+
+
+def omnidirectional(value):
+    """Return the 46 element widths of a DataBar Omnidirectional symbol.
+
+    The same widths make DataBar Truncated, which is only shorter. The
+    first element is a space.
+    """
+    left, right = divmod(value, 4537077)
+    values = (left // 1597, left % 1597, right // 1597, right % 1597)
+    # Widths of the four characters, outside characters odd set as quotient
+    characters = []
+    for index, char_value in enumerate(values):
+        outside = index % 2 == 0
+        odd, even = _character(char_value, OMNI_OUTSIDE if outside else OMNI_INSIDE, outside, outside)
+        characters.append([width for pair in zip(odd, even) for width in pair])
+    checksum = sum(OMNI_WEIGHTS[8 * index + element] * width
+                   for index, widths in enumerate(characters) for element, width in enumerate(widths)) % 79
+    # Checksums 8 and 72 would make finder patterns that are not used
+    if checksum >= 8:
+        checksum += 1
+    if checksum >= 72:
+        checksum += 1
+    left_finder, right_finder = divmod(checksum, 9)
+    return ((1, 1) + tuple(characters[0]) + OMNI_FINDERS[left_finder] + tuple(characters[1][::-1]) +
+            tuple(characters[3]) + OMNI_FINDERS[right_finder][::-1] + tuple(characters[2][::-1]) + (1, 1))
+
+
+def limited(value):
+    """Return the 46 element widths of a DataBar Limited symbol.
+
+    The first element is a space.
+
+    Raises:
+        ValueError: if the GTIN starts with a digit above 1
+    """
+    if value >= 2 * 10 ** 12:
+        raise ValueError("DataBar Limited encodes GTINs starting with 0 or 1 only")
+    characters = []
+    for char_value in divmod(value, 2013571):
+        odd, even = _character(char_value, LIMITED_GROUPS, True, True)
+        characters.append(tuple(width for pair in zip(odd, even) for width in pair))
+    checksum = sum(LIMITED_WEIGHTS[14 * index + element] * width
+                   for index, widths in enumerate(characters) for element, width in enumerate(widths)) % 89
+    return (1, 1) + characters[0] + LIMITED_FINDERS[checksum] + characters[1] + (1, 1)
+
+
+# DataBar Expanded symbol characters carry 12 bits each; odd set as quotient
+EXPANDED_GROUPS = ((0, 12, 5, 7, 2, 4), (348, 10, 7, 5, 4, 20), (1388, 8, 9, 4, 5, 52), (2948, 6, 11, 3, 6, 104),
+                   (3988, 4, 13, 1, 8, 204))
+# Finder patterns A to F; the second variant of each is reversed
+EXPANDED_FINDERS = ((1, 8, 4, 1, 1), (3, 6, 4, 1, 1), (3, 4, 6, 1, 1), (3, 2, 8, 1, 1), (2, 6, 5, 1, 1),
+                    (2, 2, 9, 1, 1))
+# Finder sequences by number of finders, as finder letter and variant
+EXPANDED_SEQUENCES = tuple(tuple((ord(pattern[index]) - 65, int(pattern[index + 1]))
+                                 for index in range(0, len(pattern), 2)) for pattern in (
+    'A1A2', 'A1B2B1', 'A1C2B1D2', 'A1E2B1D2C1', 'A1E2B1D2D1F2', 'A1E2B1D2E1F2F1', 'A1A2B1B2C1C2D1D2',
+    'A1A2B1B2C1C2D1E2E1', 'A1A2B1B2C1C2D1E2F1F2', 'A1A2B1B2C1D2D1E2E1F2F1',
+))
+# Checksum weights of the elements of a character, by the finder it is
+# next to and its side of it
+EXPANDED_WEIGHTS = tuple(pow(3, index, 211) for index in range(184))
+# General purpose field: six bit alphanumeric and eight bit ISO/IEC 646
+# punctuation, by character
+_ALPHANUMERIC_PUNCTUATION = {char: 58 + value for value, char in enumerate('*,-./')}
+_ISO_PUNCTUATION = {char: 232 + value for value, char in enumerate('!"%&\'()*+,-./:;<=>?_ ')}
+
+
+def _numeric_run(text, index):
+    """Return how many digits and FNC1s follow ``text[index]``."""
+    end = index
+    while end < len(text) and (text[end].isdigit() or text[end] == FNC1):
+        end += 1
+    return end - index
+
+
+def _general_field(text, bits):
+    """Append the general purpose encodation of ``text`` to ``bits``.
+
+    Digits go two per 7 bits in numeric mode; other characters latch to
+    alphanumeric or ISO/IEC 646 mode, which return to numeric mode before
+    four or more digits. An FNC1 in those modes returns to numeric mode by
+    itself.
+
+    Returns:
+        bool: Whether the field ends in numeric mode
+
+    Raises:
+        ValueError: if a character cannot be encoded
+    """
+    mode = 'numeric'
+    index = 0
+    while index < len(text):
+        char = text[index]
+        if mode == 'numeric':
+            pair = text[index:index + 2]
+            if len(pair) == 2 and _numeric_run(pair, 0) == 2 and pair != FNC1 * 2:
+                first, second = (10 if digit == FNC1 else int(digit) for digit in pair)
+                bits.append(format(8 + 11 * first + second, '07b'))
+                index += 2
+                continue
+            # Latch to alphanumeric, and on to ISO/IEC 646 if needed
+            bits.append('0000')
+            mode = 'alphanumeric'
+            continue
+        if _numeric_run(text, index) >= 4:
+            bits.append('000')
+            mode = 'numeric'
+            continue
+        if char.isdigit():
+            bits.append(format(int(char) + 5, '05b'))
+        elif char == FNC1:
+            bits.append('01111')
+            mode = 'numeric'
+        elif mode == 'alphanumeric':
+            if 'A' <= char <= 'Z':
+                bits.append(format(ord(char) - 33, '06b'))
+            elif char in _ALPHANUMERIC_PUNCTUATION:
+                bits.append(format(_ALPHANUMERIC_PUNCTUATION[char], '06b'))
+            else:
+                bits.append('00100')
+                mode = 'iso'
+                continue
+        elif 'A' <= char <= 'Z':
+            bits.append(format(ord(char) - 1, '07b'))
+        elif 'a' <= char <= 'z':
+            bits.append(format(ord(char) - 7, '07b'))
+        elif char in _ISO_PUNCTUATION:
+            bits.append(format(_ISO_PUNCTUATION[char], '08b'))
+        else:
+            raise ValueError(f"DataBar Expanded cannot encode {char!r}")
+        index += 1
+    return mode == 'numeric'
+
+
+def expanded(data):
+    """Return the element widths of a DataBar Expanded symbol.
+
+    The data is a GS1 element string; one starting with an ``(01)`` GTIN
+    uses the compressed GTIN method, anything else the general purpose
+    method only. The first element is a space.
+
+    Raises:
+        ValueError: if the data is not a valid element string, does not
+            fit or cannot be encoded
+    """
+    element = gs1.parse(data)
+    rest = element.encoded
+    # Linkage flag (no composite), encodation method and a placeholder for
+    # the variable length symbol field
+    if element.fields[:1] and element.fields[0][0] == '01':
+        gtin = element.fields[0][1]
+        # (01) has a predefined length: no FNC1 follows it
+        rest = rest[len('01') + len(gtin):]
+        bits = ['0', '1', 'XX', format(int(gtin[0]), '04b')]
+        bits.extend(format(int(gtin[index:index + 3]), '010b') for index in range(1, 13, 3))
+    else:
+        bits = ['0', '00', 'XX']
+    numeric = _general_field(rest, bits)
+    binary = ''.join(bits)
+    # At least three data characters; pad with alphanumeric latches
+    pad = max(36 - len(binary), -len(binary) % 12)
+    if pad:
+        binary += (('0000' if numeric else '') + '00100' * 3)[:pad]
+    data_count = len(binary) // 12
+    symbol_count = data_count + 1
+    if symbol_count > 22:
+        raise ValueError("Data too long for DataBar Expanded")
+    binary = binary.replace('XX', f'{symbol_count & 1}{int(symbol_count > 14)}', 1)
+
+    characters = [None]
+    for index in range(0, len(binary), 12):
+        odd, even = _character(int(binary[index:index + 12], 2), EXPANDED_GROUPS, True, False)
+        characters.append([width for pair in zip(odd, even) for width in pair])
+    sequence = EXPANDED_SEQUENCES[(symbol_count + 1) // 2 - 2]
+    checksum = 0
+    for position in range(1, symbol_count):
+        letter, variant = sequence[position // 2]
+        row = 4 * letter + 2 * (variant - 1) + position % 2 - 1
+        checksum += sum(EXPANDED_WEIGHTS[8 * row + element] * width
+                        for element, width in enumerate(characters[position]))
+    odd, even = _character(211 * (symbol_count - 4) + checksum % 211, EXPANDED_GROUPS, True, False)
+    characters[0] = [width for pair in zip(odd, even) for width in pair]
+
+    widths = [1, 1]
+    for pair, (letter, variant) in enumerate(sequence):
+        widths.extend(characters[2 * pair])
+        finder = EXPANDED_FINDERS[letter]
+        widths.extend(finder if variant == 1 else finder[::-1])
+        if 2 * pair + 1 < symbol_count:
+            widths.extend(characters[2 * pair + 1][::-1])
+    widths.extend((1, 1))
+    return tuple(widths)
@@ -0,0 +1,330 @@
+"""DataMatrix ECC 200 encoder.
+
+Data is encoded in ASCII encodation (digit pairs packed into one
+codeword), padded to the capacity of the smallest fitting symbol, extended
+with Reed–Solomon codewords per interleaved block and placed in the module
+matrix with the standard diagonal placement and finder patterns.
+"""
+
+from collections import namedtuple
+
+from .reedsolomon import galois_field
+
+FNC1 = 256
+
+
+class SymbolSize(namedtuple('SymbolSize', 'rows columns region_rows region_columns data_codewords '
+                                          'ecc_codewords blocks')):
+    """An ECC 200 symbol size.
+
+    Args:
+        rows (int): Symbol height in modules
+        columns (int): Symbol width in modules
+        region_rows (int): Height of one data region, without finder
+        region_columns (int): Width of one data region, without finder
+        data_codewords (int): Data capacity in codewords
+        ecc_codewords (int): Total error correction codewords
+        blocks (int): Number of interleaved Reed–Solomon blocks
+    """
+
+    __slots__ = ()
+
+
+SQUARE_SIZES = tuple(SymbolSize(*size) for size in (
+    (10, 10, 8, 8, 3, 5, 1),
+    (12, 12, 10, 10, 5, 7, 1),
+    (14, 14, 12, 12, 8, 10, 1),
+    (16, 16, 14, 14, 12, 12, 1),
+    (18, 18, 16, 16, 18, 14, 1),
+    (20, 20, 18, 18, 22, 18, 1),
+    (22, 22, 20, 20, 30, 20, 1),
+    (24, 24, 22, 22, 36, 24, 1),
+    (26, 26, 24, 24, 44, 28, 1),
+    (32, 32, 14, 14, 62, 36, 1),
+    (36, 36, 16, 16, 86, 42, 1),
+    (40, 40, 18, 18, 114, 48, 1),
+    (44, 44, 20, 20, 144, 56, 1),
+    (48, 48, 22, 22, 174, 68, 1),
+    (52, 52, 24, 24, 204, 84, 2),
+    (64, 64, 14, 14, 280, 112, 2),
+    (72, 72, 16, 16, 368, 144, 4),
+    (80, 80, 18, 18, 456, 192, 4),
+    (88, 88, 20, 20, 576, 224, 4),
+    (96, 96, 22, 22, 696, 272, 4),
+    (104, 104, 24, 24, 816, 336, 6),
+    (120, 120, 18, 18, 1050, 408, 6),
+    (132, 132, 20, 20, 1304, 496, 8),
+    (144, 144, 22, 22, 1558, 620, 10),
+))
+
+RECTANGULAR_SIZES = tuple(SymbolSize(*size) for size in (
+    (8, 18, 6, 16, 5, 7, 1),
+    (8, 32, 6, 14, 10, 11, 1),
+    (12, 26, 10, 24, 16, 14, 1),
+    (12, 36, 10, 16, 22, 18, 1),
+    (16, 36, 14, 16, 32, 24, 1),
+    (16, 48, 14, 22, 49, 28, 1),
+))
+
+FIELD = galois_field(0x12D)
+
+# ASCII encodation codewords
+_PAD = 129
+_UPPER_SHIFT = 235
+_FNC1 = 232
+
+
+def escape_tokens(data, escape):
+    """Tokenize ^BX field data, resolving escape sequences.
+
+    ``<escape>1`` is FNC1, ``<escape>dNNN`` is the character with decimal
+    code NNN and a doubled escape character is a literal one.
+
+    Returns:
+        list: Character codes and ``FNC1``
+    """
+    if not escape or escape not in data:
+        return [min(ord(char), 255) for char in data]
+    tokens = []
+    index = 0
+    length = len(data)
+    while index < length:
+        char = data[index]
+        index += 1
+        if char == escape and index < length:
+            code = data[index]
+            if code == '1':
+                tokens.append(FNC1)
+                index += 1
+                continue
+            if code in 'dD' and data[index + 1:index + 4].isdigit():
+                tokens.append(min(int(data[index + 1:index + 4]), 255))
+                index += 4
+                continue
+            if code == escape:
+                index += 1
+        tokens.append(min(ord(char), 255))
+    return tokens
+
+
+def encode_ascii(tokens):
+    """Encode tokens in ASCII encodation."""
+    codewords = []
+    index = 0
+    count = len(tokens)
+    while index < count:
+        token = tokens[index]
+        if 48 <= token <= 57 and index + 1 < count and 48 <= tokens[index + 1] <= 57:
+            codewords.append(130 + (token - 48) * 10 + tokens[index + 1] - 48)
+            index += 2
+            continue
+        if token == FNC1:
+            codewords.append(_FNC1)
+        elif token >= 128:
+            codewords.append(_UPPER_SHIFT)
+            codewords.append(token - 127)
+        else:
+            codewords.append(token + 1)
+        index += 1
+    return codewords
+
+
+def choose_size(length, rows=None, columns=None, rectangular=False):
+    """Return the smallest symbol size that holds ``length`` codewords.
+
+    An explicit ``rows`` x ``columns`` size is used when it exists and the
+    data fits; otherwise the smallest square (or rectangular) size is.
+    """
+    if rows or columns:
+        for size in SQUARE_SIZES + RECTANGULAR_SIZES:
+            if (not rows or size.rows == rows) and (not columns or size.columns == columns) and \
+                    size.data_codewords >= length:
+                return size
+    for size in (RECTANGULAR_SIZES if rectangular else ()) + SQUARE_SIZES:
+        if size.data_codewords >= length:
+            return size
+    raise ValueError(f"Data too long for DataMatrix: {length} codewords")
+
+
+def _pad(codewords, capacity):
+    """Pad codewords to the capacity with the 253-state randomized pad."""
+    if len(codewords) < capacity:
+        codewords.append(_PAD)
+    while len(codewords) < capacity:
+        value = _PAD + (149 * (len(codewords) + 1)) % 253 + 1
+        codewords.append(value - 254 if value > 254 else value)
+    return codewords
+
+
+def add_error_correction(codewords, size):
+    """Append the interleaved Reed–Solomon codewords of a symbol."""
+    blocks = size.blocks
+    degree = size.ecc_codewords // blocks
+    result = list(codewords)
+    result.extend([0] * size.ecc_codewords)
+    for block in range(blocks):
+        ecc = FIELD.encode(codewords[block::blocks], degree)
+        for position, value in enumerate(ecc):
+            result[len(codewords) + block + position * blocks] = value
+    return result
+
+
+def _placement(rows, columns):
+    """Return the ECC 200 placement of a mapping matrix.
+
+    Returns:
+        list: For every module, row by row, ``codeword * 8 + bit`` with
+        bit 0 the most significant, or -1 for a fixed dark module and -2
+        for a fixed light one
+    """
+    grid = [None] * (rows * columns)
+
+    def module(row, col, codeword, bit):
+        if row < 0:
+            row += rows
+            col += 4 - ((rows + 4) % 8)
+        if col < 0:
+            col += columns
+            row += 4 - ((columns + 4) % 8)
+        grid[row * columns + col] = codeword * 8 + bit
+
+    def utah(row, col, codeword):
+        module(row - 2, col - 2, codeword, 0)
+        module(row - 2, col - 1, codeword, 1)
+        module(row - 1, col - 2, codeword, 2)
+        module(row - 1, col - 1, codeword, 3)
+        module(row - 1, col, codeword, 4)
+        module(row, col - 2, codeword, 5)
+        module(row, col - 1, codeword, 6)
+        module(row, col, codeword, 7)
+
+    def corner(positions, codeword):
+        for bit, (row, col) in enumerate(positions):
+            module(row, col, codeword, bit)
+
+    last_row, last_col = rows - 1, columns - 1
+    codeword = 0
+    row, col = 4, 0
+    while True:
+        if row == rows and col == 0:
+            corner(((last_row, 0), (last_row, 1), (last_row, 2), (0, last_col - 1), (0, last_col),
+                    (1, last_col), (2, last_col), (3, last_col)), codeword)
+            codeword += 1
+        if row == rows - 2 and col == 0 and columns % 4:
+            corner(((rows - 3, 0), (rows - 2, 0), (last_row, 0), (0, last_col - 3), (0, last_col - 2),
+                    (0, last_col - 1), (0, last_col), (1, last_col)), codeword)
+            codeword += 1
+        if row == rows - 2 and col == 0 and columns % 8 == 4:
+            corner(((rows - 3, 0), (rows - 2, 0), (last_row, 0), (0, last_col - 1), (0, last_col),
+                    (1, last_col), (2, last_col), (3, last_col)), codeword)
+            codeword += 1
+        if row == rows + 4 and col == 2 and not columns % 8:
+            corner(((last_row, 0), (last_row, last_col), (0, last_col - 2), (0, last_col - 1), (0, last_col),
+                    (1, last_col - 2), (1, last_col - 1), (1, last_col)), codeword)
+            codeword += 1
+        # Sweep up and to the right
+        while True:
+            if row < rows and col >= 0 and grid[row * columns + col] is None:
+                utah(row, col, codeword)
+                codeword += 1
+            row -= 2
+            col += 2
+            if row < 0 or col >= columns:
+                break
+        row += 1
+        col += 3
+        # Sweep down and to the left
+        while True:
+            if row >= 0 and col < columns and grid[row * columns + col] is None:
+                utah(row, col, codeword)
+                codeword += 1
+            row += 2
+            col -= 2
+            if row >= rows or col < 0:
+                break
+        row += 3
+        col += 1
+        if row >= rows and col >= columns:
+            break
+    if grid[-1] is None:
+        # Unused corner modules of some sizes form a fixed pattern
+        grid[-1] = grid[-columns - 2] = -1
+        grid[-2] = grid[-columns - 1] = -2
+    return grid
+
+
+_placements = {}
+
+
+def placement(rows, columns):
+    """Return the cached placement of a mapping matrix size."""
+    grid = _placements.get((rows, columns))
+    if grid is None:
+        grid = _placements[(rows, columns)] = _placement(rows, columns)
+    return grid
+
+
+def build_matrix(codewords, size):
+    """Place codewords in a symbol with its finder patterns.
+
+    Returns:
+        bytearray: ``size.rows * size.columns`` modules, row by row,
+        1 for dark
+    """
+    region_rows, region_columns = size.region_rows, size.region_columns
+    map_rows = size.rows // (region_rows + 2) * region_rows
+    map_columns = size.columns // (region_columns + 2) * region_columns
+    grid = placement(map_rows, map_columns)
+    modules = bytearray(size.rows * size.columns)
+    columns = size.columns
+
+    # Finder patterns: solid left and bottom edges, alternating top and
+    # right edges around every data region
+    for top in range(0, size.rows, region_rows + 2):
+        bottom = top + region_rows + 1
+        for col in range(columns):
+            modules[bottom * columns + col] = 1
+            if col % 2 == 0:
+                modules[top * columns + col] = 1
+    for left in range(0, columns, region_columns + 2):
+        right = left + region_columns + 1
+        for row in range(size.rows):
+            modules[row * columns + left] = 1
+            if row % 2:
+                modules[row * columns + right] = 1
+
+    for index, value in enumerate(grid):
+        row, col = divmod(index, map_columns)
+        if value is None:
+            continue
+        if value < 0:
+            dark = value == -1
+        else:
+            codeword, bit = divmod(value, 8)
+            dark = codewords[codeword] >> (7 - bit) & 1
+        if dark:
+            symbol_row = row + 2 * (row // region_rows) + 1
+            symbol_col = col + 2 * (col // region_columns) + 1
+            modules[symbol_row * columns + symbol_col] = 1
+    return modules
+
+
+def encode(data, escape=None, rows=None, columns=None, rectangular=False):
+    """Encode ^BX field data as an ECC 200 symbol.
+
+    Args:
+        data (str): Field data
+        escape (str, optional): ^BX escape character; None disables
+            escape sequences
+        rows (int, optional): Requested symbol height in modules
+        columns (int, optional): Requested symbol width in modules
+        rectangular (bool): Allow rectangular symbols
+
+    Returns:
+        tuple: ``(modules, width, height)`` with ``modules`` the bytes of
+        ``build_matrix``
+    """
+    codewords = encode_ascii(escape_tokens(data, escape))
+    size = choose_size(len(codewords), rows, columns, rectangular)
+    codewords = add_error_correction(_pad(codewords, size.data_codewords), size)
+    return bytes(build_matrix(codewords, size)), size.columns, size.rows
@@ -0,0 +1,225 @@
+"""GS1 element strings: application identifiers, lengths and check digits.
+
+The application identifier (AI) table is compiled once into a trie keyed
+by digit. GS1 AIs are prefix-free, so a walk of at most four digits
+identifies the AI at any position of a concatenated element string, and
+its format tells where the data ends: after a fixed length, or at the
+next FNC1 for variable-length data. ``parse`` makes one pass over the
+field data and produces the fields, the FNC1-separated encoder input and
+the human readable text together.
+"""
+
+import re
+from collections import namedtuple
+
+# FNC1 in field data and encoder input, as the Code 128 encoder expects it
+FNC1 = '\xf1'
+
+# AI data formats: digits (N) or GS1 characters (X), a fixed length
+# ("N6"), a maximum length ("X..20") or a range ("N6..12"); "*" marks a
+# check digit ending the component. An "n" in an AI stands for its last
+# digit, 0 to 9 (decimal point position or sequence number).
+_FORMATS = '''
+00 N18*     01 N14*     02 N14*     03 N14*     10 X..20    11 N6       12 N6       13 N6
+15 N6       16 N6       17 N6       20 N2       21 X..20    22 X..20    235 X..28   240 X..30
+241 X..30   242 N..6    243 X..20   250 X..30   251 X..30   253 N13*X..17           254 X..20
+255 N13*N..12           30 N..8     310n N6     311n N6     312n N6     313n N6     314n N6
+315n N6     316n N6     320n N6     321n N6     322n N6     323n N6     324n N6     325n N6
+326n N6     327n N6     328n N6     329n N6     330n N6     331n N6     332n N6     333n N6
+334n N6     335n N6     336n N6     337n N6     340n N6     341n N6     342n N6     343n N6
+344n N6     345n N6     346n N6     347n N6     348n N6     349n N6     350n N6     351n N6
+352n N6     353n N6     354n N6     355n N6     356n N6     357n N6     360n N6     361n N6
+362n N6     363n N6     364n N6     365n N6     366n N6     367n N6     368n N6     369n N6
+37 N..8     390n N..15  391n N3N..15            392n N..15  393n N3N..15            394n N4
+395n N6     400 X..30   401 X..30   402 N17*    403 X..30   410 N13*    411 N13*    412 N13*
+413 N13*    414 N13*    415 N13*    416 N13*    417 N13*    420 X..20   421 N3X..9  422 N3
+423 N3N..12 424 N3      425 N3N..12 426 N3      427 X..3    7001 N13    7002 X..30  7003 N10
+7004 N..4   7005 X..12  7006 N6     7007 N6..12 7008 X..3   7009 X..10  7010 X..2   7020 X..20
+7021 X..20  7022 X..20  7023 X..30  703n N3X..27            710 X..20   711 X..20   712 X..20
+713 X..20   714 X..20   715 X..20   723n X2X..28            8001 N14    8002 X..20  8003 N14*X..16
+8004 X..30  8005 N6     8006 N14*N4 8007 X..34  8008 N8N..4 8009 X..50  8010 X..30  8011 N..12
+8012 X..20  8013 X..25  8017 N18*   8018 N18*   8019 N..10  8020 X..25  8026 N14*N4 8110 X..70
+8111 N4     8112 X..70  8200 X..70  90 X..30    91 X..90    92 X..90    93 X..90    94 X..90
+95 X..90    96 X..90    97 X..90    98 X..90    99 X..90
+'''
+
+# First two digits of the AIs whose data length is predefined: no FNC1
+# follows their data, even before another AI
+PREDEFINED_LENGTH = frozenset(('00', '01', '02', '03', '04', '11', '12', '13', '14', '15', '16', '17', '18', '19',
+                               '20', '31', '32', '33', '34', '35', '36', '41'))
+
+_COMPONENT = re.compile(r'([NX])(\d*)(?:\.\.(\d+))?(\*?)')
+
+
+class ApplicationIdentifier(namedtuple('ApplicationIdentifier', 'ai minimum maximum numeric check predefined')):
+    """Data format of a GS1 application identifier.
+
+    Args:
+        ai (str): The AI digits
+        minimum (int): Minimum data length
+        maximum (int): Maximum data length
+        numeric (tuple): ``(start, end)`` data spans that must be digits
+        check (tuple): ``(start, end)`` spans of digits whose check digit
+            follows at ``end``
+        predefined (bool): Whether the data length is predefined, so no
+            FNC1 separates the data from the next AI
+    """
+
+    __slots__ = ()
+
+
+class ElementString(namedtuple('ElementString', 'fields encoded text')):
+    """Parsed GS1 element string.
+
+    Args:
+        fields (tuple): ``(ai, data)`` pairs
+        encoded (str): AIs and data, with FNC1 after variable-length data
+            that is followed by another AI; encoders add the leading FNC1
+        text (str): Human readable text, AIs in parentheses
+    """
+
+    __slots__ = ()
+
+
+def mod10_check_digit(digits):
+    """Return the GS1 modulo 10 check digit of a digit string."""
+    total = sum(int(digit) * (3 if position % 2 == 0 else 1) for position, digit in enumerate(reversed(digits)))
+    return str(-total % 10)
+
+
+def _application_identifier(ai, data_format):
+    minimum = maximum = 0
+    numeric = []
+    check = []
+    for kind, fixed, longest, check_digit in _COMPONENT.findall(data_format):
+        low = int(fixed) if fixed else 1
+        high = int(longest) if longest else low
+        if kind == 'N':
+            numeric.append((maximum, maximum + high))
+        if check_digit:
+            check.append((maximum, maximum + high - 1))
+        minimum, maximum = maximum + low, maximum + high
+    return ApplicationIdentifier(ai, minimum, maximum, tuple(numeric), tuple(check), ai[:2] in PREDEFINED_LENGTH)
+
+
+def _build_table():
+    table = {}
+    fields = _FORMATS.split()
+    for ai, data_format in zip(fields[::2], fields[1::2]):
+        family = [ai[:-1] + digit for digit in '0123456789'] if ai.endswith('n') else [ai]
+        for member in family:
+            table[member] = _application_identifier(member, data_format)
+    return table
+
+
+APPLICATION_IDENTIFIERS = _build_table()
+
+
+def _build_trie(table):
+    trie = {}
+    for ai, spec in table.items():
+        node = trie
+        for digit in ai[:-1]:
+            node = node.setdefault(digit, {})
+        node[ai[-1]] = spec
+    return trie
+
+
+# Nested dicts keyed by digit; the leaves are ApplicationIdentifiers
+AI_TRIE = _build_trie(APPLICATION_IDENTIFIERS)
+
+
+def match_ai(data, index=0):
+    """Return the ApplicationIdentifier at ``data[index]``, or None."""
+    node = AI_TRIE
+    for position in range(index, min(index + 4, len(data))):
+        node = node.get(data[position])
+        if node is None or isinstance(node, ApplicationIdentifier):
+            return node
+    return None
+
+
+def validate(spec, data):
+    """Check AI data against its format.
+
+    Raises:
+        ValueError: if the length, a digit or a check digit is wrong
+    """
+    if not spec.minimum <= len(data) <= spec.maximum:
+        if spec.minimum == spec.maximum:
+            raise ValueError(f"AI ({spec.ai}) data must be {spec.maximum} characters, got {data!r}")
+        raise ValueError(f"AI ({spec.ai}) data must be {spec.minimum} to {spec.maximum} characters, got {data!r}")
+    for start, end in spec.numeric:
+        digits = data[start:end]
+        if digits and not (digits.isascii() and digits.isdigit()):
+            raise ValueError(f"AI ({spec.ai}) data must be digits, got {data!r}")
+    for start, end in spec.check:
+        if data[end] != mod10_check_digit(data[start:end]):
+            raise ValueError(f"AI ({spec.ai}) data {data!r} has a wrong check digit")
+
+
+def parse(data, fnc1=FNC1):
+    """Parse a GS1 element string in one pass.
+
+    The AIs are either in parentheses, each one's data running to the next
+    AI, or concatenated: the AI is found in the trie and its data runs for
+    its fixed length, or up to the next ``fnc1`` or its maximum length.
+    Unknown AIs are accepted in parentheses, as variable-length data.
+
+    Args:
+        data (str): Field data
+        fnc1 (str): FNC1 character, in the data and the encoded string
+
+    Returns:
+        ElementString: The fields, encoder input and human readable text
+
+    Raises:
+        ValueError: if an AI is unknown or its data does not match its
+            format
+    """
+    fields = []
+    encoded = []
+    text = []
+    separate = False
+    index = 0
+    length = len(data)
+    while index < length:
+        char = data[index]
+        if char == fnc1:
+            index += 1
+            continue
+        if char == '(':
+            close = data.find(')', index)
+            if close < 0:
+                raise ValueError(f"Unclosed application identifier in {data!r}")
+            ai = data[index + 1:close]
+            if not (ai.isascii() and ai.isdigit() and 2 <= len(ai) <= 4):
+                raise ValueError(f"Invalid application identifier ({ai})")
+            spec = APPLICATION_IDENTIFIERS.get(ai)
+            start = stop = close + 1
+            while stop < length and data[stop] != '(' and data[stop] != fnc1:
+                stop += 1
+        else:
+            spec = match_ai(data, index)
+            if spec is None:
+                raise ValueError(f"Unknown application identifier at {data[index:index + 4]!r}")
+            ai = spec.ai
+            start = stop = index + len(ai)
+            if spec.minimum == spec.maximum:
+                stop = min(start + spec.maximum, length)
+            else:
+                limit = min(start + spec.maximum, length)
+                while stop < limit and data[stop] != fnc1:
+                    stop += 1
+        value = data[start:stop]
+        if spec is not None:
+            validate(spec, value)
+        if separate:
+            encoded.append(fnc1)
+        encoded.append(ai)
+        encoded.append(value)
+        text.append(f'({ai}){value}')
+        fields.append((ai, value))
+        separate = spec is None or not spec.predefined
+        index = stop
+    return ElementString(tuple(fields), ''.join(encoded), ''.join(text))
@@ -0,0 +1,179 @@
+"""Table-driven encoders of the fixed-pattern linear symbologies.
+
+Every symbology maps its characters to precomputed run tuples (bar and
+space widths, starting with a bar or a space as the symbology requires),
+so encoding is a lookup per character and a concatenation. Code 39 and
+Interleaved 2 of 5 are two-width symbologies: their runs are 1 for narrow
+and 2 for wide elements, and the renderer scales wide elements by the ^BY
+ratio. EAN and UPC runs are in modules; their tables also say which bars
+are guard bars and where the digits of the interpretation line go.
+"""
+
+from .gs1 import mod10_check_digit
+
+NARROW, WIDE = 1, 2
+
+
+def _two_width(pattern):
+    """Convert a ``0``/``1`` narrow/wide pattern string into runs."""
+    return tuple(WIDE if element == '1' else NARROW for element in pattern)
+
+
+# Code 39: nine elements (five bars, four spaces) per character, three of
+# them wide, in the order of the character values
+CODE39_CHARS = '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ-. $/+%'
+CODE39_VALUES = {char: value for value, char in enumerate(CODE39_CHARS)}
+CODE39_RUNS = {char: _two_width(pattern) for char, pattern in zip(CODE39_CHARS + '*', (
+    '000110100', '100100001', '001100001', '101100000', '000110001', '100110000', '001110000', '000100101',
+    '100100100', '001100100', '100001001', '001001001', '101001000', '000011001', '100011000', '001011000',
+    '000001101', '100001100', '001001100', '000011100', '100000011', '001000011', '101000010', '000010011',
+    '100010010', '001010010', '000000111', '100000110', '001000110', '000010110', '110000001', '011000001',
+    '111000000', '010010001', '110010000', '011010000', '010000101', '110000100', '011000100', '010101000',
+    '010100010', '010001010', '000101010', '010010100',
+))}
+# Full ASCII Code 39: characters outside the base set as pairs of base
+# characters, indexed by character code
+CODE39_FULL_ASCII = (
+    ['%U'] + ['$' + chr(65 + code) for code in range(26)] + ['%' + chr(65 + code) for code in range(5)] +
+    [' ', '/A', '/B', '/C', '/D', '/E', '/F', '/G', '/H', '/I', '/J', '/K', '/L', '-', '.', '/O'] +
+    [chr(48 + code) for code in range(10)] + ['/Z'] + ['%' + chr(70 + code) for code in range(5)] + ['%V'] +
+    [chr(65 + code) for code in range(26)] + ['%' + chr(75 + code) for code in range(5)] + ['%W'] +
+    ['+' + chr(65 + code) for code in range(26)] + ['%' + chr(80 + code) for code in range(5)]
+)
+
+# Interleaved 2 of 5: five elements per digit, two of them wide; a digit
+# pair interleaves the bars of the first digit with the spaces of the second
+_ITF_DIGITS = ('00110', '10001', '01001', '11000', '00101', '10100', '01100', '00011', '10010', '01010')
+ITF_PAIRS = {
+    f'{first}{second}': tuple(run for pair in zip(_two_width(_ITF_DIGITS[first]),
+                                                  _two_width(_ITF_DIGITS[second])) for run in pair)
+    for first in range(10) for second in range(10)
+}
+ITF_START = (NARROW, NARROW, NARROW, NARROW)
+ITF_STOP = (WIDE, NARROW, NARROW)
+
+# EAN/UPC digit sets: L and G start with a space, R with a bar; G is R
+# reversed
+_EAN_R = ('3211', '2221', '2122', '1411', '1132', '1231', '1114', '1312', '1213', '3112')
+EAN_L = tuple(tuple(int(width) for width in pattern) for pattern in _EAN_R)
+EAN_R = EAN_L
+EAN_G = tuple(runs[::-1] for runs in EAN_L)
+# Digit sets of the left half of EAN-13, selected by the first digit
+EAN13_PARITY = ('LLLLLL', 'LLGLGG', 'LLGGLG', 'LLGGGL', 'LGLLGG', 'LGGLLG', 'LGGGLL', 'LGLGLG', 'LGLGGL', 'LGGLGL')
+EAN_GUARD = (1, 1, 1)
+EAN_CENTER = (1, 1, 1, 1, 1)
+
+
+def code39(data, check_digit=False):
+    """Encode ^B3 field data.
+
+    Characters outside the Code 39 set are encoded as full ASCII pairs.
+
+    Returns:
+        tuple: ``(runs, text)`` with narrow/wide runs, starting with a bar
+    """
+    chars = []
+    for char in data:
+        if char in CODE39_VALUES:
+            chars.append(char)
+        elif ord(char) < 128:
+            chars.extend(CODE39_FULL_ASCII[ord(char)])
+    check = ''
+    if check_digit:
+        check = CODE39_CHARS[sum(CODE39_VALUES[char] for char in chars) % 43]
+        chars.append(check)
+    runs = list(CODE39_RUNS['*'])
+    for char in chars:
+        # Narrow intercharacter gap
+        runs.append(NARROW)
+        runs.extend(CODE39_RUNS[char])
+    runs.append(NARROW)
+    runs.extend(CODE39_RUNS['*'])
+    return tuple(runs), f'*{data}{check}*'
+
+
+def interleaved_2of5(data, check_digit=False):
+    """Encode ^B2 field data; an odd number of digits gets a leading zero.
+
+    Returns:
+        tuple: ``(runs, text)`` with narrow/wide runs, starting with a bar
+    """
+    digits = ''.join(char for char in data if char.isdigit())
+    if check_digit:
+        digits += mod10_check_digit(digits)
+    if len(digits) % 2:
+        digits = '0' + digits
+    runs = list(ITF_START)
+    for index in range(0, len(digits), 2):
+        runs.extend(ITF_PAIRS[digits[index:index + 2]])
+    runs.extend(ITF_STOP)
+    return tuple(runs), digits
+
+
+def _ean_digits(data, length):
+    """Return ``length`` data digits, zero padded on the left, and their check digit."""
+    digits = ''.join(char for char in data if char.isdigit())[:length].rjust(length, '0')
+    return digits + mod10_check_digit(digits)
+
+
+def _ean_runs(left, right, parity):
+    runs = list(EAN_GUARD)
+    for digit, digit_set in zip(left, parity):
+        runs.extend((EAN_G if digit_set == 'G' else EAN_L)[int(digit)])
+    runs.extend(EAN_CENTER)
+    for digit in right:
+        runs.extend(EAN_R[int(digit)])
+    runs.extend(EAN_GUARD)
+    return tuple(runs)
+
+
+# Bar run indexes of the guard patterns: start guard, center guard and end
+# guard bars, for a symbol with ``count`` digits per half
+def _guard_bars(count):
+    center = 3 + 4 * count
+    end = center + 5 + 4 * count
+    return (0, 2, center + 1, center + 3, end, end + 2)
+
+
+def ean13(data, mode=None):
+    """Encode ^BE field data: 12 digits and a check digit.
+
+    Returns:
+        tuple: ``(runs, text, guards, groups)``
+    """
+    digits = _ean_digits(data, 12)
+    runs = _ean_runs(digits[1:7], digits[7:], EAN13_PARITY[int(digits[0])])
+    groups = ((digits[0], -9, -1), (digits[1:7], 3, 45), (digits[7:], 50, 92))
+    return runs, digits, _guard_bars(6), groups
+
+
+def ean8(data, mode=None):
+    """Encode EAN-8 field data: 7 digits and a check digit.
+
+    Returns:
+        tuple: ``(runs, text, guards, groups)``
+    """
+    digits = _ean_digits(data, 7)
+    runs = _ean_runs(digits[:4], digits[4:], 'LLLL')
+    groups = ((digits[:4], 3, 31), (digits[4:], 36, 64))
+    return runs, digits, _guard_bars(4), groups
+
+
+def upc_a(data, print_check_digit=True):
+    """Encode ^BU field data: 11 digits and a check digit.
+
+    The first and last digits are printed outside the symbol and their
+    bars extend with the guard bars.
+
+    Returns:
+        tuple: ``(runs, text, guards, groups)``
+    """
+    digits = _ean_digits(data, 11)
+    runs = _ean_runs(digits[:6], digits[6:], 'LLLLLL')
+    guards = _guard_bars(6)
+    # Bars of the first and last digits
+    guards += (4, 6, guards[4] - 4, guards[4] - 2)
+    groups = ((digits[0], -9, -1), (digits[1:6], 10, 45), (digits[6:11], 50, 85))
+    if print_check_digit:
+        groups += ((digits[11], 96, 104),)
+    return runs, digits, guards, groups
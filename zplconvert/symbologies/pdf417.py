@@ -0,0 +1,555 @@
+"""PDF417 encoder.
+
+Field data is compacted into codewords (text compaction with its four
+submodes, byte compaction and numeric compaction), prefixed with the
+symbol length descriptor, padded and extended with Reed–Solomon codewords
+over GF(929). The codewords are laid out in rows of 1 to 30 data columns
+between the row indicators, and every codeword becomes the 17 module
+bar-space pattern of the cluster its row uses.
+"""
+
+from .reedsolomon import PDF417_FIELD
+
+# Mode latch and shift codewords
+TEXT_LATCH = 900
+BYTE_LATCH = 901
+NUMERIC_LATCH = 902
+BYTE_SHIFT = 913
+BYTE_LATCH_6 = 924
+PAD = TEXT_LATCH
+
+MAX_CODEWORDS = 928
+MAX_COLUMNS = 30
+MIN_ROWS, MAX_ROWS = 3, 90
+
+# Bar and space widths of codewords 0-928 in clusters 0, 3 and 6, eight
+# digits per codeword; row r uses cluster 3 * (r % 3)
+_CLUSTER_WIDTHS = (
+    (
+        '31111136411111445111115231111235411112435111125121111326311113342111142511111516211115241111161521112136'
+        '31112144411121522111223531112243411122511111232621112334111124251111313621113144311131521111323521113243'
+        '31113251111133342111334211114144211141521111424321114251111151525111611131121135411211435112115121121226'
+        '31121234411212422112132531121333111214162112142431121432111215152112152311121614211221353112214341122151'
+        '11122226211222343112224211122325211223333112234111122424211224321112313521123143311231511112323421123242'
+        '11123333211233411112414321124151111242421112434121131126311311344113114221131225311312334113124111131316'
+        '21131324311313321113141521131423111315141113161311132126211321343113214211132225211322333113224111132324'
+        '21132332111324231113252211133134211331421113323321133241111333321113414221141125311411334114114111141216'
+        '21141224311412321114131521141323311413311114141421141422111415132114152111142125211421333114214111142224'
+        '21142232111423232114233111142422111425212114314111143331111511162115112431151132111512152115122331151231'
+        '11151314211513221115141321151421111515121115212411152223111523221116111531161131211612222116132111161511'
+        '32111135421111435211115122111226321112344211124222111325321113334211134112111416221114241211151522112135'
+        '32112143421121511211222622112234321122421211232522112333121124241211252312113135221131433211315112113234'
+        '22113242121133331211343212114143221141511211424212115151312111264121113451211142312112254121123351211241'
+        '21211316312113244121133221211415312114234121143121211514312115222212112632121134421211422121212622121225'
+        '32121233421212412121222531212233412122411121231612121415221214233212143111212415212124231121251412122126'
+        '22122134321221421121312612122225221222333212224111213225212132333121324111213324121224231121342312123134'
+        '22123142112141341212323322123241112142332121424111214332121241421121514212124241112152413122112541221133'
+        '51221141212212163122122441221232212213153122132341221331212214143122142221221513212216122213112532131133'
+        '42131141212221252213122432131232112222161213131531222232321313311122231512131414221314221122241421222422'
+        '22131521121316121213212522132133321321411122312512132224221322321122322421223232221323311122332312132422'
+        '12132521121331332213314111224133121332321122423212133331112243311122514121231116312311244123113221231215'
+        '31231223412312312123131431231322212314133123142121231512212316111214111622141124321411321123211612141215'
+        '22141223321412311123221521232223312322311123231412141413221414211123241321232421112325121214212422142132'
+        '11233124121422232214223111233223212332311123332212142421112334211123413211234231212411153124112341241131'
+        '21241214312412222124131331241321212414122124151112151115221511233215113111242115121512142215122211242214'
+        '21242222221513211124231312151412112424121215151112152123112431231124322211243321312511223125122121251411'
+        '22161122121612131125221311252312112524112311112633111134431111422311122533111233131113162311132433111332'
+        '13111415231114231311151413111613131121262311213433112142131122252311223333112241131123242311233213112423'
+        '13112522131131342311314213113233231132411311333213114142131142413221112542211133522111412221121632211224'
+        '42211232222113153221132342211331222114143221142222211513322115212312112533121133431211412221212523121224'
+        '33121232122122161312131532212232331213311221231522212323231214221221241413121513122125131312212523122133'
+        '33122141122131251312222432213141122132242221323223122331122133231312242212213422131231332312314112214133'
+        '13123232122142321312333113124141122151413131111641311124513111323131121541311223513112313131131441311322'
+        '31311413413114213131151222221116322211244222113221312116222212154131213242221231213122153131222341312231'
+        '21312314222214133222142121312413313124212222161113131116231311243313113212222116131312152313122333131231'
+        '11313116122222152222222332222231113132152131322331313231231314211131331412222413222224211131341313131611'
+        '13132124231321321222312413132223231322311131412412223223222232311131422321314231131324211222342113133132'
+        '12224132131332311131513212224231313211154132112351321131313212144132122231321313413213213132141231321511'
+        '22231115322311234223113121322115222312144132213121322214313222223223132121322313222314122132241222231511'
+        '21322511131411152314112333141131122321151314121423141222113231151223221422232222231413211132321421323222'
+        '13141412113233131223241213141511122325111314212323142131122331231314222211324123122332221314232111324222'
+        '12233321131431311132513131331114413311223133121341331221313313123133141122241114322411222133211422241213'
+        '32241221213322133133222121332312222414112133241113151114231511221224211413151213231512211133311412242213'
+        '22242221113332132133322113151411113333121224241111333411122431221133412211334221413411213134131132251121'
+        '22251212222513111316111312252113113431131316131112252311241111251411121624111224141113152411132334111331'
+        '14111414241114221411151324111521141121252411213334112141141122242411223214112323241123311411242214112521'
+        '14113133241131411411323214113331141141412321111633211124432111322321121533211223232113143321132223211413'
+        '33211421232115121412111624121124341211321321211614121215332121323412123113212215232122233321223113212314'
+        '14121413241214211321241323212421141216111412212424122132132131241412222324122231132132232321323113213322'
+        '14122421141231321321413214123231132142313231111542311123523111313231121442311222323113134231132132311412'
+        '32311511232211153322112322312115232212143322122222312214323122223322132122312313232214122231241223221511'
+        '22312511141311152413112313222115141312143322213112313115132222142322222224131321123132142231322214131412'
+        '12313313132224121413151113222511141321232413213113223123141322221231412313223222141323211231422213223321'
+        '14133131132241311231513141411114514111224141121351411221414113124141141132321114423211223141211441412122'
+        '42321221314122134141222131412312323214113141241123231114332311222232211423231213332312212141311422322213'
+        '32322221214132133141322123231411214133122232241121413411141411142414112213232114141412132414122112323114'
+        '13232213232322211141411412323213223232211414141111414213214142211323241111414312141421221323312214142221'
+        '12324122132332211141512212324221114152214142111351421121414212124142131132331113423311213142211341422121'
+        '31422212323313113142231123241113332411212233211323241212214231132233221223241311214232122233231121423311'
+        '14151113241511211324211323242121123331131324221214151311114241131233321213242311114242121233331111424311'
+        '13243121114251214143121131432112314322112234211221433112214332111325211212343112114341121143421115111116'
+        '15111215251112231511131415111413151115121511212415112223151123221511242115113132151132312421111524211214'
+        '34211222242113133421132124211412242115111512111525121123142121152421212325121222142122142421222214212313'
+        '24212321142124121512151114212511151221232512213114213123242131311421322215122321142133211512313114214131'
+        '33311114333112133331131233311411242211142331211433312122342212212331221333312221233123122422141123312411'
+        '15131114142221141513121325131221133131141422221315131312133132131422231215131411133133121422241115132122'
+        '14223122151322211331412214223221133142214241111342411212424113113332111332412113424121213241221233321311'
+        '32412311242311133423112123322113333221212241311323322212242313112241321223322311224133111514111325141121'
+        '14232113242321211332311314232212151413111241411313323212142323111241421213323311151421211423312113324121'
+        '12415121515111125151121142421112415121124242121141512211333311123242211233331211315131123242221131513211'
+        '242411122333211224241211224231122333221121514112'
+    ),
+    (
+        '51111125611111334111121651111224611112324111131551111323611113314111141451111422411115135111152141111612'
+        '41112125511121336111214131112216411122245111223231112315411123235111233131112414411124223111251341112521'
+        '31112612311131254111313351113141211132163111322441113232211133153111332341113331211134143111342221113513'
+        '31113521211136122111412531114133411141411111421621114224311142321111431521114323311143311111441421114422'
+        '11114513211145211111512521115133311151411111522421115232111153232111533111115422111161332111614111116232'
+        '11116331411211165112112461121132411212155112122361121231411213145112132241121413511214214112151241121611'
+        '31122116411221245112213231122215411222235112223131122314411223223112241341122421311225123112261121123116'
+        '31123124411231322112321531123223411232312112331431123322211234133112342121123512211236111112411621124124'
+        '31124132111242152112422331124231111243142112432211124413211244211112451211125124211251321112522321125231'
+        '11125322111254211112613211126231411311155113112361131131411312145113122241131313511313214113141241131511'
+        '31132115411321235113213131132214411322223113231341132321311324123113251121133115311331234113313121133214'
+        '31133222211333133113332121133412211335111113411521134123311341311113421421134222111343132113432111134412'
+        '11134511111351232113513111135222111353211113613141141114511411224114121351141221411413124114141131142114'
+        '41142122311422134114222131142312311424112114311431143122211432133114322121143312211434111114411421144122'
+        '11144213211442211114431211144411111451221114522141151113511511214115121241151311311521134115212131152212'
+        '31152311211531133115312121153212211533111115411321154121111542121115431141161112411612113116211231162211'
+        '21163112211632114211111652111124621111324211121552111223621112314211131452111322421114135211142142111512'
+        '42111611321121164211212452112132321122154211222352112231321123144211232232112413421124213211251232112611'
+        '22113116321131244211313222113215321132234211323122113314321133222211341332113421221135122211361112114116'
+        '22114124321141321211421522114223321142311211431422114322121144132211442112114512121151242211513212115223'
+        '22115231121153221211542112116132121162315121111561211123112111645121121461211222112112635121131361211321'
+        '11211362512114125121151142121115521211236212113141212115421212146121213141212214512122225212132141212313'
+        '42121412412124124212151141212511321221154212212352122131312131153212221442122222312132144121322242122321'
+        '31213313321224123121341232122511312135112212311532123123421231312121411522123214321232222121421431214222'
+        '32123321212143132212341221214412221235112121451112124115221241233212413111215115121242142212422211215214'
+        '21215222221243211121531312124412112154121212451112125123221251311121612312125222112162221212532111216321'
+        '12126131512211146122112211221163512212136122122111221262512213121122136151221411421311145213112241222114'
+        '42131213521312214122221351222221412223124213141141222411321321144213212231223114321322134213222131223213'
+        '41223221312233123213241131223411221331143213312221224114221332133213322121224213312242212122431222133411'
+        '21224411121341142213412211225114121342132213422111225213212252211122531212134411112254111213512211226122'
+        '12135221112262215123111361231121112311625123121211231261512313114214111352141121412321135123212141232212'
+        '42141311412323113214211342142121312331133214221231233212321423113123331122143113321431212123411331234121'
+        '21234212221433112123431112144113221441211123511312144212112352121214431111235311121451211123612151241112'
+        '11241161512412114215111241242112421512114124221132152112312431123215221131243211221531122124411222153211'
+        '21244211121541121124511212154211112452115125111142161111412521113216211131253111221631112125411143111115'
+        '53111123631111314311121453111222431113135311132143111412431115113311211543112123531121313311221443112222'
+        '33112313431123213311241233112511231131153311312343113131231132143311322223113313331133212311341223113511'
+        '13114115231141233311413113114214231142221311431323114321131144121311451113115123231151311311522213115321'
+        '13116131522111146221112212211163522112136221122112211262522113121221136152211411431211145312112242212114'
+        '43121213531212214221221352212221422123124312141142212411331221144312212232213114331222134312222132213213'
+        '42213221322133123312241132213411231231143312312222214114231232133312322122214213322142212221431223123411'
+        '22214411131241142312412212215114131242132312422112215213222152211221531213124411122154111312512212216122'
+        '13125221122162216131111311311154213111626131121211311253213112616131131111311352113114515222111362221121'
+        '12221162513121136131212111312162122212615131221252221311113122615131231143131113531311214222211343131212'
+        '41313113513131214313131141313212422223114131331133132113431321213222311333132212313141133222321233132311'
+        '31314212322233113131431123133113331331212222411323133212213151132222421223133311213152122222431121315311'
+        '13134113231341211222511313134212113161131222521213134311113162121222531111316311131351211222612161321112'
+        '11321153213211616132121111321252113213515223111212231161513221125223121111322161513222114314111242232112'
+        '43141211413231124223221141323211331421123223311233142211313241123223321131324211231431122223411223143211'
+        '21325112222342112132521113144112122351121314421111326112122352111132621161331111113311521133125152241111'
+        '51332111431511114224211141333111331521113224311131334111231531112224411121335111131541111224511111336111'
+        '11341151441111145411112244111213541112214411131244111411341121144411212234112213441122213411231234112411'
+        '24113114341131222411321334113221241133122411341114114114241141221411421324114221141143121411441114115122'
+        '14115221532111136321112113211162532112121321126153211311441211135412112143212113441212124321221244121311'
+        '43212311341221134412212133213113341222123321321234122311332133112412311334123121232141132412321223214212'
+        '24123311232143111412411324124121132151131412421213215212141243111321531114125121132161216231111212311153'
+        '22311161623112111231125212311351532211121322116152312112532212111231216152312211441311124322211244131211'
+        '42313112432222114231321134132112332231123413221132314112332232113231421124133112232241122413321122315112'
+        '23224211223152111413411213225112141342111231611213225211123162111141114421411152114112432141125111411342'
+        '11411441623211111232115261412111114121521232125111412251532311115232211151413111441411114323211142323111'
+        '41414111341421113323311132324111314151112414311123234111223251112141611114144111132351111232611111421143'
+        '21421151114212421142134112331151114221511143114211431241114411414511111345111212451113113511211345112121'
+        '35112212351123112511311335113121251132122511331115114113251141211511421215114311151151215421111214211161'
+        '54211211451211124421211245121211442122113512211234213112351222113421321125123112242141122512321124214211'
+        '15124112142151121512421114215211633111111331115213311251542211115331211145131111442221114331311135132111'
+        '34223111333141112513311124224111233151111513411114225111133161111241114322411151124112421241134113321151'
+        '12412151115111342151114211511233215112411151133211511431124211421151214212421241115122411152113321521141'
+        '11521232115213311243114111522141115311321153123111541131361121123611221126113112261132111611411216114211'
+        '45212111361221113521311126123111252141111612411115215111143111511341114213411241125111332251114112511232'
+        '12511331134211411251214111611124216111321161122321611231116113221161142112521132116121321252123111612231'
+        '11621123216211311162122211621321125311311162213111631122116312211441114113511132135112311261112322611131'
+        '126112221261132113521131126121311262112212621221'
+    ),
+    (
+        '21111155311111631111124621111254311112621111134521111353311113611111144421111452111115436111211411112155'
+        '21112163611122131111225421112262611123121111235321112361611124111111245251113114611131221111316351113213'
+        '61113221111132625111331211113361511134114111411451114122411142135111422141114312411144113111511441115122'
+        '31115213411152213111531231115411211161143111612221116213311162212111631211121146211211543112116211121245'
+        '21121253311212611112134421121352111214432112145111121542611221131112215421122162611222121112225321122261'
+        '61122311111223521112245151123113611231211112316251123212111232615112331141124113511241214112421241124311'
+        '31125113411251213112521231125311211261133112612121126212211263111113114521131153311311611113124421131252'
+        '11131343211313511113144211131541611321121113215321132161611322111113225211132351511331121113316151133211'
+        '41134112411342113113511231135211211361122113621111141144211411521114124321141251111413421114144161142111'
+        '11142152111422515114311141144111311451111115114321151151111512421115134111152151111611421116124112111146'
+        '22111154321111621211124522111253321112611211134422111352121114432211145112111542621121131211215422112162'
+        '62112212121122532211226162112311121123521211245152113113621131211211316252113212121132615211331142114113'
+        '52114121421142124211431132115113421151213211521232115311221161133211612122116212221163112121114531211153'
+        '41211161112112362121124431211252112113352121134331211351112114342121144211211533212115411121163212121145'
+        '22121153321211611121214512121244221212521121224421212252221213511121234312121442112124421212154111212541'
+        '62122112121221532212216161213112621222111121315312122252612132111121325212122351112133515212311212123161'
+        '51214112521232111121416151214211421241124121511242124211412152113212511231216112321252113121621122126112'
+        '22126211112211362122114431221152112212352122124331221251112213342122134211221433212214411122153211221631'
+        '12131144221311521122214412131243221312511122224321222251112223421213144111222441621321111213215261223111'
+        '11223152121322511122325152133111512241114213411141225111321351113122611122136111112311352123114331231151'
+        '11231234212312421123133321231341112314321123153112141143221411511123214312141242112322421214134111232341'
+        '12142151112331511124113421241142112412332124124111241332112414311215114211242142121512411124224111251133'
+        '21251141112512321125133112161141112521411126113211261231131111452311115333111161131112442311125213111343'
+        '23111351131114421311154163112112131121532311216163112211131122521311235153113112131131615311321143114112'
+        '43114211331151123311521123116112231162111221113622211144322111521221123522211243322112511221133422211342'
+        '12211433222114411221153212211631131211442312115212212144131212432312125112212243222122511221234213121441'
+        '12212441631221111312215262213111122131521312225112213251531231115221411143124111422151113312511132216111'
+        '23126111213111353131114341311151113112262131123431311242113113252131133331311341113114242131143211311523'
+        '21311531113116221222113522221143322211511131213512221234222212421131223421312242222213411131233312221432'
+        '11312432122215311131253113131143231311511222214313131242113131431222224213131341113132421222234111313341'
+        '13132151122231511131415111321126213211343132114211321225213212333132124111321324213213321132142321321431'
+        '11321522113216211223113422231142113221341223123322231241113222332132224111322332122314311132243113141142'
+        '12232142131412411132314212232241113232411133112521331133313311411133122421331232113313232133133111331422'
+        '11331521122411332224114111332133122412321133223212241331113323311315114112242141113331411134112421341132'
+        '11341223213412311134132211341421122511321134213212251231113422311135112321351131113512221135132112261131'
+        '11352131113611221136122114111144241111521411124324111251141113421411144114112152141122515411311144114111'
+        '34115111241161111321113523211143332111511321123423211242132113332321134113211432132115311412114324121151'
+        '13212143141212421321224214121341132123411412215113213151123111262231113432311142123112252231123332311241'
+        '12311324223113321231142322311431123115221231162113221134232211421231213413221233232212411231223313221332'
+        '12312332132214311231243114131142132221421413124112313142132222411231324121411125314111334141114111411216'
+        '21411224314112321141131521411323314113311141141421411422114115132141152111411612123211252232113332321141'
+        '11412125123212242232123211412224214122322232133111412323123214221141242212321521114125211323113323231141'
+        '12322133132312321141313312322232132313311141323212322331114133311414114113232141123231411141414111421116'
+        '21421124314211321142121521421223314212311142131421421322114214132142142111421512114216111233112422331132'
+        '11422124123312232233123111422223214222311142232212331421114224211324113212332132132412311142313212332231'
+        '11423231114311152143112331431131114312142143122211431313214313211143141211431511123411232234113111432123'
+        '12341222114322221234132111432321132511311234213111433131114411142144112211441213214412211144131211441411'
+        '12351122114421221235122111442221114511132145112111451212114513111236112111452121151111432511115115111242'
+        '15111341151121511421113424211142142112332421124114211332142114311512114214212142151212411421224113311125'
+        '23311133333111411331122423311232133113232331133113311422133115211422113324221141133121331422123213312232'
+        '14221331133123311513114114222141133131411241111622411124324111321241121522411223324112311241131422411322'
+        '12411413224114211241151212411611133211242332113212412124133212232332123112412223224122311241232213321421'
+        '12412421142311321332213214231231124131321332223112413231215111153151112341511131215112143151122221511313'
+        '31511321215114122151151112421115224211233242113111512115124212142242122211512214215122222242132111512313'
+        '12421412115124121242151111512511133311232333113112422123133312221151312312422222133313211151322212422321'
+        '11513321142411311333213112423131115141312152111431521122215212133152122121521312215214111243111422431122'
+        '11522114124312132243122111522213215222211152231212431411115224111334112212432122133412211152312212432221'
+        '11523221215311133153112121531212215313111244111322441121115321131244121211532212124413111153231113351121'
+        '12442121115331212154111221541211124511121154211212451211115422111611114216111241152111332521114115211232'
+        '15211331161211411521214114311124243111321431122324311231143113221431142115221132143121321522123114312231'
+        '13411115234111233341113113411214234112221341131323411321134114121341151114321123243211311341212323412131'
+        '13412222143213211341232115231131143221311341313122511114325111222251121332511221225113122251141113421114'
+        '23421122125121142251212223421221125122131342131212512312134214111251241114331122134221221433122112513122'
+        '13422221125132213161111341611121316112123161131122521113325211212161211322521212216122122252131121612311'
+        '13431113234311211252211313431212116131131252221213431311116132121252231111613311143411211343212112523121'
+        '11614121316211123162121122531112216221122253121121622211134411121253211213441211116231121253221111623211'
+        '31631111225411112163211113451111125421111163311116211132162112311531112325311131153112221531132116221131'
+        '15312131144111142441112214411213244112211441131214411411153211221441212215321221144122212351111333511121'
+        '23511212235113111442111324421121135121132351212113512212144213111351231115331121144221211351312132611112'
+        '32611211235211122261211223521211226122111443111213522112144312111261311213522211126132113262111123531111'
+        '22622111144411111353211112623111163111221631122115411113254111211541121215411311163211211541212124511112'
+        '245112111542111214512112154212111451221133611111'
+    ),
+)
+_START_WIDTHS = '81111113'
+_STOP_WIDTHS = '711311121'
+
+
+def _modules(widths):
+    """Expand alternating bar and space widths into module bytes."""
+    modules = bytearray()
+    for index, width in enumerate(widths):
+        modules.extend((1 - index % 2,) * int(width))
+    return bytes(modules)
+
+
+# Modules of every codeword in each of the three clusters
+CLUSTERS = tuple(tuple(_modules(widths[start:start + 8]) for start in range(0, len(widths), 8))
+                 for widths in _CLUSTER_WIDTHS)
+START = _modules(_START_WIDTHS)
+STOP = _modules(_STOP_WIDTHS)
+# Truncated symbols end in a single module bar
+TRUNCATED_STOP = b'\x01'
+
+# Text compaction submodes
+_ALPHA, _LOWER, _MIXED, _PUNCTUATION = range(4)
+_MIXED_VALUES = {char: value for value, char in enumerate('0123456789&\r\t,:#-.$/+%*=^')}
+_MIXED_VALUES[' '] = 26
+_PUNCTUATION_VALUES = {char: value for value, char in enumerate(';<>@[\\]_`~!\r\t,:\n-.$/"|*()?{}\'')}
+# Latches and shifts; alpha and lower use 29 to shift to punctuation and
+# lower uses 27 to shift to alpha
+_LATCH_LOWER = 27
+_LATCH_MIXED = 28
+_LATCH_PUNCTUATION = 25
+_LATCH_ALPHA_FROM_MIXED = 28
+_LATCH_ALPHA_FROM_PUNCTUATION = 29
+_SHIFT_PUNCTUATION = 29
+_SHIFT_ALPHA = 27
+_TEXT = frozenset('\t\n\r' + ''.join(chr(code) for code in range(32, 127)))
+
+
+def _is_alpha(char):
+    return 'A' <= char <= 'Z' or char == ' '
+
+
+def _is_lower(char):
+    return 'a' <= char <= 'z' or char == ' '
+
+
+def encode_text(text, submode=_ALPHA):
+    """Encode printable text in text compaction.
+
+    Args:
+        text (str): Characters of ``_TEXT``
+        submode (int): Submode in effect before the text
+
+    Returns:
+        tuple: ``(codewords, submode)`` with the submode in effect after
+        the text
+    """
+    values = []
+    index = 0
+    length = len(text)
+    while index < length:
+        char = text[index]
+        if submode == _ALPHA:
+            if _is_alpha(char):
+                values.append(26 if char == ' ' else ord(char) - 65)
+            elif _is_lower(char):
+                submode = _LOWER
+                values.append(_LATCH_LOWER)
+                continue
+            elif char in _MIXED_VALUES:
+                submode = _MIXED
+                values.append(_LATCH_MIXED)
+                continue
+            else:
+                values.append(_SHIFT_PUNCTUATION)
+                values.append(_PUNCTUATION_VALUES[char])
+        elif submode == _LOWER:
+            if _is_lower(char):
+                values.append(26 if char == ' ' else ord(char) - 97)
+            elif _is_alpha(char):
+                values.append(_SHIFT_ALPHA)
+                values.append(ord(char) - 65)
+            elif char in _MIXED_VALUES:
+                submode = _MIXED
+                values.append(_LATCH_MIXED)
+                continue
+            else:
+                values.append(_SHIFT_PUNCTUATION)
+                values.append(_PUNCTUATION_VALUES[char])
+        elif submode == _MIXED:
+            if char in _MIXED_VALUES:
+                values.append(_MIXED_VALUES[char])
+            elif _is_alpha(char):
+                submode = _ALPHA
+                values.append(_LATCH_ALPHA_FROM_MIXED)
+                continue
+            elif _is_lower(char):
+                submode = _LOWER
+                values.append(_LATCH_LOWER)
+                continue
+            elif index + 1 < length and text[index + 1] in _PUNCTUATION_VALUES:
+                submode = _PUNCTUATION
+                values.append(_LATCH_PUNCTUATION)
+                continue
+            else:
+                values.append(_SHIFT_PUNCTUATION)
+                values.append(_PUNCTUATION_VALUES[char])
+        else:
+            if char in _PUNCTUATION_VALUES:
+                values.append(_PUNCTUATION_VALUES[char])
+            else:
+                submode = _ALPHA
+                values.append(_LATCH_ALPHA_FROM_PUNCTUATION)
+                continue
+        index += 1
+    if len(values) % 2:
+        # The pad value shifts to punctuation, or latches to alpha from it
+        values.append(_SHIFT_PUNCTUATION)
+        if submode == _PUNCTUATION:
+            submode = _ALPHA
+    return [values[index] * 30 + values[index + 1] for index in range(0, len(values), 2)], submode
+
+
+def encode_bytes(values, text_mode=False):
+    """Encode byte values in byte compaction.
+
+    A single byte after text is encoded with a byte shift, so text
+    compaction stays in effect.
+    """
+    if len(values) == 1 and text_mode:
+        return [BYTE_SHIFT, values[0]]
+    full = len(values) - len(values) % 6
+    codewords = [BYTE_LATCH if full != len(values) else BYTE_LATCH_6]
+    # Six bytes are a base 256 number written as five base 900 digits
+    for start in range(0, full, 6):
+        value = int.from_bytes(bytes(values[start:start + 6]), 'big')
+        group = [0] * 5
+        for position in range(4, -1, -1):
+            value, group[position] = divmod(value, 900)
+        codewords.extend(group)
+    codewords.extend(values[full:])
+    return codewords
+
+
+def encode_numeric(digits):
+    """Encode a digit string in numeric compaction, 44 digits per group."""
+    codewords = []
+    for start in range(0, len(digits), 44):
+        value = int('1' + digits[start:start + 44])
+        group = []
+        while value:
+            value, digit = divmod(value, 900)
+            group.append(digit)
+        codewords.extend(reversed(group))
+    return codewords
+
+
+def _digit_count(data, start):
+    index = start
+    while index < len(data) and '0' <= data[index] <= '9':
+        index += 1
+    return index - start
+
+
+def _text_count(data, start):
+    """Return the length of the text at ``start``, up to 13 or more digits."""
+    index = start
+    while index < len(data):
+        digits = _digit_count(data, index)
+        if digits >= 13:
+            break
+        if digits:
+            index += digits
+        elif data[index] in _TEXT:
+            index += 1
+        else:
+            break
+    return index - start
+
+
+def _byte_count(data, start):
+    """Return the length of the data at ``start`` best encoded as bytes."""
+    index = start
+    while index < len(data):
+        if _digit_count(data, index) >= 13 or _text_count(data, index) >= 5:
+            break
+        index += 1
+    return index - start
+
+
+def compact(data):
+    """Compact field data into data codewords.
+
+    Runs of 13 or more digits use numeric compaction, runs of at least 5
+    printable characters (or the printable rest of the data) use text
+    compaction and anything else byte compaction.
+
+    Returns:
+        list: Data codewords, without the symbol length descriptor
+    """
+    codewords = []
+    text_mode = True
+    submode = _ALPHA
+    index = 0
+    length = len(data)
+    while index < length:
+        digits = _digit_count(data, index)
+        if digits >= 13:
+            codewords.append(NUMERIC_LATCH)
+            codewords.extend(encode_numeric(data[index:index + digits]))
+            text_mode = False
+            index += digits
+            continue
+        count = _text_count(data, index)
+        if count >= 5 or count == length - index:
+            if not text_mode:
+                codewords.append(TEXT_LATCH)
+                text_mode = True
+                submode = _ALPHA
+            text, submode = encode_text(data[index:index + count], submode)
+            codewords.extend(text)
+            index += count
+            continue
+        count = max(_byte_count(data, index), 1)
+        codewords.extend(encode_bytes([min(ord(char), 255) for char in data[index:index + count]], text_mode))
+        if count > 1 or not text_mode:
+            text_mode = False
+        index += count
+    return codewords
+
+
+def choose_dimensions(count, columns=None, rows=None):
+    """Return the ``(columns, rows)`` of a symbol holding ``count`` codewords.
+
+    Missing dimensions follow the ^B7 default of twice as many columns as
+    rows, as far as the data allows.
+    """
+    if columns and rows:
+        pass
+    elif columns:
+        rows = max(MIN_ROWS, -(-count // columns))
+    elif rows:
+        columns = -(-count // rows)
+    else:
+        for columns in range(1, MAX_COLUMNS + 1):
+            rows = max(MIN_ROWS, -(-count // columns))
+            if rows <= MAX_ROWS and columns >= 2 * rows:
+                break
+    if columns > MAX_COLUMNS or rows > MAX_ROWS or count > columns * rows or columns * rows > MAX_CODEWORDS:
+        raise ValueError(f"Data too long for PDF417: {count} codewords in {columns} columns and {rows} rows")
+    return columns, rows
+
+
+def build_matrix(codewords, columns, rows, level, truncated=False):
+    """Lay out the codewords of a symbol in rows.
+
+    Returns:
+        bytes: One module row per symbol row, 1 for dark
+    """
+    row_value = (rows - 1) // 3
+    level_value = level * 3 + (rows - 1) % 3
+    column_value = columns - 1
+    indicators = (
+        (row_value, column_value),
+        (level_value, row_value),
+        (column_value, level_value),
+    )
+    stop = TRUNCATED_STOP if truncated else STOP
+    lines = []
+    for row in range(rows):
+        patterns = CLUSTERS[row % 3]
+        base = row // 3 * 30
+        left, right = indicators[row % 3]
+        line = [START, patterns[base + left]]
+        line.extend(patterns[codeword] for codeword in codewords[row * columns:(row + 1) * columns])
+        if not truncated:
+            line.append(patterns[base + right])
+        line.append(stop)
+        lines.append(b''.join(line))
+    return b''.join(lines)
+
+
+def encode(data, level=0, columns=None, rows=None, truncated=False):
+    """Encode ^B7 field data as a PDF417 symbol.
+
+    Args:
+        data (str): Field data
+        level (int): Security level 0-8, ``2 ** (level + 1)`` error
+            correction codewords
+        columns (int, optional): Number of data columns, 1-30
+        rows (int, optional): Number of rows, 3-90
+        truncated (bool): Omit the right row indicators and the stop
+            pattern
+
+    Returns:
+        tuple: ``(modules, width, height)`` with one module row per
+        symbol row
+    """
+    codewords = compact(data)
+    ecc_count = 2 << level
+    columns, rows = choose_dimensions(len(codewords) + 1 + ecc_count, columns, rows)
+    data_count = columns * rows - ecc_count
+    codewords = [data_count] + codewords + [PAD] * (data_count - 1 - len(codewords))
+    codewords.extend(PDF417_FIELD.encode(codewords, ecc_count))
+    modules = build_matrix(codewords, columns, rows, level, truncated)
+    return modules, len(modules) // rows, rows
@@ -0,0 +1,505 @@
+"""QR Code (model 2) encoder.
+
+The whole symbol is built as one Python integer, a bitset of padded rows
+(1 for dark). Function patterns, the data module order and the mask
+patterns depend only on the version and are built once per version; a
+mask is applied with one XOR, and the penalty rules are evaluated with
+shifts and ANDs on the whole symbol, so scoring the eight masks takes a
+few dozen big-integer operations per mask instead of a loop over every
+module.
+"""
+
+from collections import namedtuple
+
+from .reedsolomon import galois_field
+
+FIELD = galois_field(0x11D, base=0)
+
+ERROR_LEVELS = 'LMQH'
+# Format information bits of each error correction level
+_LEVEL_BITS = {'L': 1, 'M': 0, 'Q': 3, 'H': 2}
+
+# Error correction codewords per block and number of blocks, by level and
+# version (index 0 unused)
+ECC_PER_BLOCK = {
+    'L': (0, 7, 10, 15, 20, 26, 18, 20, 24, 30, 18, 20, 24, 26, 30, 22, 24, 28, 30, 28, 28, 28, 28, 30, 30, 26,
+          28, 30, 30, 30, 30, 30, 30, 30, 30, 30, 30, 30, 30, 30, 30),
+    'M': (0, 10, 16, 26, 18, 24, 16, 18, 22, 22, 26, 30, 22, 22, 24, 24, 28, 28, 26, 26, 26, 26, 28, 28, 28, 28,
+          28, 28, 28, 28, 28, 28, 28, 28, 28, 28, 28, 28, 28, 28, 28),
+    'Q': (0, 13, 22, 18, 26, 18, 24, 18, 22, 20, 24, 28, 26, 24, 20, 30, 24, 28, 28, 26, 30, 28, 30, 30, 30, 30,
+          28, 30, 30, 30, 30, 30, 30, 30, 30, 30, 30, 30, 30, 30, 30),
+    'H': (0, 17, 28, 22, 16, 22, 28, 26, 26, 24, 28, 24, 28, 22, 24, 24, 30, 28, 28, 26, 28, 30, 24, 30, 30, 30,
+          30, 30, 30, 30, 30, 30, 30, 30, 30, 30, 30, 30, 30, 30, 30),
+}
+ECC_BLOCKS = {
+    'L': (0, 1, 1, 1, 1, 1, 2, 2, 2, 2, 4, 4, 4, 4, 4, 6, 6, 6, 6, 7, 8, 8, 9, 9, 10, 12, 12, 12, 13, 14, 15, 16,
+          17, 18, 19, 19, 20, 21, 22, 24, 25),
+    'M': (0, 1, 1, 1, 2, 2, 4, 4, 4, 5, 5, 5, 8, 9, 9, 10, 10, 11, 13, 14, 16, 17, 17, 18, 20, 21, 23, 25, 26, 28,
+          29, 31, 33, 35, 37, 38, 40, 43, 45, 47, 49),
+    'Q': (0, 1, 1, 2, 2, 4, 4, 6, 6, 8, 8, 8, 10, 12, 16, 12, 17, 16, 18, 21, 20, 23, 23, 25, 27, 29, 34, 34, 35,
+          38, 40, 43, 45, 48, 51, 53, 56, 59, 62, 65, 68),
+    'H': (0, 1, 1, 2, 4, 4, 4, 5, 6, 8, 8, 11, 11, 16, 16, 18, 16, 19, 21, 25, 25, 25, 34, 30, 32, 35, 37, 40, 42,
+          45, 48, 51, 54, 57, 60, 63, 66, 70, 74, 77, 81),
+}
+
+NUMERIC, ALPHANUMERIC, BYTE, KANJI = 'N', 'A', 'B', 'K'
+ALPHANUMERIC_CHARS = '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ $%*+-./:'
+_ALPHANUMERIC_VALUES = {char: value for value, char in enumerate(ALPHANUMERIC_CHARS)}
+# Mode indicator and character count bits for versions 1-9, 10-26 and 27-40
+_MODES = {
+    NUMERIC: (0x1, (10, 12, 14)),
+    ALPHANUMERIC: (0x2, (9, 11, 13)),
+    BYTE: (0x4, (8, 16, 16)),
+    KANJI: (0x8, (8, 10, 12)),
+}
+
+# Mask conditions on (row, column)
+MASKS = (
+    lambda y, x: (x + y) % 2 == 0,
+    lambda y, x: y % 2 == 0,
+    lambda y, x: x % 3 == 0,
+    lambda y, x: (x + y) % 3 == 0,
+    lambda y, x: (x // 3 + y // 2) % 2 == 0,
+    lambda y, x: x * y % 2 + x * y % 3 == 0,
+    lambda y, x: (x * y % 2 + x * y % 3) % 2 == 0,
+    lambda y, x: ((x + y) % 2 + x * y % 3) % 2 == 0,
+)
+
+# Finder-like patterns for penalty rule 3, as bit patterns with bit 0 first
+_FINDER_PATTERNS = (0b00001011101, 0b10111010000)
+
+
+class Segment(namedtuple('Segment', 'mode data')):
+    """A run of data in one encoding mode; ``data`` is a str, or bytes in byte mode."""
+
+    __slots__ = ()
+
+
+def _popcount(value):
+    return bin(value).count('1')
+
+
+def raw_data_modules(version):
+    """Return the number of modules available for codewords in a version."""
+    result = (16 * version + 128) * version + 64
+    if version >= 2:
+        count = version // 7 + 2
+        result -= (25 * count - 10) * count - 55
+        if version >= 7:
+            result -= 36
+    return result
+
+
+def data_codewords(version, level):
+    """Return the data capacity of a version and error correction level."""
+    return raw_data_modules(version) // 8 - ECC_PER_BLOCK[level][version] * ECC_BLOCKS[level][version]
+
+
+def alignment_positions(version):
+    """Return the centre coordinates of the alignment patterns."""
+    if version == 1:
+        return []
+    count = version // 7 + 2
+    size = version * 4 + 17
+    step = (version * 8 + count * 3 + 5) // (count * 4 - 4) * 2
+    return [6] + sorted(size - 7 - index * step for index in range(count - 1))
+
+
+def _bch_bits(data, bits, generator):
+    remainder = data
+    for _ in range(bits):
+        remainder = (remainder << 1) ^ ((remainder >> (bits - 1)) * generator)
+    return data << bits | remainder
+
+
+def format_bits(level, mask):
+    """Return the 15 format information bits of a level and mask."""
+    return _bch_bits(_LEVEL_BITS[level] << 3 | mask, 10, 0x537) ^ 0x5412
+
+
+# Format bits of every level and mask
+FORMAT_BITS = {(level, mask): format_bits(level, mask) for level in ERROR_LEVELS for mask in range(8)}
+
+
+class _Version:
+    """Function patterns, data order and masks of one symbol version.
+
+    Whole symbols are single integers: row ``y`` starts at bit
+    ``(y + 4) * stride + 4`` and every row is surrounded by 4 light
+    modules, so shifting by 1 moves along a row and shifting by ``stride``
+    moves down a column, and patterns cannot wrap between rows.
+
+    Attributes:
+        size (int): Modules per side
+        stride (int): Bits per padded row
+        base (int): Dark function modules, without format information
+        order (list): Bit of every data module in placement order
+        masks (list): For each mask pattern, the data modules it inverts
+        real (int): Every module of the symbol
+        row_pairs (int): Modules with a right-hand neighbour
+        column_pairs (int): Modules with a neighbour below
+        padded (int): Every bit of the padded symbol
+    """
+
+    def __init__(self, version):
+        size = self.size = version * 4 + 17
+        stride = self.stride = size + 8
+        dark = [0] * size
+        function = [0] * size
+
+        def set_module(x, y, is_dark):
+            function[y] |= 1 << x
+            if is_dark:
+                dark[y] |= 1 << x
+            else:
+                dark[y] &= ~(1 << x)
+
+        for index in range(size):
+            set_module(6, index, index % 2 == 0)
+            set_module(index, 6, index % 2 == 0)
+        for cx, cy in ((3, 3), (size - 4, 3), (3, size - 4)):
+            for dy in range(-4, 5):
+                for dx in range(-4, 5):
+                    x, y = cx + dx, cy + dy
+                    if 0 <= x < size and 0 <= y < size:
+                        set_module(x, y, max(abs(dx), abs(dy)) not in (2, 4))
+        positions = alignment_positions(version)
+        last = len(positions) - 1
+        for i, cx in enumerate(positions):
+            for j, cy in enumerate(positions):
+                if (i, j) in ((0, 0), (0, last), (last, 0)):
+                    continue
+                for dy in range(-2, 3):
+                    for dx in range(-2, 3):
+                        set_module(cx + dx, cy + dy, max(abs(dx), abs(dy)) != 1)
+
+        # Format information areas (drawn per mask) and the dark module
+        first = [(y, 8) for y in range(6)] + [(7, 8), (8, 8), (8, 7)] + [(8, 14 - i) for i in range(9, 15)]
+        second = [(8, size - 1 - i) for i in range(8)] + [(size - 15 + i, 8) for i in range(8, 15)]
+        self._format_bits = (
+            [self.bit(x, y) for y, x in first],
+            [self.bit(x, y) for y, x in second],
+        )
+        for y, x in first + second:
+            set_module(x, y, False)
+        set_module(8, size - 8, True)
+
+        if version >= 7:
+            bits = _bch_bits(version, 12, 0x1F25)
+            for index in range(18):
+                is_dark = bits >> index & 1
+                a, b = size - 11 + index % 3, index // 3
+                set_module(a, b, is_dark)
+                set_module(b, a, is_dark)
+
+        full = (1 << size) - 1
+        free = [full & ~row for row in function]
+        self.base = self.pack(dark)
+        self.real = self.pack([full] * size)
+        self.row_pairs = self.pack([full >> 1] * size)
+        self.column_pairs = self.pack([full] * (size - 1) + [0])
+        self.padded = (1 << stride * (size + 8)) - 1
+
+        order = []
+        right = size - 1
+        while right >= 1:
+            if right == 6:
+                right = 5
+            upward = (right + 1) & 2 == 0
+            for vertical in range(size):
+                y = size - 1 - vertical if upward else vertical
+                for x in (right, right - 1):
+                    if free[y] >> x & 1:
+                        order.append(self.bit(x, y))
+            right -= 2
+        self.order = order
+
+        # Mask patterns repeat every 12 modules in both directions
+        repeat = ((1 << 12 * (size // 12 + 1)) - 1) // 0xFFF
+        self.masks = []
+        for condition in MASKS:
+            tile = [sum(1 << x for x in range(12) if condition(y, x)) for y in range(12)]
+            self.masks.append(self.pack([tile[y % 12] * repeat & free[y] for y in range(size)]))
+        self._formats = {}
+
+    def bit(self, x, y):
+        """Return the bit index of a module."""
+        return (y + 4) * self.stride + 4 + x
+
+    def pack(self, rows):
+        """Combine row bits into a whole-symbol integer."""
+        stride = self.stride
+        matrix = 0
+        for y, row in enumerate(rows):
+            matrix |= row << (y + 4) * stride + 4
+        return matrix
+
+    def unpack(self, matrix):
+        """Split a whole-symbol integer into row bits."""
+        full = (1 << self.size) - 1
+        return [matrix >> self.bit(0, y) & full for y in range(self.size)]
+
+    def format_modules(self, level, mask):
+        """Return the dark format information modules of a level and mask."""
+        modules = self._formats.get((level, mask))
+        if modules is None:
+            bits = FORMAT_BITS[(level, mask)]
+            modules = 0
+            for positions in self._format_bits:
+                for index, position in enumerate(positions):
+                    if bits >> index & 1:
+                        modules |= 1 << position
+            self._formats[(level, mask)] = modules
+        return modules
+
+
+_versions = {}
+
+
+def version_info(version):
+    """Return the cached function patterns of a version."""
+    info = _versions.get(version)
+    if info is None:
+        info = _versions[version] = _Version(version)
+    return info
+
+
+def _count_bits(mode, version):
+    counts = _MODES[mode][1]
+    return counts[0] if version <= 9 else counts[1] if version <= 26 else counts[2]
+
+
+def _segment_bits(segment, version):
+    """Return ``(value, length)`` of a segment's bit stream."""
+    mode, data = segment
+    indicator = _MODES[mode][0]
+    value, length = indicator, 4
+    count = len(data) if mode != KANJI else len(data) // 2
+    value = value << _count_bits(mode, version) | count
+    length += _count_bits(mode, version)
+    if mode == NUMERIC:
+        for start in range(0, len(data), 3):
+            chunk = data[start:start + 3]
+            bits = len(chunk) * 3 + 1
+            value = value << bits | int(chunk)
+            length += bits
+    elif mode == ALPHANUMERIC:
+        for start in range(0, len(data) - 1, 2):
+            value = value << 11 | _ALPHANUMERIC_VALUES[data[start]] * 45 + _ALPHANUMERIC_VALUES[data[start + 1]]
+            length += 11
+        if len(data) % 2:
+            value = value << 6 | _ALPHANUMERIC_VALUES[data[-1]]
+            length += 6
+    elif mode == KANJI:
+        for start in range(0, len(data) - 1, 2):
+            code = data[start] << 8 | data[start + 1]
+            code -= 0x8140 if code < 0xE040 else 0xC140
+            value = value << 13 | (code >> 8) * 0xC0 + (code & 0xFF)
+            length += 13
+    else:
+        value = value << 8 * len(data) | int.from_bytes(data, 'big')
+        length += 8 * len(data)
+    return value, length
+
+
+def make_segment(data, mode=None):
+    """Return a segment for text or bytes, choosing the densest single mode
+    when ``mode`` is None."""
+    if mode is None:
+        if isinstance(data, str) and data.isdigit() and data.isascii():
+            mode = NUMERIC
+        elif isinstance(data, str) and all(char in _ALPHANUMERIC_VALUES for char in data):
+            mode = ALPHANUMERIC
+        else:
+            mode = BYTE
+    if mode == NUMERIC and not (data.isdigit() and data.isascii()):
+        mode = BYTE
+    if mode == ALPHANUMERIC and not all(char in _ALPHANUMERIC_VALUES for char in data):
+        mode = BYTE
+    if mode in (BYTE, KANJI) and isinstance(data, str):
+        try:
+            data = data.encode('shift_jis' if mode == KANJI else 'latin-1')
+        except UnicodeEncodeError:
+            mode, data = BYTE, data.encode('utf-8')
+    return Segment(mode, data)
+
+
+def encode_codewords(segments, level, version):
+    """Return the data codewords of segments padded to a version's capacity,
+    or None if they do not fit."""
+    capacity = data_codewords(version, level) * 8
+    value, length = 0, 0
+    for segment in segments:
+        bits, count = _segment_bits(segment, version)
+        if count > capacity:
+            return None
+        value = value << count | bits
+        length += count
+    if length > capacity:
+        return None
+    # Terminator and padding to a byte boundary
+    terminator = min(4, capacity - length)
+    length += terminator
+    padding = -length % 8
+    value <<= terminator + padding
+    length += padding
+    codewords = list(value.to_bytes(length // 8, 'big')) if length else []
+    pad = 0xEC
+    while len(codewords) < capacity // 8:
+        codewords.append(pad)
+        pad ^= 0xEC ^ 0x11
+    return codewords
+
+
+def add_error_correction(codewords, level, version):
+    """Split codewords into blocks, add their Reed–Solomon codewords and
+    interleave them."""
+    blocks_count = ECC_BLOCKS[level][version]
+    degree = ECC_PER_BLOCK[level][version]
+    raw = raw_data_modules(version) // 8
+    short_blocks = blocks_count - raw % blocks_count
+    short_length = raw // blocks_count
+    blocks = []
+    start = 0
+    for index in range(blocks_count):
+        end = start + short_length - degree + (0 if index < short_blocks else 1)
+        data = codewords[start:end]
+        start = end
+        blocks.append((data, FIELD.encode(data, degree)))
+    result = []
+    for position in range(short_length - degree + 1):
+        for data, _ in blocks:
+            if position < len(data):
+                result.append(data[position])
+    for position in range(degree):
+        for _, ecc in blocks:
+            result.append(ecc[position])
+    return result
+
+
+def penalty(matrix, info):
+    """Return the mask penalty score of a symbol.
+
+    Every rule is evaluated on the whole symbol at once.
+
+    Args:
+        matrix (int): Modules as laid out by ``_Version``
+        info (_Version): The symbol's version
+    """
+    stride = info.stride
+    score = 0
+
+    # Rule 1: every window of 5 equal modules in a row or column scores 1,
+    # and each run of 5 or more 2 more
+    equal = ~(matrix ^ (matrix >> 1)) & info.row_pairs
+    windows = equal & (equal >> 1) & (equal >> 2) & (equal >> 3)
+    score += _popcount(windows) + 2 * _popcount(windows & ~(windows >> 1))
+    vertical = ~(matrix ^ (matrix >> stride)) & info.column_pairs
+    windows = vertical & (vertical >> stride) & (vertical >> 2 * stride) & (vertical >> 3 * stride)
+    score += _popcount(windows) + 2 * _popcount(windows & ~(windows >> stride))
+
+    # Rule 2: 3 per 2x2 block of one color
+    score += 3 * _popcount(equal & (equal >> stride) & vertical)
+
+    # Rule 3: finder-like patterns with 4 light modules, or the quiet
+    # zone, on one side
+    inverse = ~matrix & info.padded
+    for step in (1, stride):
+        for pattern in _FINDER_PATTERNS:
+            matches = info.padded
+            for bit in range(11):
+                matches &= (matrix if pattern >> bit & 1 else inverse) >> bit * step
+            score += 40 * _popcount(matches)
+
+    # Rule 4: balance of dark and light modules
+    total = info.size * info.size
+    dark = _popcount(matrix)
+    score += ((abs(dark * 20 - total * 10) + total - 1) // total - 1) * 10
+    return score
+
+
+def encode_segments(segments, level='M', mask=None, min_version=1):
+    """Encode segments as a QR Code symbol.
+
+    Args:
+        segments (list): ``Segment`` tuples
+        level (str): Error correction level, ``L``, ``M``, ``Q`` or ``H``
+        mask (int, optional): Mask pattern 0-7; None chooses the mask
+            with the lowest penalty
+        min_version (int): Smallest version to use
+
+    Returns:
+        tuple: ``(rows, size)`` with one integer of module bits per row
+    """
+    for version in range(min_version, 41):
+        codewords = encode_codewords(segments, level, version)
+        if codewords is not None:
+            break
+    else:
+        raise ValueError("Data too long for QR Code")
+    codewords = add_error_correction(codewords, level, version)
+    info = version_info(version)
+    stream = int.from_bytes(bytes(codewords), 'big')
+    length = len(codewords) * 8
+    matrix = info.base
+    for index, position in enumerate(info.order[:length]):
+        if stream >> (length - 1 - index) & 1:
+            matrix |= 1 << position
+
+    best = None
+    for candidate in range(8) if mask is None else (mask,):
+        masked = matrix ^ info.masks[candidate] | info.format_modules(level, candidate)
+        if mask is not None:
+            best = (0, masked)
+            break
+        score = penalty(masked, info)
+        if best is None or score < best[0]:
+            best = (score, masked)
+    return info.unpack(best[1]), info.size
+
+
+def rows_to_modules(rows, size):
+    """Return row bits as module bytes, row by row, 1 for dark."""
+    table = bytes.maketrans(b'01', b'\x00\x01')
+    return b''.join(format(row, f'0{size}b')[::-1].encode('ascii').translate(table) for row in rows)
+
+
+def parse_field_data(data, level='Q'):
+    """Split ^BQ field data into an error correction level and segments.
+
+    The data starts with the level (``H``, ``Q``, ``M`` or ``L``) and the
+    input mode, ``A`` (automatic) or ``M`` (manual), followed by a comma.
+    In manual mode the data starts with its character mode: ``N``, ``A``,
+    ``Bxxxx`` (byte, with a 4 digit count) or ``K``.
+
+    Returns:
+        tuple: ``(level, segments)``
+    """
+    if len(data) >= 3 and data[2] == ',':
+        if data[0].upper() in ERROR_LEVELS:
+            level = data[0].upper()
+        input_mode = data[1].upper()
+        data = data[3:]
+        if input_mode == 'M' and data:
+            mode = data[0].upper()
+            if mode == BYTE and data[1:5].isdigit():
+                return level, [make_segment(data[5:5 + int(data[1:5])], BYTE)]
+            if mode in (NUMERIC, ALPHANUMERIC, KANJI):
+                return level, [make_segment(data[1:], mode)]
+    return level, [make_segment(data)]
+
+
+def encode(data, level='Q', mask=None):
+    """Encode ^BQ field data.
+
+    Args:
+        data (str): Field data, with its level and input mode prefix
+        level (str): Error correction level used when the data has none
+        mask (int, optional): Mask pattern; None chooses the best one
+
+    Returns:
+        tuple: ``(modules, width, height)``
+    """
+    level, segments = parse_field_data(data, level)
+    rows, size = encode_segments(segments, level, mask)
+    return rows_to_modules(rows, size), size, size
@@ -0,0 +1,162 @@
+"""Reed–Solomon error correction over GF(2^m) and GF(929).
+
+Log and antilog tables are built once per field, and generator polynomials
+once per number of error correction codewords (that is, per error
+correction level), so encoding a block is a single pass of table lookups.
+Symbologies share fields through ``galois_field``: DataMatrix and Aztec
+both use GF(256), Aztec also uses GF(16) for its mode message and GF(64),
+GF(1024) and GF(4096) for larger symbols, and PDF417 uses ``PDF417_FIELD``.
+"""
+
+
+class GaloisField:
+    """A binary Galois field GF(2^m) and its Reed–Solomon encoder.
+
+    Args:
+        polynomial (int): Primitive polynomial, e.g. ``0x12D`` for
+            DataMatrix
+        size (int): Number of elements, ``2 ** m``
+        base (int): Exponent of the first root of the generator
+            polynomials (1 for DataMatrix, 0 for QR Code)
+    """
+
+    def __init__(self, polynomial, size=256, base=1):
+        self.size = size
+        self.base = base
+        self.exp = [0] * (2 * size)
+        self.log = [0] * size
+        value = 1
+        for power in range(size - 1):
+            self.exp[power] = value
+            self.log[value] = power
+            value <<= 1
+            if value & size:
+                value ^= polynomial
+        # Doubled antilog table, so products need no modulo
+        for power in range(size - 1, 2 * size):
+            self.exp[power] = self.exp[power - (size - 1)]
+        self._generators = {}
+
+    def multiply(self, a, b):
+        if not a or not b:
+            return 0
+        return self.exp[self.log[a] + self.log[b]]
+
+    def generator(self, degree):
+        """Return the logs of the coefficients of a generator polynomial.
+
+        The polynomial is ``(x - a^base) ... (x - a^(base + degree - 1))``;
+        its coefficients after the leading 1 are returned as logs, highest
+        degree first, ready for ``encode``.
+        """
+        logs = self._generators.get(degree)
+        if logs is None:
+            coefficients = [1]
+            for index in range(degree):
+                root = self.exp[self.base + index]
+                product = coefficients + [0]
+                for position, coefficient in enumerate(coefficients):
+                    product[position + 1] ^= self.multiply(coefficient, root)
+                coefficients = product
+            # Every coefficient of a generator polynomial is non-zero
+            logs = self._generators[degree] = tuple(self.log[coefficient] for coefficient in coefficients[1:])
+        return logs
+
+    def encode(self, data, degree):
+        """Return the ``degree`` error correction codewords of a data block."""
+        generator = self.generator(degree)
+        exp, log = self.exp, self.log
+        remainder = [0] * degree
+        for codeword in data:
+            factor = codeword ^ remainder[0]
+            del remainder[0]
+            remainder.append(0)
+            if factor:
+                factor_log = log[factor]
+                for position, coefficient_log in enumerate(generator):
+                    remainder[position] ^= exp[factor_log + coefficient_log]
+        return remainder
+
+
+class PrimeField:
+    """The prime field GF(p) and its Reed–Solomon encoder.
+
+    PDF417 works in GF(929) with the primitive element 3; its error
+    correction codewords are the negated remainder of the data polynomial
+    divided by ``(x - 3) (x - 3^2) ... (x - 3^k)``.
+
+    Args:
+        modulus (int): Number of elements, a prime
+        primitive (int): Primitive element of the field
+    """
+
+    def __init__(self, modulus=929, primitive=3):
+        self.size = modulus
+        self.exp = [0] * (2 * modulus)
+        self.log = [0] * modulus
+        value = 1
+        for power in range(modulus - 1):
+            self.exp[power] = value
+            self.log[value] = power
+            value = value * primitive % modulus
+        # Doubled antilog table, so products need no modulo
+        for power in range(modulus - 1, 2 * modulus):
+            self.exp[power] = self.exp[power - (modulus - 1)]
+        self._generators = {}
+
+    def multiply(self, a, b):
+        if not a or not b:
+            return 0
+        return self.exp[self.log[a] + self.log[b]]
+
+    def generator(self, degree):
+        """Return the logs of the negated coefficients of a generator polynomial.
+
+        The coefficients after the leading 1 are returned highest degree
+        first, ready for ``encode``.
+        """
+        logs = self._generators.get(degree)
+        if logs is None:
+            modulus = self.size
+            coefficients = [1]
+            for index in range(1, degree + 1):
+                root = self.exp[index]
+                product = coefficients + [0]
+                for position, coefficient in enumerate(coefficients):
+                    product[position + 1] = (product[position + 1] - self.multiply(coefficient, root)) % modulus
+                coefficients = product
+            # None of the PDF417 generator coefficients is zero
+            logs = self._generators[degree] = tuple(self.log[-coefficient % modulus]
+                                                    for coefficient in coefficients[1:])
+        return logs
+
+    def encode(self, data, degree):
+        """Return the ``degree`` error correction codewords of a data block."""
+        generator = self.generator(degree)
+        exp, log = self.exp, self.log
+        modulus = self.size
+        remainder = [0] * degree
+        for codeword in data:
+            factor = (codeword + remainder[0]) % modulus
+            del remainder[0]
+            remainder.append(0)
+            if factor:
+                factor_log = log[factor]
+                for position, coefficient_log in enumerate(generator):
+                    remainder[position] = (remainder[position] + exp[factor_log + coefficient_log]) % modulus
+        return [-value % modulus for value in remainder]
+
+
+_fields = {}
+
+
+def galois_field(polynomial, size=256, base=1):
+    """Return the shared ``GaloisField`` of a primitive polynomial."""
+    key = (polynomial, size, base)
+    field = _fields.get(key)
+    if field is None:
+        field = _fields[key] = GaloisField(polynomial, size, base)
+    return field
+
+
+PDF417_FIELD = PrimeField(929, 3)
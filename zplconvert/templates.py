@@ -0,0 +1,278 @@
+"""Stored formats (^DF/^XF/^FN) and their cached static layers."""
+
+import logging
+import threading
+
+from .label import StaticLayer
+from .cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DRIVE = 'R:'
+
+
+def normalize_object_name(name, default_extension):
+    """Return a printer object name in canonical ``D:NAME.EXT`` form.
+
+    Args:
+        name (str): Name as written in ZPL, e.g. ``R:LABEL.ZPL`` or ``LABEL``
+        default_extension (str): Extension used when ``name`` has none, e.g. ``.ZPL``
+    """
+    name = name.strip().upper()
+    if len(name) < 2 or name[1] != ':':
+        name = DEFAULT_DRIVE + name
+    if '.' not in name:
+        name += default_extension
+    return name
+
+
+def _overlaps(a, b):
+    """Return True if two element bounds overlap; None overlaps everything."""
+    if a is None or b is None:
+        return True
+    return a[0] < b[2] and b[0] < a[2] and a[1] < b[3] and b[1] < a[3]
+
+
+def split_static(elements, variable):
+    """Split a display list into a static layer and the elements drawn per label.
+
+    The static layer is drawn before every other element. A static element
+    joins it unless it overlaps an element drawn per label before it, whose
+    pixels it would cover; such elements are drawn per label in their
+    original order. Variable fields take the room their data may grow into.
+
+    Args:
+        elements (sequence): Elements in drawing order
+        variable (container): Indexes of the elements whose data varies
+
+    Returns:
+        tuple: ``(static, drawn)``, the static elements and the indexes of
+        the elements drawn per label, both in drawing order
+    """
+    static = []
+    drawn = []
+    covered = []
+    for index, element in enumerate(elements):
+        if index in variable:
+            covered.append(element.data_bounds())
+        else:
+            bounds = element.bounds() if covered else None
+            if not any(_overlaps(bounds, box) for box in covered):
+                static.append(element)
+                continue
+            covered.append(bounds)
+        drawn.append(index)
+    return static, drawn
+
+
+class StoredFormat:
+    """A format stored with ^DF.
+
+    Static elements form the static layer, which is rendered once per
+    canvas size and reused by every recall. The ^FN fields are redrawn on
+    top of it with the recalled data, in their stored order together with
+    the static elements stored after a field that overlap it, so such an
+    element still covers the field.
+    """
+
+    def __init__(self, name, elements, field_numbers):
+        self.name = name
+        static, drawn = split_static(elements, field_numbers)
+        self.static_layer = StaticLayer(static) if static else None
+        # (field number or None, element) pairs in drawing order
+        self.fields = tuple((field_numbers.get(index), elements[index]) for index in drawn)
+
+    def field_elements(self, values):
+        """Return the elements drawn per recall, filled in with field data.
+
+        Args:
+            values (dict): Maps ^FN numbers to field data; fields without a
+                value keep the data they were stored with
+        """
+        elements = []
+        for field_number, element in self.fields:
+            if field_number in values:
+                element = element.with_data(values[field_number])
+            elements.append(element)
+        return elements
+
+    def __repr__(self):
+        static = len(self.static_layer.elements) if self.static_layer is not None else 0
+        return f"StoredFormat({self.name!r}, static={static}, fields={len(self.fields)})"
+
+
+class TemplateRegistry:
+    """Stored formats by object name, shared across labels and requests."""
+
+    def __init__(self):
+        self._formats = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._formats)
+
+    def define(self, stored_format):
+        """Store a format, replacing any format with the same name."""
+        with self._lock:
+            self._formats[stored_format.name] = stored_format
+        logger.info(f"Stored format {stored_format!r}")
+
+    def get(self, name):
+        """Return the stored format with the given name, or None."""
+        return self._formats.get(normalize_object_name(name, '.ZPL'))
+
+    def remove(self, name):
+        """Delete a stored format; returns True if it existed."""
+        with self._lock:
+            return self._formats.pop(normalize_object_name(name, '.ZPL'), None) is not None
+
+    def clear(self):
+        """Delete every stored format."""
+        with self._lock:
+            self._formats.clear()
+
+
+# Process-wide registry used by the parser
+template_registry = TemplateRegistry()
+
+
+def end_format(state, label):
+    """Finish the format at ^XZ: store a ^DF format or apply a ^XF recall.
+
+    Returns:
+        bool: True if the format was stored rather than printed
+    """
+    if state.storing_format is not None:
+        start = state.format_start
+        field_numbers = {
+            index - start: number for index, number in label.field_numbers.items() if index >= start
+        }
+        template_registry.define(StoredFormat(state.storing_format, label.elements[start:], field_numbers))
+        # The stored format is not part of the printed output
+        del label.elements[start:]
+        for indexes in (label.field_numbers, label.serials):
+            for index in list(indexes):
+                if index >= start:
+                    del indexes[index]
+        state.storing_format = None
+        return True
+
+    if state.recalled_format is not None:
+        stored_format = state.recalled_format
+        own_elements = label.elements[:]
+        label.elements[:] = stored_format.field_elements(state.field_values)
+        static_layer = stored_format.static_layer
+        if static_layer is not None:
+            if label.static is None:
+                label.static = static_layer
+            else:
+                # Only one base layer per label; draw further recalls in full
+                label.elements[:0] = static_layer.elements
+        # The label's own elements follow the recalled ones
+        offset = len(label.elements)
+        label.elements.extend(own_elements)
+        label.field_numbers.clear()
+        label.serials = {index + offset: serial for index, serial in label.serials.items()}
+        state.recalled_format = None
+        state.field_values = {}
+    return False
+
+
+class _DetectedTemplate:
+    """Elements shared by the labels of one fingerprint."""
+
+    def __init__(self, elements):
+        self.reference = elements
+        self.variable = frozenset()
+        self.fixed = None
+        self.drawn = None
+        self.layer = None
+
+    def learn(self, elements):
+        """Mark the elements that differ from the reference as variable.
+
+        Elements once seen to differ stay variable. The rest are split
+        with ``split_static``.
+        """
+        reference = self.reference
+        self.variable = self.variable.union(
+            index for index, (ours, theirs) in enumerate(zip(reference, elements)) if ours != theirs
+        )
+        self.fixed = [index for index in range(len(reference)) if index not in self.variable]
+        static, self.drawn = split_static(reference, self.variable)
+        self.layer = StaticLayer(static) if static else None
+
+    def split(self, elements):
+        """Return the elements a label draws on top of the layer, or None if it does not fit."""
+        reference = self.reference
+        if len(elements) != len(reference):
+            return None
+        if self.fixed is None or any(elements[index] != reference[index] for index in self.fixed):
+            self.learn(elements)
+        return [elements[index] for index in self.drawn]
+
+
+class TemplateDetector:
+    """Detect labels that repeat the same ZPL with different field data.
+
+    Labels parsed with ``iter_labels(..., fingerprint=True)`` carry a digest
+    of their command sequence with ^FD data masked. Labels sharing a
+    fingerprint share a static layer rendered once, made of the elements
+    that are identical in all of them; the elements that differ, and the
+    identical ones that would cover them, are drawn per label, in order.
+
+    Args:
+        max_templates (int): Number of fingerprints to remember
+    """
+
+    def __init__(self, max_templates=64):
+        self._templates = LRUCache(max_entries=max_templates)
+        self.labels = 0
+        self.hits = 0
+        self.elements = 0
+        self.elements_drawn = 0
+
+    def apply(self, label):
+        """Give ``label`` a shared static layer if its structure was seen before.
+
+        The label is modified in place and returned.
+        """
+        self.labels += 1
+        self.elements += len(label.elements)
+        if label.fingerprint is None or label.static is not None or label.serials or not label.elements:
+            self.elements_drawn += len(label.elements)
+            return label
+        
+        elements = tuple(label.elements)
+        template = self._templates.get(label.fingerprint)
+        variable = template.split(elements) if template is not None else None
+        if variable is None:
+            self._templates.put(label.fingerprint, _DetectedTemplate(elements))
+        elif template.layer is not None:
+            self.hits += 1
+            label.elements[:] = variable
+            label.field_numbers.clear()
+            label.static = template.layer
+        self.elements_drawn += len(label.elements)
+        return label
+
+    def stats(self):
+        """Return detection counters for the labels seen so far."""
+        return {
+            'labels': self.labels,
+            'templates': len(self._templates),
+            'hits': self.hits,
+            'hit_rate': self.hits / self.labels if self.labels else 0.0,
+            'elements': self.elements,
+            'elements_drawn': self.elements_drawn,
+            'elements_saved': self.elements - self.elements_drawn,
+        }
+
+    def report(self):
+        """Return a one-line summary of the detection counters."""
+        stats = self.stats()
+        return (
+            f"{stats['labels']} labels, {stats['templates']} templates, "
+            f"{stats['hit_rate']:.1%} static layer hits, "
+            f"{stats['elements_drawn']}/{stats['elements']} elements drawn"
+        )
@@ -1,2 +1,219 @@
 """Image processing helpers."""
-# Add any image-related utility functions here if needed.
+
+import re
+import zlib
+import hashlib
+import logging
+import binascii
+from PIL import Image
+
+from ..cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+# ZPL ASCII compression: G-Y repeat the following hex digit 1-19 times and
+# g-z 20-400 times; consecutive repeat characters add up ("vMB" = 327 B's)
+REPEAT_COUNTS = {chr(ord('G') + i): i + 1 for i in range(19)}
+REPEAT_COUNTS.update({chr(ord('g') + i): (i + 1) * 20 for i in range(20)})
+
+_REPEAT = re.compile(r'([G-Yg-z]+)([0-9A-Fa-f])')
+_ROW_TOKEN = re.compile(r'[0-9A-Fa-f]+|[,!:]')
+
+# Expansions of the repeat sequences seen so far; graphics reuse a small set
+_expansions = {}
+_MAX_EXPANSIONS = 4096
+
+
+def _expand_repeat(match):
+    key = match.group(0)
+    expanded = _expansions.get(key)
+    if expanded is None:
+        count = 0
+        for char in match.group(1):
+            count += REPEAT_COUNTS[char]
+        expanded = match.group(2) * count
+        if len(_expansions) >= _MAX_EXPANSIONS:
+            _expansions.clear()
+        _expansions[key] = expanded
+    return expanded
+
+
+def decode_ascii_graphic(ascii_data, width_bytes, height):
+    """Decode ^GFA ASCII hex data into a packed 1-bit bitmap.
+
+    Hex digits fill rows of ``width_bytes * 2`` digits. Besides the repeat
+    characters, ``,`` fills the rest of the row with 0 (white), ``!`` fills
+    it with 1 (black) and ``:`` repeats the previous row.
+
+    Args:
+        ascii_data (str): Graphic field data, optionally ZPL-compressed
+        width_bytes (int): Bytes per bitmap row
+        height (int): Number of rows
+
+    Returns:
+        bytes: ``width_bytes * height`` bytes; set bits are black
+    """
+    row_chars = width_bytes * 2
+    total = width_bytes * height
+    if not row_chars or not height:
+        return bytes(total)
+
+    rows = []
+    row = ''
+    previous = '0' * row_chars
+    for token in _ROW_TOKEN.findall(_REPEAT.sub(_expand_repeat, ascii_data)):
+        first = token[0]
+        if first == ',' or first == '!':
+            previous = row.ljust(row_chars, '0' if first == ',' else 'F')
+            rows.append(previous)
+            row = ''
+        elif first == ':':
+            if row:
+                previous = row.ljust(row_chars, '0')
+                rows.append(previous)
+                row = ''
+            rows.append(previous)
+        else:
+            row += token
+            if len(row) >= row_chars:
+                end = len(row) - len(row) % row_chars
+                rows.extend(row[i:i + row_chars] for i in range(0, end, row_chars))
+                previous = rows[-1]
+                row = row[end:]
+        if len(rows) >= height:
+            break
+    if row and len(rows) < height:
+        rows.append(row.ljust(row_chars, '0'))
+
+    bitmap = bytes.fromhex(''.join(rows[:height]))
+    if len(bitmap) < total:
+        bitmap += bytes(total - len(bitmap))
+    return bitmap
+
+
+# Base64 characters decoded per step; a multiple of 4
+BASE64_CHUNK = 64 * 1024
+
+
+def decode_base64_graphic(data, width_bytes, height):
+    """Decode ``:B64:`` or ``:Z64:`` graphic data into a packed 1-bit bitmap.
+
+    The data has the form ``:Z64:<base64>:<crc>``. The CRC is the CRC-16
+    (CCITT, XMODEM) of the base64 text as four hex digits. Base64 is
+    decoded in chunks and, for ``:Z64:``, inflated with an output limit
+    straight into the bitmap buffer, so the work is bounded by the
+    compressed size and the bitmap size.
+
+    Args:
+        data (str): Graphic field data starting with ``:B64:`` or ``:Z64:``
+        width_bytes (int): Bytes per bitmap row
+        height (int): Number of rows
+
+    Returns:
+        bytes or None: ``width_bytes * height`` bytes with set bits black,
+        or None if the data is corrupt
+    """
+    compressed = data.startswith(':Z64:')
+    encoded, _, crc = data[5:].partition(':')
+    encoded = ''.join(encoded.split()).encode('ascii', 'ignore')
+    crc = crc.strip()[:4]
+    if crc:
+        try:
+            expected = int(crc, 16)
+        except ValueError:
+            expected = None
+        if expected is not None and binascii.crc_hqx(encoded, 0) != expected:
+            logger.warning(f"CRC mismatch in graphic data: expected {crc}")
+            return None
+
+    total = width_bytes * height
+    bitmap = bytearray(total)
+    filled = 0
+    inflater = zlib.decompressobj(zlib.MAX_WBITS | 32) if compressed else None
+    try:
+        for offset in range(0, len(encoded), BASE64_CHUNK):
+            chunk = binascii.a2b_base64(encoded[offset:offset + BASE64_CHUNK])
+            if inflater is not None:
+                chunk = inflater.decompress(chunk, total - filled)
+            chunk = chunk[:total - filled]
+            bitmap[filled:filled + len(chunk)] = chunk
+            filled += len(chunk)
+            if filled >= total:
+                break
+    except (binascii.Error, zlib.error) as e:
+        logger.warning(f"Could not decode graphic data: {e}")
+        return None
+    return bytes(bitmap)
+
+
+def decode_graphic_field(data, format, width_bytes, height):
+    """Decode ^GF data in any supported encoding into a packed 1-bit bitmap.
+
+    Args:
+        data (str): Graphic field data. Binary data is passed as latin-1
+            text, one character per byte, as produced by the tokenizer.
+        format (str): ^GF format: ``A`` (ASCII hex), ``B`` (binary) or
+            ``C`` (compressed binary)
+        width_bytes (int): Bytes per bitmap row
+        height (int): Number of rows
+
+    Returns:
+        bytes or None: ``width_bytes * height`` bytes with set bits black,
+        or None if the data cannot be decoded
+    """
+    if data.startswith((':Z64:', ':B64:')):
+        return decode_base64_graphic(data, width_bytes, height)
+    if format == 'A':
+        return decode_ascii_graphic(data, width_bytes, height)
+    if format == 'B':
+        total = width_bytes * height
+        bitmap = data[:total].encode('latin-1', 'replace')
+        if len(bitmap) < total:
+            bitmap += bytes(total - len(bitmap))
+        return bitmap
+    # Plain ^GFC data uses Zebra's undocumented compressed binary scheme
+    logger.warning(f"Unsupported graphic field format: {format}")
+    return None
+
+
+# Decoded graphic fields keyed by a digest of their data and dimensions.
+# Labels tend to repeat the same few logos, so the cache is shared by all
+# labels in the process and bounded by the size of the packed bitmaps.
+graphic_cache = LRUCache(max_bytes=16 * 1024 * 1024)
+
+
+def cached_decode_graphic_field(data, format, width_bytes, height):
+    """Decode ^GF data like ``decode_graphic_field``, using ``graphic_cache``."""
+    digest = hashlib.blake2b(data.encode('utf-8', 'surrogatepass'), digest_size=16).digest()
+    key = (digest, format, width_bytes, height)
+    bitmap = graphic_cache.get(key)
+    if bitmap is None:
+        bitmap = decode_graphic_field(data, format, width_bytes, height)
+        if bitmap is not None:
+            graphic_cache.put(key, bitmap)
+    return bitmap
+
+
+def bitmap_to_image(bitmap, width, height):
+    """Return a packed 1-bit bitmap as a PIL image in mode '1'.
+
+    Args:
+        bitmap (bytes): Rows of ``(width + 7) // 8`` bytes; set bits are black
+        width (int): Width in dots
+        height (int): Height in dots
+    """
+    # The '1;I' raw mode inverts while unpacking, so set bits become black
+    return Image.frombytes('1', (width, height), bitmap, 'raw', '1;I', (width + 7) // 8)
+
+
+def scale_bitmap(bitmap, width, height, x_factor, y_factor):
+    """Magnify a packed 1-bit bitmap by whole factors.
+
+    Returns:
+        tuple: ``(bitmap, width, height)`` of the magnified bitmap
+    """
+    if x_factor == 1 and y_factor == 1:
+        return bitmap, width, height
+    image = bitmap_to_image(bitmap, width, height)
+    image = image.resize((width * x_factor, height * y_factor), Image.NEAREST)
+    return image.tobytes('raw', '1;I'), image.width, image.height